@@ -10,6 +10,7 @@ from absl import app as absl_app
 # Load settings for the defined flags to be parsed before running the app.
 # This ensures that any required configurations are available when initializing the Flask app.
 import backend.initializers.settings
+import backend.initializers.json_provider
 
 
 def connect_to_db(flask_app: flask.Flask) -> None:
@@ -32,6 +33,7 @@ def connect_to_db(flask_app: flask.Flask) -> None:
     import backend.models.user
     import backend.models.product
     import backend.models.report
+    import backend.models.upload
 
     # Configure the Flask app for setting up the SQLAlchemy database connection.
     flask_app.config['SQLALCHEMY_DATABASE_URI'] = (
@@ -85,10 +87,14 @@ def register_routes(flask_app: flask.Flask) -> None:
     import backend.routes.user
     import backend.routes.product
     import backend.routes.admin
+    import backend.routes.uploads
 
     flask_app.register_blueprint(backend.routes.user.user_bp, url_prefix='/api/user')
     flask_app.register_blueprint(backend.routes.product.product_bp, url_prefix='/api/product')
     flask_app.register_blueprint(backend.routes.admin.admin_bp, url_prefix='/api/admin')
+    flask_app.register_blueprint(
+        backend.routes.uploads.uploads_bp, url_prefix=backend.initializers.settings.UPLOADS_URL_PATH
+    )
     # Create authorize button for protected APIs in swagger.
     SWAGGER_TEMPLATE = {
         "securityDefinitions": {"BearerAuth": {"type": "apiKey", "name": "Authorization", "in": "header"}}
@@ -105,8 +111,10 @@ def main(_: list[str]) -> None:
            _: A list of command-line arguments (not used in this function).
     """
 
-    # Create the Flask app.
-    flask_app = flask.Flask(__name__, static_folder='uploads', static_url_path='/backend/uploads')
+    # Create the Flask app. Uploaded files are served by the uploads blueprint, which finds them in either layout.
+    flask_app = flask.Flask(__name__, static_folder=None)
+    # Serialize JSON responses with the fastest available serializer.
+    backend.initializers.json_provider.init_app(flask_app)
     # Enable CORS for all routes and origins, since frontend would be hosted in different port from backend.
     flask_cors.CORS(flask_app)
     # Set the server configuration.
@@ -114,7 +122,7 @@ def main(_: list[str]) -> None:
     # Set secret key used for generating tokens.
     flask_app.config['JWT_SECRET_KEY'] = backend.initializers.settings.app_secret_key.value
     # Add location for storing files like images.
-    flask_app.config['UPLOAD_FOLDER'] = 'uploads/'
+    flask_app.config['UPLOAD_FOLDER'] = backend.initializers.settings.UPLOAD_FOLDER
     # Create directory for files if not exists.
     if not os.path.exists('./backend/uploads/'):
         os.makedirs('./backend/uploads/')
@@ -124,6 +132,27 @@ def main(_: list[str]) -> None:
     flask_app.config['JWT_TOKEN_LOCATION'] = ['headers']
     flask_app.config['JWT_ACCESS_TOKEN_EXPIRES'] = datetime.timedelta(minutes=60)
     flask_app.config['JWT_REFRESH_TOKEN_EXPIRES'] = datetime.timedelta(minutes=180)
+    # Set minimum similarity of fuzzy product name search.
+    flask_app.config['SEARCH_SIMILARITY_THRESHOLD'] = backend.initializers.settings.search_similarity_threshold.value
+    # Set size and lifetime of cached product search results.
+    flask_app.config['SEARCH_CACHE_SIZE'] = backend.initializers.settings.search_cache_size.value
+    flask_app.config['SEARCH_CACHE_TTL_SECONDS'] = backend.initializers.settings.search_cache_ttl_seconds.value
+    # Set number of serialized products reused by product lists.
+    flask_app.config['PRODUCT_CARD_CACHE_SIZE'] = backend.initializers.settings.product_card_cache_size.value
+    # Set number of pages of sellers' product lists reused by profile views.
+    flask_app.config['SELLER_PRODUCTS_CACHE_SIZE'] = backend.initializers.settings.seller_products_cache_size.value
+    # Set how often recommendations of similar products follow changes of products.
+    flask_app.config['SIMILARITY_REFRESH_SECONDS'] = backend.initializers.settings.similarity_refresh_seconds.value
+    # Let nginx send uploaded files, if it serves them from an internal location.
+    flask_app.config['UPLOADS_ACCEL_REDIRECT_LOCATION'] = (
+        backend.initializers.settings.uploads_accel_redirect_location.value
+    )
+    # Set number of processes resizing uploaded pictures.
+    flask_app.config['IMAGE_WORKERS'] = backend.initializers.settings.image_workers.value
+    # Set how often unreferenced uploaded files are removed, outside of the requests releasing them.
+    flask_app.config['FILE_REMOVAL_INTERVAL_SECONDS'] = (
+        backend.initializers.settings.file_removal_interval_seconds.value
+    )
     # Maximum number of files in a multipart form.
     flask_app.config['MAX_FORM_PARTS'] = 10
     flask_app.config['MAX_FORM_MEMORY_SIZE'] = 50 * 1024 * 1024  # 50 MB
@@ -141,6 +170,11 @@ def main(_: list[str]) -> None:
     try:
         # Make connection to the database.
         connect_to_db(flask_app)
+        # Build search box suggestions and similar products before serving requests, instead of on the first one.
+        with flask_app.app_context():
+            backend.managers.product.ProductManager.build_suggestions()
+            backend.managers.product.ProductManager.build_similarity_index()
+        backend.managers.storage.start_removal_worker(flask_app)
 
         # Run the Flask app.
         # TODO: Use "waitress" to run the app in production.
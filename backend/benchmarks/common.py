@@ -0,0 +1,31 @@
+import flask
+
+# Load settings for the defined flags to be parsed before running a benchmark.
+import backend.initializers.settings
+import backend.initializers.json_provider
+
+
+def create_app() -> flask.Flask:
+    """
+    Create a Flask app connected to the database given by the database flags, the same way the app does.
+
+    The caller is responsible for pushing an app context of the returned app.
+    """
+    import backend.initializers.database
+    # Load database models to ensure their tables existence.
+    import backend.models.user
+    import backend.models.product
+    import backend.models.report
+
+    flask_app = flask.Flask(__name__)
+    backend.initializers.json_provider.init_app(flask_app)
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = (
+        f"postgresql://"
+        f"{backend.initializers.settings.db_username.value}:{backend.initializers.settings.db_password.value}"
+        f"@{backend.initializers.settings.db_host.value}:{backend.initializers.settings.db_port.value}"
+        f"/{backend.initializers.settings.db_name.value}"
+    )
+    flask_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    flask_app.config['JWT_SECRET_KEY'] = backend.initializers.settings.app_secret_key.value
+    backend.initializers.database.DB.init_app(flask_app)
+    return flask_app
@@ -0,0 +1,107 @@
+r"""
+Measure throughput of serializing search responses by the app's JSON provider and by Flask's default one.
+
+Payloads look like unpaginated search results: products with their seller and pictures embedded. The default
+provider is measured as the app used it before, with dates converted to strings by the models.
+
+Usage:
+    python -m backend.benchmarks.json_serialization --payload_products=1000 --serializations=50
+"""
+import datetime
+import random
+import time
+
+import flask
+from absl import app as absl_app
+from absl import flags
+from absl import logging
+
+import backend.initializers.json_provider
+
+payload_products = flags.DEFINE_integer(
+    name='payload_products', default=1000, help='Number of products in each payload.'
+)
+serializations = flags.DEFINE_integer(
+    name='serializations', default=50, help='Number of serialized payloads per provider.'
+)
+payload_random_seed = flags.DEFINE_integer(name='payload_random_seed', default=0, help='Seed of generated payloads.')
+
+WORDS = ['old', 'new', 'vintage', 'phone', 'laptop', 'chair', 'camera', 'گوشی', 'صندلی', 'دوربین', 'میز']
+
+
+def search_payload(rng: random.Random, count: int, isoformat_dates: bool) -> dict:
+    """Returns a search response of 'count' products, with dates as strings if 'isoformat_dates'."""
+    now = datetime.datetime(2024, 5, 1, 12, 0, 0)
+    items = []
+    for i in range(count):
+        username = f'user{rng.randrange(count)}'
+        created_at = now - datetime.timedelta(seconds=rng.randrange(10 ** 7), microseconds=rng.randrange(10 ** 6))
+        items.append({
+            'id': i + 1,
+            'user_username': username,
+            'created_at': created_at.isoformat() if isoformat_dates else created_at,
+            'name': ' '.join(rng.choice(WORDS) for _ in range(3)),
+            'price': round(rng.uniform(1, 10 ** 6), 2),
+            'pictures': [f'product{i}_{j}.jpg' for j in range(2)],
+            'city_name': rng.choice(['Tehran', 'Kazan', 'تهران']),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(15)),
+            'status': 'for sale',
+            'category': 'Others',
+            'is_banned': False,
+            'seller': {
+                'username': username, 'first_name': 'First', 'last_name': 'Last', 'address': None,
+                'phone_number': None, 'profile_picture': None, 'is_banned': False, 'email': f'{username}@example.com',
+                'is_admin': False, 'is_verified': True,
+            },
+        })
+    return {'products': items}
+
+
+def measure(flask_app: flask.Flask, payload: dict, count: int) -> dict:
+    """Serializes the payload to a response 'count' times by the app's provider, and returns its throughput."""
+    with flask_app.app_context():
+        # Warm up, and measure the size of the body.
+        size = len(flask.jsonify(payload).get_data())
+        start = time.perf_counter()
+        for _ in range(count):
+            flask.jsonify(payload)
+        elapsed = time.perf_counter() - start
+    return {
+        'payloads_per_second': round(count / elapsed, 1),
+        'megabytes_per_second': round(size * count / elapsed / 10 ** 6, 1),
+        'body_bytes': size,
+    }
+
+
+def main(_: list[str]) -> None:
+    string_dates_payload = search_payload(
+        random.Random(payload_random_seed.value), payload_products.value, isoformat_dates=True
+    )
+    datetime_payload = search_payload(
+        random.Random(payload_random_seed.value), payload_products.value, isoformat_dates=False
+    )
+    # Flask's default provider, which sorts keys, as the app used before.
+    default_app = flask.Flask(__name__)
+    fast_app = flask.Flask(__name__)
+    backend.initializers.json_provider.init_app(fast_app)
+    results = {'default': measure(default_app, string_dates_payload, serializations.value)}
+    if backend.initializers.json_provider.orjson is not None:
+        results['provider_orjson'] = measure(fast_app, datetime_payload, serializations.value)
+    else:
+        logging.warning('orjson is not installed, only the standard library serializer is measured.')
+    orjson_module = backend.initializers.json_provider.orjson
+    backend.initializers.json_provider.orjson = None
+    try:
+        results['provider_stdlib'] = measure(fast_app, datetime_payload, serializations.value)
+    finally:
+        backend.initializers.json_provider.orjson = orjson_module
+
+    for name, result in results.items():
+        logging.info(
+            '%s: %.1f payloads/s, %.1f MB/s, %d bytes.',
+            name, result['payloads_per_second'], result['megabytes_per_second'], result['body_bytes']
+        )
+
+
+if __name__ == '__main__':
+    absl_app.run(main)
@@ -0,0 +1,35 @@
+import datetime
+import random
+
+import flask
+from absl.testing import absltest
+
+import backend.benchmarks.json_serialization
+import backend.initializers.json_provider
+
+
+class JSONSerializationTest(absltest.TestCase):
+    def test_search_payload(self) -> None:
+        payload = backend.benchmarks.json_serialization.search_payload(random.Random(0), 3, isoformat_dates=False)
+        string_dates_payload = backend.benchmarks.json_serialization.search_payload(
+            random.Random(0), 3, isoformat_dates=True
+        )
+
+        self.assertLen(payload['products'], 3)
+        self.assertIsInstance(payload['products'][0]['created_at'], datetime.datetime)
+        self.assertEqual(
+            string_dates_payload['products'][0]['created_at'], payload['products'][0]['created_at'].isoformat()
+        )
+
+    def test_measure(self) -> None:
+        flask_app = flask.Flask(__name__)
+        backend.initializers.json_provider.init_app(flask_app)
+        payload = backend.benchmarks.json_serialization.search_payload(random.Random(0), 3, isoformat_dates=False)
+
+        result = backend.benchmarks.json_serialization.measure(flask_app, payload, 2)
+        self.assertGreater(result['payloads_per_second'], 0)
+        self.assertGreater(result['body_bytes'], 0)
+
+
+if __name__ == "__main__":
+    absltest.main()
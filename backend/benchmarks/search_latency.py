@@ -0,0 +1,223 @@
+r"""
+Measure latency of manager methods serving product searches and lists on a seeded database.
+
+Every scenario calls a manager method with representative arguments and reports its p50/p95/p99 latency,
+the number of queries it issues and the number of rows the database scans for them. In-process caches of
+search results, product cards and seller product lists are cleared before every call, so the database path is
+measured. With '--warm_caches', scenarios are measured again with the caches kept, and reported separately.
+Results are written as JSON, along with the current git commit, to compare them across commits.
+
+Usage:
+    python -m backend.benchmarks.search_latency --db_host=localhost --db_port=5432 --db_name=benchmark \
+        --db_username=postgres --db_password=postgres --output=benchmark.json
+"""
+import datetime
+import json
+import subprocess
+import time
+from typing import Callable, Optional
+
+import flask
+import sqlalchemy
+from absl import app as absl_app
+from absl import flags
+from absl import logging
+
+import backend.benchmarks.common
+import backend.initializers.settings
+
+iterations = flags.DEFINE_integer(name='iterations', default=100, help='Number of measured calls per scenario.')
+warmup_iterations = flags.DEFINE_integer(
+    name='warmup_iterations', default=5, help='Number of calls per scenario before measuring, to warm up caches.'
+)
+warm_caches = flags.DEFINE_boolean(
+    name='warm_caches', default=False,
+    help='Also measure every scenario with warm in-process caches, reported separately from the database path.'
+)
+output = flags.DEFINE_string(name='output', default='benchmark.json', help='Path of the JSON results file.')
+
+# Node types of query plans which read rows of a table or an index.
+SCAN_NODE_TYPES = {
+    'Seq Scan', 'Index Scan', 'Index Only Scan', 'Bitmap Heap Scan', 'Tid Scan', 'Sample Scan',
+}
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """
+    Returns the nearest-rank percentile of sorted values.
+
+    Args:
+        sorted_values (list): Non-empty list of values in ascending order.
+        percent (float): The percentile, between 0 and 100.
+    """
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def rows_scanned(plan: dict) -> int:
+    """
+    Returns the number of rows read from tables and indexes by an executed query plan.
+
+    Rows removed by filters of a scan were read too, so they are counted along with the returned ones.
+
+    Args:
+        plan (dict): The 'Plan' node of 'EXPLAIN (ANALYZE, FORMAT JSON)' output.
+    """
+    rows = 0
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] in SCAN_NODE_TYPES:
+            rows += (
+                node.get('Actual Rows', 0) + node.get('Rows Removed by Filter', 0)
+                + node.get('Rows Removed by Index Recheck', 0)
+            ) * node.get('Actual Loops', 1)
+        nodes.extend(node.get('Plans', []))
+    return rows
+
+
+def clear_caches() -> None:
+    """Clears in-process caches of the current app which serve product searches and lists."""
+    import backend.managers.product
+
+    for extension in (
+            backend.managers.product.ProductManager.SEARCH_CACHE_EXTENSION,
+            backend.managers.product.ProductManager.CARD_CACHE_EXTENSION,
+            backend.managers.product.ProductManager.SELLER_PRODUCTS_CACHE_EXTENSION,
+    ):
+        cache = flask.current_app.extensions.get(extension)
+        if cache is not None:
+            cache.clear()
+
+
+def measure(name: str, method: Callable, *args, warm: bool = False) -> dict:
+    """
+    Calls the method repeatedly and returns its latency percentiles, query count and scanned rows.
+
+    Caches are cleared before every call, unless 'warm' is set, in which case calls are served by whatever the
+    warmup calls cached.
+    """
+    import backend.initializers.database
+
+    def call() -> None:
+        if not warm:
+            clear_caches()
+        # Start from an empty identity map, as a new request would.
+        backend.initializers.database.DB.session.expunge_all()
+        method(*args)
+        backend.initializers.database.DB.session.rollback()
+
+    logging.info('Running %s%s.', name, ' with warm caches' if warm else '')
+    for _ in range(warmup_iterations.value):
+        call()
+
+    latencies = []
+    for _ in range(iterations.value):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    # Record queries of a single call, then execute each of them again to measure the rows it reads.
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append((statement, parameters))
+
+    engine = backend.initializers.database.DB.engine
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        call()
+    finally:
+        sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    scanned = 0
+    connection = backend.initializers.database.DB.session.connection()
+    for statement, parameters in queries:
+        if statement.lstrip().upper().startswith('SELECT'):
+            plan = connection.exec_driver_sql(f'EXPLAIN (ANALYZE, FORMAT JSON) {statement}', parameters).scalar()
+            scanned += rows_scanned(plan[0]['Plan'])
+    backend.initializers.database.DB.session.rollback()
+
+    return {
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'iterations': len(latencies),
+        'query_count': len(queries),
+        'rows_scanned': scanned,
+    }
+
+
+def scenarios(flask_app: flask.Flask) -> dict:
+    """Returns manager calls to measure by name, with arguments picked from the seeded data."""
+    import backend.initializers.database
+    import backend.managers.admin
+    import backend.managers.product
+
+    product_manager = backend.managers.product.ProductManager(flask_app)
+    admin_manager = backend.managers.admin.AdminManager(flask_app)
+    session = backend.initializers.database.DB.session
+    # A product in the middle of the table and its seller.
+    product_id = session.execute(sqlalchemy.text('SELECT max(id) / 2 FROM products')).scalar()
+    username = session.execute(
+        sqlalchemy.text('SELECT user_username FROM products WHERE id = :id'), {'id': product_id}
+    ).scalar()
+
+    return {
+        'search_first_page': (product_manager.search_product, {'limit': 20}),
+        'search_category_price_page': (product_manager.search_product, {
+            'category': ['Kitchenware'], 'min_price': 100, 'max_price': 5000, 'sort_price': 'asc', 'limit': 20,
+        }),
+        'search_full_text_page': (product_manager.search_product, {
+            'q': 'vintage camera', 'sort_relevance': 'dsc', 'limit': 20,
+        }),
+        'search_name_page': (product_manager.search_product, {'name': 'guitar', 'limit': 20}),
+        'search_fuzzy_name_page': (product_manager.search_product, {'name': 'gitar', 'fuzzy': True, 'limit': 20}),
+        'search_city_unpaginated': (product_manager.search_product, {
+            'city_name': 'kazan', 'status': ['sold'], 'category': ['Automobile'],
+        }),
+        'search_facets': (product_manager.search_facets, {'category': ['Kitchenware']}, 1000),
+        'get_product': (product_manager.get_product, product_id),
+        'get_products': (product_manager.get_products, username),
+        'get_list_of_reported_products': (admin_manager.get_list_of_reported_products,),
+        'get_list_of_reported_users': (admin_manager.get_list_of_reported_users,),
+        'get_banned_product_list': (admin_manager.get_banned_product_list,),
+        'get_banned_user_list': (admin_manager.get_banned_user_list,),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Returns hash of the checked out git commit, or None outside a git repository."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(_: list[str]) -> None:
+    flask_app = backend.benchmarks.common.create_app()
+    with flask_app.app_context():
+        measured = scenarios(flask_app)
+        results = {name: measure(name, *scenario) for name, scenario in measured.items()}
+        warm_results = warm_caches.value and {
+            name: measure(name, *scenario, warm=True) for name, scenario in measured.items()
+        }
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.datetime.now().isoformat(),
+        'iterations': iterations.value,
+        'scenarios': results,
+    }
+    if warm_results:
+        report['warm_scenarios'] = warm_results
+    with open(output.value, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    logging.info('Wrote results to %s.', output.value)
+
+
+if __name__ == '__main__':
+    backend.initializers.settings.set_unused_flag_defaults()
+    absl_app.run(main)
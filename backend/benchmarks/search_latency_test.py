@@ -0,0 +1,53 @@
+import flask
+from absl.testing import absltest
+
+import backend.benchmarks.search_latency
+import backend.managers.cache
+import backend.managers.product
+
+
+class SearchLatencyTest(absltest.TestCase):
+    def test_percentile(self) -> None:
+        values = list(range(1, 101))
+        self.assertEqual(backend.benchmarks.search_latency.percentile(values, 50), 50)
+        self.assertEqual(backend.benchmarks.search_latency.percentile(values, 99), 99)
+        self.assertEqual(backend.benchmarks.search_latency.percentile(values, 100), 100)
+        self.assertEqual(backend.benchmarks.search_latency.percentile([7], 95), 7)
+        self.assertEqual(backend.benchmarks.search_latency.percentile([1, 2, 3], 50), 2)
+
+    def test_rows_scanned(self) -> None:
+        plan = {
+            'Node Type': 'Nested Loop',
+            'Actual Rows': 20,
+            'Plans': [
+                {'Node Type': 'Index Scan', 'Actual Rows': 20, 'Rows Removed by Filter': 5, 'Actual Loops': 1},
+                {
+                    'Node Type': 'Bitmap Heap Scan', 'Actual Rows': 1, 'Rows Removed by Index Recheck': 1,
+                    'Actual Loops': 20,
+                    'Plans': [{'Node Type': 'Bitmap Index Scan', 'Actual Rows': 2, 'Actual Loops': 20}],
+                },
+            ],
+        }
+        # Index entries of bitmap index scans are read again by their heap scans, so they aren't counted.
+        self.assertEqual(backend.benchmarks.search_latency.rows_scanned(plan), 25 + 2 * 20)
+
+    def test_clear_caches(self) -> None:
+        flask_app = flask.Flask(__name__)
+        extensions = (
+            backend.managers.product.ProductManager.SEARCH_CACHE_EXTENSION,
+            backend.managers.product.ProductManager.CARD_CACHE_EXTENSION,
+            backend.managers.product.ProductManager.SELLER_PRODUCTS_CACHE_EXTENSION,
+        )
+        for extension in extensions:
+            flask_app.extensions[extension] = backend.managers.cache.Cache(max_size=10, ttl_seconds=60)
+            flask_app.extensions[extension].set('key', 'value', 0)
+
+        with flask_app.app_context():
+            backend.benchmarks.search_latency.clear_caches()
+
+        for extension in extensions:
+            self.assertEmpty(flask_app.extensions[extension])
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -0,0 +1,217 @@
+r"""
+Seed a PostgreSQL database with synthetic users, products, pictures and reports for benchmarks.
+
+Rows are streamed to the database with COPY, which loads millions of rows in minutes instead of the hours
+row-by-row inserts take. Generated data is deterministic for a given '--random_seed'.
+
+Usage:
+    python -m backend.benchmarks.seed --db_host=localhost --db_port=5432 --db_name=benchmark \
+        --db_username=postgres --db_password=postgres --products=1000000 --reset
+"""
+import csv
+import datetime
+import io
+import random
+from typing import Iterable, Iterator
+
+from absl import app as absl_app
+from absl import flags
+from absl import logging
+
+import backend.benchmarks.common
+import backend.initializers.settings
+import backend.managers.normalization
+
+users = flags.DEFINE_integer(name='users', default=100_000, help='Number of users to create.')
+products = flags.DEFINE_integer(name='products', default=1_000_000, help='Number of products to create.')
+pictures_per_product = flags.DEFINE_integer(
+    name='pictures_per_product', default=2, help='Number of pictures of each product.'
+)
+reports = flags.DEFINE_integer(
+    name='reports', default=20_000, help='Number of product reports and of user reports to create.'
+)
+random_seed = flags.DEFINE_integer(name='random_seed', default=0, help='Seed of generated data.')
+reset = flags.DEFINE_boolean(
+    name='reset', default=False,
+    help='Drop and recreate all tables first. Seeding a non-empty database fails otherwise.'
+)
+
+# Fraction of rows with rare flags, which selective queries (e.g., admin lists) look for.
+BANNED_FRACTION = 0.001
+UNRESOLVED_REPORT_FRACTION = 0.1
+# Number of rows converted to CSV at once while streaming a table.
+COPY_CHUNK_ROWS = 10_000
+# Time span product creation dates are spread over.
+CREATED_AT_SPAN = datetime.timedelta(days=365)
+
+ADJECTIVES = [
+    'old', 'new', 'used', 'vintage', 'red', 'blue', 'black', 'white', 'large', 'small', 'wooden', 'electric',
+    'قدیمی', 'نو', 'کارکرده', 'سفید', 'مشکی', 'بزرگ', 'کوچک', 'چوبی',
+]
+NOUNS = [
+    'phone', 'laptop', 'chair', 'table', 'bicycle', 'car', 'watch', 'camera', 'sofa', 'lamp', 'book', 'guitar',
+    'گوشی', 'لپ\u200cتاپ', 'صندلی', 'میز', 'دوچرخه', 'ماشین', 'ساعت', 'دوربین', 'مبل', 'کتاب', 'یخچال',
+]
+CITIES = ['Tehran', 'Mashhad', 'Isfahan', 'Karaj', 'Shiraz', 'Tabriz', 'Kazan', 'Moscow', 'تهران', 'اصفهان']
+STATUSES = ['for sale'] * 8 + ['reserved', 'sold']
+CATEGORIES = [
+    'Others', 'Real-Estate', 'Automobile', 'Digital & Electronics', 'Kitchenware', 'Entertainment', 'Personal Items'
+]
+
+
+class CsvStream(io.TextIOBase):
+    """Read-only file of rows formatted as CSV on demand, so a table is copied without holding it in memory."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        super().__init__()
+        self._rows = iter(rows)
+        self._pending = ''
+
+    def _next_chunk(self) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for _, row in zip(range(COPY_CHUNK_ROWS), self._rows):
+            writer.writerow(row)
+        return buffer.getvalue()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._pending += chunk
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def generate_users(rng: random.Random, count: int) -> Iterator[tuple]:
+    """Yields rows of (username, password, email, is_banned, is_admin, is_verified)."""
+    for i in range(count):
+        yield f'user{i}', 'password', f'user{i}@example.com', rng.random() < BANNED_FRACTION, False, True
+
+
+def generate_products(rng: random.Random, count: int, users_count: int, now: datetime.datetime) -> Iterator[tuple]:
+    """
+    Yields rows of (id, user_username, created_at, name, price, city_name, description, status, is_banned,
+    category, name_normalized, description_normalized, city_name_normalized).
+    """
+    for i in range(1, count + 1):
+        name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}'
+        city_name = rng.choice(CITIES)
+        description = ' '.join(rng.choice(ADJECTIVES + NOUNS) for _ in range(rng.randint(5, 20)))
+        yield (
+            i,
+            f'user{rng.randrange(users_count)}',
+            now - CREATED_AT_SPAN * rng.random(),
+            name,
+            # Prices are log-uniform, as cheap products are much more common than expensive ones.
+            round(10 ** rng.uniform(0, 6), 2),
+            city_name,
+            description,
+            rng.choice(STATUSES),
+            rng.random() < BANNED_FRACTION,
+            rng.choice(CATEGORIES),
+            backend.managers.normalization.normalize_text(name),
+            backend.managers.normalization.normalize_text(description),
+            backend.managers.normalization.normalize_text(city_name),
+        )
+
+
+def generate_pictures(products_count: int, per_product: int) -> Iterator[tuple]:
+    """Yields rows of (id, filename, product_id)."""
+    for i in range(products_count * per_product):
+        product_id = i // per_product + 1
+        yield i + 1, f'product{product_id}_{i % per_product}.jpg', product_id
+
+
+def generate_reports(rng: random.Random, count: int, users_count: int, products_count: int) -> Iterator[tuple]:
+    """Yields rows of (id, reported, reporter_username, description, is_resolved) for product reports."""
+    for i in range(1, count + 1):
+        yield (
+            i, rng.randint(1, products_count), f'user{rng.randrange(users_count)}', 'report',
+            rng.random() >= UNRESOLVED_REPORT_FRACTION,
+        )
+
+
+def generate_user_reports(rng: random.Random, count: int, users_count: int) -> Iterator[tuple]:
+    """Yields rows of (id, reported, reporter_username, description, is_resolved) for user reports."""
+    for i in range(1, count + 1):
+        yield (
+            i, f'user{rng.randrange(users_count)}', f'user{rng.randrange(users_count)}', 'report',
+            rng.random() >= UNRESOLVED_REPORT_FRACTION,
+        )
+
+
+def copy_rows(cursor, table: str, columns: list, rows: Iterable[tuple]) -> None:
+    """Streams rows into the table by COPY and moves its id sequence past the copied ids, if it has one."""
+    logging.info('Copying rows of %s.', table)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", CsvStream(rows))
+    if 'id' in columns:
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 1)) FROM {table}")
+
+
+def seed() -> None:
+    """Create tables and fill them with generated rows, in the app context of the benchmark app."""
+    import backend.initializers.database
+    import backend.models.product
+
+    if reset.value:
+        backend.initializers.database.DB.drop_all()
+    backend.initializers.database.DB.create_all()
+    if backend.models.product.Product.query.limit(1).count():
+        raise ValueError('The database already has products, pass --reset to drop them.')
+
+    rng = random.Random(random_seed.value)
+    now = datetime.datetime.now()
+    connection = backend.initializers.database.DB.engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            copy_rows(
+                cursor, 'users', ['username', 'password', 'email', 'is_banned', 'is_admin', 'is_verified'],
+                generate_users(rng, users.value),
+            )
+            copy_rows(
+                cursor, 'products',
+                [
+                    'id', 'user_username', 'created_at', 'name', 'price', 'city_name', 'description', 'status',
+                    'is_banned', 'category', 'name_normalized', 'description_normalized', 'city_name_normalized',
+                ],
+                generate_products(rng, products.value, users.value, now),
+            )
+            copy_rows(
+                cursor, 'picture', ['id', 'filename', 'product_id'],
+                generate_pictures(products.value, pictures_per_product.value),
+            )
+            copy_rows(
+                cursor, 'product_reports',
+                ['id', 'reported_product', 'reporter_username', 'description', 'is_resolved'],
+                generate_reports(rng, reports.value, users.value, products.value),
+            )
+            copy_rows(
+                cursor, 'user_reports', ['id', 'reported_user', 'reporter_username', 'description', 'is_resolved'],
+                generate_user_reports(rng, reports.value, users.value),
+            )
+        connection.commit()
+        # Refresh planner statistics, as they would be on a production database.
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM ANALYZE')
+    finally:
+        connection.close()
+    logging.info('Seeded %d users and %d products.', users.value, products.value)
+
+
+def main(_: list[str]) -> None:
+    flask_app = backend.benchmarks.common.create_app()
+    with flask_app.app_context():
+        seed()
+
+
+if __name__ == '__main__':
+    backend.initializers.settings.set_unused_flag_defaults()
+    absl_app.run(main)
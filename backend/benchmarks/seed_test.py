@@ -0,0 +1,47 @@
+import csv
+import datetime
+import io
+import random
+
+from absl.testing import absltest
+
+import backend.benchmarks.seed
+import backend.managers.normalization
+import backend.models.product
+
+
+class SeedTest(absltest.TestCase):
+    def test_csv_stream_reads_rows_in_pieces(self) -> None:
+        rows = [(i, f'name, "{i}"', None, i % 2 == 0) for i in range(25_000)]
+        stream = backend.benchmarks.seed.CsvStream(rows)
+        pieces = []
+        while piece := stream.read(8192):
+            self.assertLessEqual(len(piece), 8192)
+            pieces.append(piece)
+
+        parsed = list(csv.reader(io.StringIO(''.join(pieces))))
+        self.assertLen(parsed, 25_000)
+        self.assertEqual(parsed[7], ['7', 'name, "7"', '', 'False'])
+
+    def test_generate_products_is_deterministic(self) -> None:
+        now = datetime.datetime(2024, 12, 1)
+        first = list(backend.benchmarks.seed.generate_products(random.Random(1), 100, 10, now))
+        second = list(backend.benchmarks.seed.generate_products(random.Random(1), 100, 10, now))
+
+        self.assertEqual(first, second)
+        self.assertEqual([product[0] for product in first], list(range(1, 101)))
+        for product in first:
+            # Normalized copies of searchable text are filled.
+            self.assertEqual(product[10], backend.managers.normalization.normalize_text(product[3]))
+            self.assertIn(product[7], backend.models.product.Product.STATUS_OPTIONS)
+            self.assertIn(product[9], backend.models.product.Product.CATEGORY_OPTIONS)
+
+    def test_generate_pictures(self) -> None:
+        pictures = list(backend.benchmarks.seed.generate_pictures(2, 2))
+        self.assertEqual(pictures, [
+            (1, 'product1_0.jpg', 1), (2, 'product1_1.jpg', 1), (3, 'product2_0.jpg', 2), (4, 'product2_1.jpg', 2),
+        ])
+
+
+if __name__ == "__main__":
+    absltest.main()
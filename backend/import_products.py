@@ -0,0 +1,67 @@
+r"""
+Import products of a seller from a CSV or NDJSON file, the same way the product import API does.
+
+The file is read and inserted in batches, so files of any size are imported within bounded memory. Invalid rows
+are skipped and logged with their line number.
+
+Usage:
+    python -m backend.import_products --db_host=localhost --db_port=5432 --db_name=app \
+        --db_username=postgres --db_password=postgres --import_seller=username --import_file=products.csv
+"""
+import os
+
+import flask
+from absl import app as absl_app
+from absl import flags
+from absl import logging
+
+# Load settings for the defined flags to be parsed before running the import.
+import backend.initializers.settings
+import backend.initializers.json_provider
+
+import_file = flags.DEFINE_string(
+    name='import_file', default=None, help='Path of the CSV (with a header row) or NDJSON file of products.',
+    required=True,
+)
+import_format = flags.DEFINE_enum(
+    name='import_format', default=None, enum_values=['csv', 'ndjson'],
+    help='Format of the imported file, given by its extension by default.'
+)
+import_seller = flags.DEFINE_string(
+    name='import_seller', default=None, help='Username of the seller of the products.', required=True
+)
+
+
+def main(_: list[str]) -> None:
+    import backend.app
+    import backend.managers.product
+    import backend.managers.product_import
+    import backend.models.user
+
+    file_format = import_format.value or os.path.splitext(import_file.value)[1].lstrip('.').lower()
+    if file_format not in backend.managers.product_import.MEDIA_TYPE_FORMATS.values():
+        raise absl_app.UsageError('Pass --import_format for files without a .csv or .ndjson extension.')
+
+    flask_app = flask.Flask(__name__)
+    backend.initializers.json_provider.init_app(flask_app)
+    backend.app.connect_to_db(flask_app)
+    backend.app.create_managers(flask_app)
+    with flask_app.app_context():
+        if not backend.models.user.User.query.filter_by(username=import_seller.value).first():
+            raise absl_app.UsageError(f'Seller {import_seller.value} does not exist.')
+        with open(import_file.value, 'rb') as file:
+            response, _ = backend.managers.product.ProductManager.instance.import_products(
+                import_seller.value, backend.managers.product_import.read_rows(file_format, file)
+            )
+        report = response.json
+
+    for error in report['errors']:
+        logging.warning('Line %d: %s', error['row'], error['message'])
+    if report['failed'] > len(report['errors']):
+        logging.warning('%d more rows failed.', report['failed'] - len(report['errors']))
+    logging.info('Created %d products, %d rows failed.', report['created'], report['failed'])
+
+
+if __name__ == '__main__':
+    backend.initializers.settings.set_unused_flag_defaults()
+    absl_app.run(main)
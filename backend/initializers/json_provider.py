@@ -0,0 +1,64 @@
+import datetime
+from typing import Any, Union
+
+import flask
+import flask.json.provider
+
+try:
+    import orjson
+except ImportError:  # The standard library serializer is used instead.
+    orjson = None
+
+
+class JSONProvider(flask.json.provider.DefaultJSONProvider):
+    """
+    JSON provider serializing with orjson when it's installed, and with the standard library otherwise.
+
+    Both serializers write dates and times in ISO 8601 format, so models may return them as they are instead
+    of converting them to strings. Responses are serialized straight to bytes by orjson, without an intermediate
+    string. Keys aren't sorted, since serialized models already have a fixed key order.
+    """
+
+    sort_keys = False
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """Convert objects which aren't natively serializable, writing dates and times in ISO 8601 format."""
+        if isinstance(o, (datetime.date, datetime.time)):
+            return o.isoformat()
+        return flask.json.provider.DefaultJSONProvider.default(o)
+
+    def _orjson_options(self) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON, falling back to the standard library for options orjson doesn't have."""
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialize data as JSON."""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> flask.Response:
+        """Serialize the given arguments as JSON, and return a response object with the 'application/json' mimetype."""
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None:
+            return super().response(obj)
+        options = self._orjson_options()
+        if self.compact is False or self.compact is None and self._app.debug:
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=options), mimetype=self.mimetype
+        )
+
+
+def init_app(flask_app: flask.Flask) -> None:
+    """Serialize JSON of the app, e.g., responses of 'flask.jsonify', by 'JSONProvider'."""
+    flask_app.json = JSONProvider(flask_app)
@@ -0,0 +1,70 @@
+import datetime
+from unittest import mock
+
+import flask
+from absl.testing import absltest
+
+import backend.initializers.json_provider
+
+PAYLOAD = {
+    'products': [{
+        'id': 1,
+        'created_at': datetime.datetime(2024, 5, 1, 12, 30, 15, 250000),
+        'name': 'گوشی',
+        'price': 10.5,
+        'pictures': ['picture.jpg'],
+        'seller': {'username': 'seller', 'first_name': None, 'is_banned': False},
+    }],
+    'counts': {1: 2},
+}
+EXPECTED = {
+    'products': [{
+        'id': 1,
+        'created_at': '2024-05-01T12:30:15.250000',
+        'name': 'گوشی',
+        'price': 10.5,
+        'pictures': ['picture.jpg'],
+        'seller': {'username': 'seller', 'first_name': None, 'is_banned': False},
+    }],
+    'counts': {'1': 2},
+}
+
+
+class JSONProviderTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.flask_app = flask.Flask(__name__)
+        backend.initializers.json_provider.init_app(self.flask_app)
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        self.app_context.pop()
+        super().tearDown()
+
+    def test_serializers_write_the_same_json(self) -> None:
+        serialized = flask.json.dumps(PAYLOAD)
+        with mock.patch.object(backend.initializers.json_provider, 'orjson', None):
+            fallback_serialized = flask.json.dumps(PAYLOAD)
+
+        self.assertEqual(flask.json.loads(serialized), EXPECTED)
+        self.assertEqual(flask.json.loads(fallback_serialized), EXPECTED)
+        # Keys keep the order of the serialized dictionaries.
+        self.assertLess(serialized.index('"products"'), serialized.index('"counts"'))
+
+    def test_jsonify(self) -> None:
+        response = flask.jsonify(PAYLOAD)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.json, EXPECTED)
+
+        with mock.patch.object(backend.initializers.json_provider, 'orjson', None):
+            response = flask.jsonify(PAYLOAD)
+        self.assertEqual(response.json, EXPECTED)
+
+    def test_dates(self) -> None:
+        self.assertEqual(flask.json.loads(flask.json.dumps([datetime.date(2024, 5, 1)])), ['2024-05-01'])
+        self.assertEqual(flask.json.loads(flask.json.dumps([datetime.time(8, 15)])), ['08:15:00'])
+
+
+if __name__ == "__main__":
+    absltest.main()
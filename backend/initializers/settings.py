@@ -52,6 +52,74 @@ app_secret_key = flags.DEFINE_string(
     required=True,
 )
 
+# Search configs.
+DEFAULT_SEARCH_SIMILARITY_THRESHOLD = 0.3
+search_similarity_threshold = flags.DEFINE_float(
+    name='search_similarity_threshold',
+    default=DEFAULT_SEARCH_SIMILARITY_THRESHOLD,
+    help='Minimum trigram similarity (0 to 1) of a product name to the name of a fuzzy search.',
+)
+DEFAULT_SEARCH_CACHE_SIZE = 1024
+search_cache_size = flags.DEFINE_integer(
+    name='search_cache_size',
+    default=DEFAULT_SEARCH_CACHE_SIZE,
+    help='Maximum number of product search results kept in memory, 0 disables the cache.',
+)
+DEFAULT_SEARCH_CACHE_TTL_SECONDS = 60
+search_cache_ttl_seconds = flags.DEFINE_integer(
+    name='search_cache_ttl_seconds',
+    default=DEFAULT_SEARCH_CACHE_TTL_SECONDS,
+    help='Number of seconds a cached product search result is served for.',
+)
+DEFAULT_PRODUCT_CARD_CACHE_SIZE = 10000
+product_card_cache_size = flags.DEFINE_integer(
+    name='product_card_cache_size',
+    default=DEFAULT_PRODUCT_CARD_CACHE_SIZE,
+    help='Maximum number of serialized products (with their seller) kept in memory, 0 disables the cache.',
+)
+# Cached products are keyed by their versions and can't go stale, the TTL only frees memory of cold ones.
+PRODUCT_CARD_CACHE_TTL_SECONDS = 3600
+DEFAULT_SELLER_PRODUCTS_CACHE_SIZE = 4096
+seller_products_cache_size = flags.DEFINE_integer(
+    name='seller_products_cache_size',
+    default=DEFAULT_SELLER_PRODUCTS_CACHE_SIZE,
+    help='Maximum number of pages of product lists of sellers kept in memory, 0 disables the cache.',
+)
+# Lists are dropped by writes of their seller, the TTL frees memory of cold pages.
+SELLER_PRODUCTS_CACHE_TTL_SECONDS = 30
+DEFAULT_SIMILARITY_REFRESH_SECONDS = 600
+similarity_refresh_seconds = flags.DEFINE_integer(
+    name='similarity_refresh_seconds',
+    default=DEFAULT_SIMILARITY_REFRESH_SECONDS,
+    help='Number of seconds the similar products index is used for, before it is rebuilt from the database.',
+)
+
+# Image processing configs.
+DEFAULT_IMAGE_WORKERS = 2
+image_workers = flags.DEFINE_integer(
+    name='image_workers',
+    default=DEFAULT_IMAGE_WORKERS,
+    help='Number of processes generating resized variants of uploaded pictures, 0 disables the variants.',
+)
+
+# Upload serving configs.
+uploads_accel_redirect_location = flags.DEFINE_string(
+    name='uploads_accel_redirect_location',
+    default=None,
+    help='Internal nginx location of the upload folder, e.g., /internal/uploads/. If set, uploaded files are sent '
+         'by nginx through an X-Accel-Redirect header instead of by the app.',
+)
+
+# Stored file removal configs.
+DEFAULT_FILE_REMOVAL_INTERVAL_SECONDS = 10
+file_removal_interval_seconds = flags.DEFINE_integer(
+    name='file_removal_interval_seconds',
+    default=DEFAULT_FILE_REMOVAL_INTERVAL_SECONDS,
+    help='Number of seconds between runs of the worker removing unreferenced uploaded files, 0 disables the worker.',
+)
+# Number of queued files checked and removed in a transaction.
+FILE_REMOVAL_BATCH_SIZE = 500
+
 # Verification email configs.
 mail_server_host = flags.DEFINE_string(
     name='mail_server_host',
@@ -78,6 +146,17 @@ mail_sender_password = flags.DEFINE_string(
 )
 
 
+def set_unused_flag_defaults() -> None:
+    """
+    Give placeholder defaults to required app flags which command line tools (e.g., benchmarks) don't use.
+
+    Tools neither sign tokens nor send emails, so only database flags have to be passed.
+    Must be called before flags are parsed.
+    """
+    for flag in (app_secret_key, mail_sender_email, mail_sender_password):
+        flags.FLAGS.set_default(flag.name, 'unused')
+
+
 class HTTPStatus(enum.Enum):
     """
     Represents an HTTP status code.
@@ -85,6 +164,7 @@ class HTTPStatus(enum.Enum):
     OK = 200
     CREATED = 201
     NO_CONTENT = 204
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     UNAUTHORIZED = 401
     FORBIDDEN = 403
@@ -93,3 +173,38 @@ class HTTPStatus(enum.Enum):
 
 # The directory which all databased changes are stored at.
 MIGRATIONS_DIRECTORY = 'backend/migrations'
+
+# The directory of uploaded files within the backend package, and the URL path they're served at.
+UPLOAD_FOLDER = 'uploads/'
+UPLOADS_URL_PATH = '/backend/uploads'
+# Uploaded files are never changed under the same name, so they're cached for a year.
+UPLOADS_CACHE_MAX_AGE_SECONDS = 365 * 24 * 60 * 60
+
+# Default and maximum number of products in a page of paginated search.
+SEARCH_PAGE_DEFAULT_LIMIT = 20
+SEARCH_PAGE_MAX_LIMIT = 100
+
+# Number of rows read from the database at once while streaming a response.
+STREAM_BATCH_SIZE = 500
+
+# Default width of price ranges counted by the search facets.
+FACETS_DEFAULT_PRICE_BUCKET_SIZE = 100
+
+# Maximum number of products fetched by a single batch request.
+PRODUCT_BATCH_MAX_IDS = 200
+
+# Default and maximum number of suggested product names and cities for a search box prefix.
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
+
+# Number of imported products inserted and committed at once, and maximum number of reported invalid rows.
+PRODUCT_IMPORT_BATCH_SIZE = 500
+PRODUCT_IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# Default and maximum number of products in a page of a seller's product list.
+PRODUCT_LIST_PAGE_DEFAULT_LIMIT = 20
+PRODUCT_LIST_PAGE_MAX_LIMIT = 100
+
+# Default and maximum number of similar products recommended for a product.
+SIMILAR_DEFAULT_LIMIT = 10
+SIMILAR_MAX_LIMIT = 50
@@ -1,6 +1,13 @@
+import contextlib
+from typing import Iterator
+
+import flask
+import sqlalchemy
 from absl import flags
 
 import backend.initializers.settings
+import backend.initializers.database
+import backend.initializers.json_provider
 
 
 def pass_flags_as_parsed() -> None:
@@ -13,3 +20,47 @@ def pass_flags_as_parsed() -> None:
     flags.FLAGS.__setattr__(backend.initializers.settings.app_secret_key.name, "app_secret_key")
     flags.FLAGS.__setattr__(backend.initializers.settings.mail_sender_email.name, "email@example.com")
     flags.FLAGS.__setattr__(backend.initializers.settings.mail_sender_password.name, "mail_password")
+
+
+def create_database_app(database_uri: str = 'sqlite://') -> flask.Flask:
+    """
+    Create a Flask app connected to a database with all tables created, an empty in-memory SQLite one by default.
+
+    The caller is responsible for pushing an app context of the returned app.
+    """
+    # Load database models to ensure their tables existence.
+    import backend.models.user
+    import backend.models.product
+    import backend.models.report
+    import backend.models.upload
+
+    flask_app = flask.Flask(__name__)
+    backend.initializers.json_provider.init_app(flask_app)
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    flask_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    flask_app.config['JWT_SECRET_KEY'] = 'app_secret_key'
+    backend.initializers.database.DB.init_app(flask_app)
+    with flask_app.app_context():
+        backend.initializers.database.DB.create_all()
+    return flask_app
+
+
+@contextlib.contextmanager
+def count_queries() -> Iterator[list]:
+    """
+    Record SQL statements executed on the database of the current app context.
+
+    Yields:
+        list: The executed statements, filled while the context is active.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = backend.initializers.database.DB.engine
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
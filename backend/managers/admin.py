@@ -1,5 +1,9 @@
 import flask
+import sqlalchemy.orm
 
+import backend.managers.product
+import backend.managers.streaming
+import backend.models.product
 import backend.models.report
 import backend.models.user
 import backend.initializers.settings
@@ -14,61 +18,99 @@ class AdminManager:
             self.flask_app = flask_app
             AdminManager.instance = self
 
-    def get_list_of_reported_products(self) -> (flask.Flask, int):
+    def get_list_of_reported_products(self, stream: bool = False) -> (flask.Flask, int):
         """
         Returns the list of reported products.
 
+        Args:
+            stream (bool): Whether to stream the list while reading it from the database in batches.
+
         Returns:
             tuple: A tuple containing:
                 - A Flask response object with a JSON message indicating success with product reports.
                 - An integer representing the HTTP status code indicating success.
         """
-        reported_products = backend.models.report.ProductReport.query.filter_by(is_resolved=False).all()
+        query = backend.models.report.ProductReport.query.filter_by(is_resolved=False)
+        if stream:
+            return (
+                backend.managers.streaming.query_list_response('reported_products', query),
+                backend.initializers.settings.HTTPStatus.OK.value
+            )
+        reported_products = query.all()
         return (
             flask.jsonify({"reported_products": [p.to_dict() for p in reported_products]}),
             backend.initializers.settings.HTTPStatus.OK.value
         )
 
-    def get_banned_product_list(self) -> (flask.Flask, int):
+    def get_banned_product_list(self, stream: bool = False) -> (flask.Flask, int):
         """
         Returns the list of banned products.
 
+        Args:
+            stream (bool): Whether to stream the list while reading it from the database in batches.
+
         Returns:
             tuple: A tuple containing:
                 - A Flask response object with a JSON message indicating success with product reports.
                 - An integer representing the HTTP status code indicating success.
         """
-        banned_products = backend.models.product.Product.query.filter_by(is_banned=True).all()
+        query = backend.models.product.Product.query.options(
+            sqlalchemy.orm.selectinload(backend.models.product.Product.pictures),
+        ).filter_by(is_banned=True)
+        if stream:
+            return (
+                backend.managers.streaming.query_list_response('banned_products', query),
+                backend.initializers.settings.HTTPStatus.OK.value
+            )
+        banned_products = query.all()
         return (
             flask.jsonify({"banned_products": [p.to_dict() for p in banned_products]}),
             backend.initializers.settings.HTTPStatus.OK.value
         )
 
-    def get_banned_user_list(self) -> (flask.Flask, int):
+    def get_banned_user_list(self, stream: bool = False) -> (flask.Flask, int):
         """
         Returns the list of banned users.
 
+        Args:
+            stream (bool): Whether to stream the list while reading it from the database in batches.
+
         Returns:
             tuple: A tuple containing:
                 - A Flask response object with a JSON message indicating success with product reports.
                 - An integer representing the HTTP status code indicating success.
         """
-        banned_users = backend.models.user.User.query.filter_by(is_banned=True).all()
+        query = backend.models.user.User.query.filter_by(is_banned=True)
+        if stream:
+            return (
+                backend.managers.streaming.query_list_response('banned_users', query),
+                backend.initializers.settings.HTTPStatus.OK.value
+            )
+        banned_users = query.all()
         return (
             flask.jsonify({"banned_users": [p.to_dict() for p in banned_users]}),
             backend.initializers.settings.HTTPStatus.OK.value
         )
 
-    def get_list_of_reported_users(self) -> (flask.Flask, int):
+    def get_list_of_reported_users(self, stream: bool = False) -> (flask.Flask, int):
         """
         Returns the list of reported users.
 
+        Args:
+            stream (bool): Whether to stream the list while reading it from the database in batches.
+
         Returns:
             tuple: A tuple containing:
                 - A Flask response object with a JSON message indicating success with user reports.
                 - An integer representing the HTTP status code indicating success.
         """
-        reported_users = backend.models.report.UserReport.query.filter_by(is_resolved=False).all()
+        query = backend.models.report.UserReport.query.filter_by(is_resolved=False)
+        if stream:
+            return (
+                backend.managers.streaming.query_list_response('reported_users', query),
+                backend.initializers.settings.HTTPStatus.OK.value
+            )
+        reported_users = query.all()
         return (
             flask.jsonify({"reported_users": [p.to_dict() for p in reported_users]}),
             backend.initializers.settings.HTTPStatus.OK.value
@@ -96,9 +138,16 @@ class AdminManager:
             backend.initializers.database.DB.session.add(report)
 
         # Ban user.
+        was_visible = not user.is_banned
         user.is_banned = True
+        user.bump_version()
         backend.initializers.database.DB.session.add(user)
         backend.initializers.database.DB.session.commit()
+        # Banning changes visibility of products in search results.
+        backend.managers.product.ProductManager.invalidate_search_cache()
+        backend.managers.product.ProductManager.invalidate_seller_product_cards(username)
+        if was_visible:
+            backend.managers.product.ProductManager.update_seller_suggestions(username, visible=False)
         return (
             flask.jsonify({"message": "User banned successfully."}),
             backend.initializers.settings.HTTPStatus.OK.value
@@ -126,9 +175,17 @@ class AdminManager:
             backend.initializers.database.DB.session.add(report)
 
         # Ban product.
+        suggested = backend.managers.product.ProductManager.suggested_entries(product)
+        seller_username = product.user_username
         product.is_banned = True
+        product.bump_version()
         backend.initializers.database.DB.session.add(product)
         backend.initializers.database.DB.session.commit()
+        # Banning changes visibility of products in search results.
+        backend.managers.product.ProductManager.invalidate_search_cache()
+        backend.managers.product.ProductManager.invalidate_product_cards([id])
+        backend.managers.product.ProductManager.invalidate_seller_products(seller_username)
+        backend.managers.product.ProductManager.update_suggestions(removed=suggested)
         return (
             flask.jsonify({"message": "Product banned successfully."}),
             backend.initializers.settings.HTTPStatus.OK.value
@@ -152,9 +209,16 @@ class AdminManager:
             )
 
         # Ban user.
+        was_visible = not user.is_banned
         user.is_banned = False
+        user.bump_version()
         backend.initializers.database.DB.session.add(user)
         backend.initializers.database.DB.session.commit()
+        # Banning changes visibility of products in search results.
+        backend.managers.product.ProductManager.invalidate_search_cache()
+        backend.managers.product.ProductManager.invalidate_seller_product_cards(username)
+        if not was_visible:
+            backend.managers.product.ProductManager.update_seller_suggestions(username, visible=True)
         return (
             flask.jsonify({"message": "User unbanned successfully."}),
             backend.initializers.settings.HTTPStatus.OK.value
@@ -179,9 +243,18 @@ class AdminManager:
             )
 
         # Ban user.
+        was_banned = product.is_banned
+        seller_username = product.user_username
         product.is_banned = False
+        suggested = backend.managers.product.ProductManager.suggested_entries(product) if was_banned else []
+        product.bump_version()
         backend.initializers.database.DB.session.add(product)
         backend.initializers.database.DB.session.commit()
+        # Banning changes visibility of products in search results.
+        backend.managers.product.ProductManager.invalidate_search_cache()
+        backend.managers.product.ProductManager.invalidate_product_cards([product_id])
+        backend.managers.product.ProductManager.invalidate_seller_products(seller_username)
+        backend.managers.product.ProductManager.update_suggestions(added=suggested)
         return (
             flask.jsonify({"message": "Product unbanned successfully."}),
             backend.initializers.settings.HTTPStatus.OK.value
@@ -26,6 +26,8 @@ class UserManagerTest(absltest.TestCase):
         self.mock_user_report_query = mock.patch("backend.models.report.UserReport.query").start()
         self.mock_user_query = mock.patch("backend.models.user.User.query").start()
         self.mock_product_query = mock.patch("backend.models.product.Product.query").start()
+        # Loading pictures along with products keeps the query chain unchanged.
+        self.mock_product_query.options.return_value = self.mock_product_query
 
     def tearDown(self) -> None:
         self.mock_db_session.stop()
@@ -182,9 +184,9 @@ class UserManagerTest(absltest.TestCase):
         self.mock_product_query.filter_by.return_value.all.return_value = products
         response, status_code = self.admin_manager.get_banned_product_list()
         self.assertEqual(status_code, backend.initializers.settings.HTTPStatus.OK.value)
-        self.assertEqual(response.json, {'banned_products': [{'category': None, 'city_name': None, 'created_at': None, 'description': None, 'id': 1, 'name': None, 'pictures': [], 'price': None, 'status': None, 'user_username': None, 'is_banned': True},
-                                                                     {'category': None, 'city_name': None, 'created_at': None, 'description': None, 'id': 2, 'name': None, 'pictures': [], 'price': None, 'status': None, 'user_username': None, 'is_banned': True},
-                                                                     {'category': None, 'city_name': None, 'created_at': None, 'description': None, 'id': 3, 'name': None, 'pictures': [], 'price': None, 'status': None, 'user_username': None, 'is_banned': True}]})
+        self.assertEqual(response.json, {'banned_products': [{'category': None, 'city_name': None, 'created_at': None, 'description': None, 'id': 1, 'name': None, 'pictures': [], 'picture_variants': [], 'price': None, 'status': None, 'user_username': None, 'is_banned': True},
+                                                                     {'category': None, 'city_name': None, 'created_at': None, 'description': None, 'id': 2, 'name': None, 'pictures': [], 'picture_variants': [], 'price': None, 'status': None, 'user_username': None, 'is_banned': True},
+                                                                     {'category': None, 'city_name': None, 'created_at': None, 'description': None, 'id': 3, 'name': None, 'pictures': [], 'picture_variants': [], 'price': None, 'status': None, 'user_username': None, 'is_banned': True}]})
 
 
     def test_get_banned_users_list(self) -> None:
@@ -195,9 +197,9 @@ class UserManagerTest(absltest.TestCase):
         self.mock_user_query.filter_by.return_value.all.return_value = users
         response, status_code = self.admin_manager.get_banned_user_list()
         self.assertEqual(status_code, backend.initializers.settings.HTTPStatus.OK.value)
-        self.assertEqual(response.json, {'banned_users': [{'email': None, 'first_name': None, 'is_admin': None, 'is_banned': True, 'is_verified': None, 'last_name': None, 'phone_number': None, 'profile_picture': None, 'username': 'user1', 'address': None},
-                                                                  {'email': None, 'first_name': None, 'is_admin': None, 'is_banned': True, 'is_verified': None, 'last_name': None, 'phone_number': None, 'profile_picture': None, 'username': 'user2', 'address': None},
-                                                                  {'email': None, 'first_name': None, 'is_admin': None, 'is_banned': True, 'is_verified': None, 'last_name': None, 'phone_number': None, 'profile_picture': None, 'username': 'user3', 'address': None}]})
+        self.assertEqual(response.json, {'banned_users': [{'email': None, 'first_name': None, 'is_admin': None, 'is_banned': True, 'is_verified': None, 'last_name': None, 'phone_number': None, 'profile_picture': None, 'profile_picture_variants': {}, 'username': 'user1', 'address': None},
+                                                                  {'email': None, 'first_name': None, 'is_admin': None, 'is_banned': True, 'is_verified': None, 'last_name': None, 'phone_number': None, 'profile_picture': None, 'profile_picture_variants': {}, 'username': 'user2', 'address': None},
+                                                                  {'email': None, 'first_name': None, 'is_admin': None, 'is_banned': True, 'is_verified': None, 'last_name': None, 'phone_number': None, 'profile_picture': None, 'profile_picture_variants': {}, 'username': 'user3', 'address': None}]})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+import bisect
+import heapq
+import threading
+from typing import Iterable, Optional
+
+import backend.managers.normalization
+
+
+class PrefixIndex:
+    """
+    In-memory index of terms by prefix, counting how many times each term was added.
+
+    Distinct terms are kept in a sorted list, so terms starting with a prefix are a contiguous range found by
+    binary search. Adding a new term or removing the last occurrence of one shifts the list once, which is
+    cheap (a memory move) even for hundreds of thousands of terms.
+    """
+
+    def __init__(self):
+        self._terms = []
+        # Number of occurrences and the most recently added original text of each normalized term.
+        self._counts = {}
+        self._texts = {}
+        self._lock = threading.Lock()
+
+    def add(self, text: Optional[str]) -> None:
+        """
+        Adds an occurrence of the text, indexed by its normalized form. Empty texts are ignored.
+        """
+        term = backend.managers.normalization.normalize_text(text)
+        if not term:
+            return
+        with self._lock:
+            if term not in self._counts:
+                bisect.insort(self._terms, term)
+                self._counts[term] = 0
+            self._counts[term] += 1
+            self._texts[term] = ' '.join(text.split())
+
+    def remove(self, text: Optional[str]) -> None:
+        """
+        Removes an occurrence of the text added before, dropping its term with the last occurrence.
+        """
+        term = backend.managers.normalization.normalize_text(text)
+        with self._lock:
+            if not term or term not in self._counts:
+                return
+            self._counts[term] -= 1
+            if self._counts[term] <= 0:
+                del self._terms[bisect.bisect_left(self._terms, term)]
+                del self._counts[term]
+                del self._texts[term]
+
+    def suggest(self, prefix: str, limit: int) -> list:
+        """
+        Returns the most frequent terms starting with the normalized prefix.
+
+        Args:
+            prefix (str): Normalized prefix of the terms.
+            limit (int): Maximum number of returned terms.
+
+        Returns:
+            list: Dictionaries of the 'text' and 'count' of terms, the most frequent first and then alphabetically.
+        """
+        with self._lock:
+            start = bisect.bisect_left(self._terms, prefix)
+            # Every term starting with the prefix sorts before the prefix followed by the largest code point.
+            end = bisect.bisect_left(self._terms, prefix + '\U0010ffff', lo=start)
+            terms = heapq.nsmallest(limit, self._terms[start:end], key=lambda term: (-self._counts[term], term))
+            return [{'text': self._texts[term], 'count': self._counts[term]} for term in terms]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._terms)
+
+
+class ProductSuggestions:
+    """Prefix indexes of names and cities of visible products, which search box suggestions are served from."""
+
+    def __init__(self):
+        self.names = PrefixIndex()
+        self.cities = PrefixIndex()
+
+    def add(self, products: Iterable) -> None:
+        """Adds products, given as (name, city_name) pairs, e.g., rows of a query."""
+        for name, city_name in products:
+            self.names.add(name)
+            self.cities.add(city_name)
+
+    def remove(self, products: Iterable) -> None:
+        """Removes products added before, given as (name, city_name) pairs."""
+        for name, city_name in products:
+            self.names.remove(name)
+            self.cities.remove(city_name)
@@ -0,0 +1,58 @@
+from absl.testing import absltest
+
+import backend.managers.autocomplete
+
+
+class PrefixIndexTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.index = backend.managers.autocomplete.PrefixIndex()
+
+    def test_suggest_ranks_by_count_then_alphabetically(self) -> None:
+        for text in ['Phone case', 'Phone', 'phone', 'Photo frame', 'Laptop', 'Phone case']:
+            self.index.add(text)
+
+        self.assertEqual(self.index.suggest('ph', 10), [
+            {'text': 'phone', 'count': 2},
+            {'text': 'Phone case', 'count': 2},
+            {'text': 'Photo frame', 'count': 1},
+        ])
+        self.assertEqual(self.index.suggest('ph', 1), [{'text': 'phone', 'count': 2}])
+        self.assertEqual(self.index.suggest('x', 10), [])
+        self.assertLen(self.index, 4)
+
+    def test_suggest_matches_normalized_prefix(self) -> None:
+        self.index.add('گوشي  موبايل')  # Arabic Yeh, and repeated whitespace.
+
+        self.assertEqual(self.index.suggest('گوشی', 10), [{'text': 'گوشي موبايل', 'count': 1}])
+
+    def test_add_ignores_empty_texts(self) -> None:
+        self.index.add(None)
+        self.index.add('  ')
+        self.assertLen(self.index, 0)
+
+    def test_remove(self) -> None:
+        self.index.add('Phone')
+        self.index.add('phone')
+        self.index.remove('PHONE')
+        self.assertEqual(self.index.suggest('p', 10), [{'text': 'phone', 'count': 1}])
+
+        self.index.remove('phone')
+        self.index.remove('missing')
+        self.index.remove(None)
+        self.assertEqual(self.index.suggest('p', 10), [])
+        self.assertLen(self.index, 0)
+
+
+class ProductSuggestionsTest(absltest.TestCase):
+    def test_add_and_remove(self) -> None:
+        suggestions = backend.managers.autocomplete.ProductSuggestions()
+        suggestions.add([('Phone', 'Tehran'), ('Table', 'Tabriz')])
+        suggestions.remove([('Table', 'Tabriz')])
+
+        self.assertEqual(suggestions.names.suggest('t', 10), [])
+        self.assertEqual(suggestions.cities.suggest('t', 10), [{'text': 'Tehran', 'count': 1}])
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -0,0 +1,67 @@
+import collections
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+
+class Cache:
+    """
+    Size-bounded in-process cache, evicting least recently used entries and expiring entries after a TTL.
+
+    Entries are invalidated all at once by 'clear', which also bumps the cache generation. A value computed
+    before an invalidation is stored only if the generation read before computing it is still current,
+    so a write racing with a read can't leave a stale value behind.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the value cached for the key, or None if there is no fresh value for it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        """
+        Caches the value for the key, unless the cache has been cleared since 'generation' was read.
+        """
+        with self._lock:
+            if generation != self.generation or self.max_size <= 0:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Removes the entry of the key, if there is one.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all the entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
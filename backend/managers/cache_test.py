@@ -0,0 +1,70 @@
+from unittest import mock
+
+from absl.testing import absltest
+
+import backend.managers.cache
+
+
+class CacheTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.mock_monotonic = mock.patch('time.monotonic', return_value=100.0).start()
+        self.cache = backend.managers.cache.Cache(max_size=2, ttl_seconds=10)
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        super().tearDown()
+
+    def test_delete(self) -> None:
+        self.cache.set('key', 'value', self.cache.generation)
+        self.cache.set('other', 'value', self.cache.generation)
+        self.cache.delete('key')
+        self.cache.delete('missing')
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.get('other'), 'value')
+
+    def test_get_returns_cached_value(self) -> None:
+        self.cache.set('key', 'value', self.cache.generation)
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        self.cache.set('first', 1, self.cache.generation)
+        self.cache.set('second', 2, self.cache.generation)
+        # Reading makes the first entry the most recently used one.
+        self.cache.get('first')
+        self.cache.set('third', 3, self.cache.generation)
+
+        self.assertLen(self.cache, 2)
+        self.assertEqual(self.cache.get('first'), 1)
+        self.assertIsNone(self.cache.get('second'))
+        self.assertEqual(self.cache.get('third'), 3)
+
+    def test_entry_expires_after_ttl(self) -> None:
+        self.cache.set('key', 'value', self.cache.generation)
+        self.mock_monotonic.return_value = 109.0
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.mock_monotonic.return_value = 110.0
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEmpty(self.cache)
+
+    def test_clear_drops_entries_and_values_computed_before_it(self) -> None:
+        generation = self.cache.generation
+        self.cache.set('key', 'value', generation)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('key'))
+
+        # A value read before clearing is stale.
+        self.cache.set('key', 'stale', generation)
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set('key', 'fresh', self.cache.generation)
+        self.assertEqual(self.cache.get('key'), 'fresh')
+
+    def test_zero_size_disables_cache(self) -> None:
+        cache = backend.managers.cache.Cache(max_size=0, ttl_seconds=10)
+        cache.set('key', 'value', cache.generation)
+        self.assertIsNone(cache.get('key'))
+
+
+if __name__ == "__main__":
+    absltest.main()
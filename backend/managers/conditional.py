@@ -0,0 +1,40 @@
+import hashlib
+from typing import Optional
+
+import flask
+
+import backend.initializers.settings
+
+
+def etag(*parts) -> str:
+    """
+    Create a strong ETag of a representation from the parts which determine it, e.g., row versions and fields.
+
+    Parts must change whenever the representation does, and must have a deterministic 'repr'.
+    """
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def not_modified_response(entity_tag: str) -> Optional[tuple]:
+    """
+    Create a 304 response if the client already has the representation with the ETag, without serializing it.
+
+    Args:
+        entity_tag (str): ETag of the current representation.
+
+    Returns:
+        tuple: A response tuple with status 304, or None if the current request doesn't match the ETag.
+    """
+    if not flask.has_request_context() or not flask.request.if_none_match.contains(entity_tag):
+        return None
+    return (
+        with_etag(flask.Response(status=backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value), entity_tag),
+        backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value
+    )
+
+
+def with_etag(response: flask.Response, entity_tag: str) -> flask.Response:
+    """Set the ETag of a response, and ask clients to revalidate it before reusing a cached copy."""
+    response.set_etag(entity_tag)
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,45 @@
+import flask
+from absl.testing import absltest
+
+import backend.initializers.settings
+import backend.managers.conditional
+
+
+class ConditionalTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.flask_app = flask.Flask(__name__)
+
+    def test_etag_changes_with_parts(self) -> None:
+        self.assertEqual(
+            backend.managers.conditional.etag('product', 1, 2), backend.managers.conditional.etag('product', 1, 2)
+        )
+        self.assertNotEqual(
+            backend.managers.conditional.etag('product', 1, 2), backend.managers.conditional.etag('product', 1, 3)
+        )
+
+    def test_not_modified_response_matches_if_none_match(self) -> None:
+        entity_tag = backend.managers.conditional.etag('product', 1, 1)
+        with self.flask_app.test_request_context(headers={'If-None-Match': f'"{entity_tag}"'}):
+            response, status = backend.managers.conditional.not_modified_response(entity_tag)
+            self.assertEqual(status, backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value)
+            self.assertEqual(response.get_etag(), (entity_tag, False))
+            self.assertEqual(response.get_data(), b'')
+
+            self.assertIsNone(backend.managers.conditional.not_modified_response('other'))
+
+    def test_not_modified_response_without_if_none_match(self) -> None:
+        with self.flask_app.test_request_context():
+            self.assertIsNone(backend.managers.conditional.not_modified_response('etag'))
+        with self.flask_app.app_context():
+            self.assertIsNone(backend.managers.conditional.not_modified_response('etag'))
+
+    def test_with_etag(self) -> None:
+        with self.flask_app.app_context():
+            response = backend.managers.conditional.with_etag(flask.jsonify({}), 'etag')
+        self.assertEqual(response.headers['ETag'], '"etag"')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+
+if __name__ == "__main__":
+    absltest.main()
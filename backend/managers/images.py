@@ -0,0 +1,127 @@
+import concurrent.futures
+import multiprocessing
+import os
+from typing import Callable, Optional
+
+import flask
+from absl import logging
+from PIL import Image
+from PIL import ImageOps
+
+import backend.initializers.settings
+
+# Key of the pool of image processes in 'flask_app.extensions'.
+IMAGE_PROCESSOR_EXTENSION = 'image_processor'
+# Maximum width and height of each variant of an uploaded picture, the aspect ratio is kept.
+VARIANT_SIZES = {
+    'thumbnail': (200, 200),
+    'card': (600, 600),
+    'full': (1600, 1600),
+}
+# Variants are WebP files, which uploads never are, so their names can't collide with an uploaded file.
+VARIANT_EXTENSION = '.webp'
+VARIANT_QUALITY = 80
+
+
+def upload_folder() -> str:
+    """Returns the directory which uploaded files of the current app are stored at."""
+    return f"./backend/{flask.current_app.config.get('UPLOAD_FOLDER', backend.initializers.settings.UPLOAD_FOLDER)}"
+
+
+def variant_filename(filename: str, variant: str) -> str:
+    """Returns the name of the file of a variant of an uploaded picture."""
+    return f'{os.path.splitext(filename)[0]}_{variant}{VARIANT_EXTENSION}'
+
+
+def variant_source_stem(filename: str) -> str:
+    """Returns the name of an uploaded picture without its extension, given the name of the picture or of a variant."""
+    stem, extension = os.path.splitext(filename)
+    if extension == VARIANT_EXTENSION:
+        for variant in VARIANT_SIZES:
+            if stem.endswith(f'_{variant}'):
+                return stem[:-len(variant) - 1]
+    return stem
+
+
+def variant_filenames(filename: str) -> list:
+    """Returns names of the files of all variants of an uploaded picture, whether they're generated or not."""
+    return [variant_filename(filename, variant) for variant in VARIANT_SIZES]
+
+
+def generate_variants(folder: str, filename: str) -> dict:
+    """
+    Writes resized variants of an uploaded picture next to it, see 'VARIANT_SIZES'.
+
+    Runs in a worker process, so it must not use the app or the database.
+    Pictures are rotated by their EXIF orientation, since the metadata is stripped from the variants,
+    and are never enlarged. Uploads are stored by their contents, so existing variants are reused as they are.
+
+    Args:
+        folder (str): The directory of uploaded files.
+        filename (str): Name of the uploaded picture.
+
+    Returns:
+        dict: Names of the files of the variants, by the name of the variant.
+    """
+    variants = {variant: variant_filename(filename, variant) for variant in VARIANT_SIZES}
+    missing = [variant for variant, name in variants.items() if not os.path.exists(os.path.join(folder, name))]
+    if not missing:
+        return variants
+    with Image.open(os.path.join(folder, filename)) as image:
+        image = ImageOps.exif_transpose(image)
+        # Transparency is kept, animated GIFs are reduced to their first frame.
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        for variant in missing:
+            resized = image.copy()
+            resized.thumbnail(VARIANT_SIZES[variant], Image.Resampling.LANCZOS)
+            # Written aside and moved into place, so a variant being generated for another upload is never
+            # served half-written.
+            directory, name = os.path.split(os.path.join(folder, variants[variant]))
+            temporary_path = os.path.join(directory, f'.{name}.{os.getpid()}')
+            resized.save(temporary_path, 'WEBP', quality=VARIANT_QUALITY)
+            os.replace(temporary_path, os.path.join(folder, variants[variant]))
+    return variants
+
+
+def process_picture(filename: str, record: Callable) -> None:
+    """
+    Generates variants of an uploaded picture off the request path, in the process pool of the current app.
+
+    Args:
+        filename (str): Name of the uploaded picture, which must be saved already.
+        record (Callable): Stores names of the variants, by the name of the variant, on the picture. It's called
+            within an app context once the variants are written.
+    """
+    executor = _executor()
+    if executor is None:
+        return
+    flask_app = flask.current_app._get_current_object()
+
+    def done(future: concurrent.futures.Future) -> None:
+        # Called by a thread of the pool in this process, which doesn't have the app context of the request.
+        try:
+            variants = future.result()
+        except Exception as e:
+            logging.warning('Failed to generate variants of picture %s: %s', filename, e)
+            return
+        try:
+            with flask_app.app_context():
+                record(variants)
+        except Exception as e:
+            logging.error('Failed to record variants of picture %s: %s', filename, e)
+
+    executor.submit(generate_variants, upload_folder(), filename).add_done_callback(done)
+
+
+def _executor() -> Optional[concurrent.futures.ProcessPoolExecutor]:
+    """Returns the process pool of the current app, created on first use, or None if processing is disabled."""
+    extensions = flask.current_app.extensions
+    if IMAGE_PROCESSOR_EXTENSION not in extensions:
+        workers = flask.current_app.config.get('IMAGE_WORKERS', backend.initializers.settings.DEFAULT_IMAGE_WORKERS)
+        # Workers are spawned rather than forked, so they don't inherit database connections of the app.
+        # Processes start on the first submitted picture, so a pool created by a racing request costs nothing.
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+        ) if workers > 0 else None
+        extensions.setdefault(IMAGE_PROCESSOR_EXTENSION, executor)
+    return extensions[IMAGE_PROCESSOR_EXTENSION]
@@ -0,0 +1,119 @@
+import concurrent.futures
+import os
+import tempfile
+from unittest import mock
+
+import flask
+from absl.testing import absltest
+from PIL import Image
+
+import backend.managers.images
+
+
+class ImagesTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.folder = temporary_directory.name
+
+    def test_generate_variants_resizes_without_enlarging(self) -> None:
+        Image.new('RGB', (1000, 500), 'red').save(os.path.join(self.folder, 'phone.jpg'))
+
+        variants = backend.managers.images.generate_variants(self.folder, 'phone.jpg')
+
+        self.assertEqual(variants, {
+            'thumbnail': 'phone_thumbnail.webp', 'card': 'phone_card.webp', 'full': 'phone_full.webp'
+        })
+        sizes = {}
+        for variant, filename in variants.items():
+            with Image.open(os.path.join(self.folder, filename)) as image:
+                self.assertEqual(image.format, 'WEBP')
+                sizes[variant] = image.size
+        self.assertEqual(sizes, {'thumbnail': (200, 100), 'card': (600, 300), 'full': (1000, 500)})
+
+    def test_generate_variants_reuses_existing_variants(self) -> None:
+        Image.new('RGB', (1000, 500), 'red').save(os.path.join(self.folder, 'phone.jpg'))
+        backend.managers.images.generate_variants(self.folder, 'phone.jpg')
+        os.remove(os.path.join(self.folder, 'phone.jpg'))
+
+        # The picture isn't read again, since all of its variants exist.
+        variants = backend.managers.images.generate_variants(self.folder, 'phone.jpg')
+
+        self.assertEqual(variants['thumbnail'], 'phone_thumbnail.webp')
+        self.assertLen(os.listdir(self.folder), 3)
+
+    def test_generate_variants_applies_exif_orientation(self) -> None:
+        image = Image.new('RGB', (400, 200), 'red')
+        exif = image.getexif()
+        exif[0x0112] = 6  # Orientation: rotated 90 degrees clockwise.
+        image.save(os.path.join(self.folder, 'phone.jpg'), exif=exif)
+
+        variants = backend.managers.images.generate_variants(self.folder, 'phone.jpg')
+
+        with Image.open(os.path.join(self.folder, variants['thumbnail'])) as thumbnail:
+            self.assertEqual(thumbnail.size, (100, 200))
+
+    def test_generate_variants_keeps_transparency(self) -> None:
+        Image.new('RGBA', (10, 10), (0, 0, 0, 0)).save(os.path.join(self.folder, 'logo.png'))
+
+        variants = backend.managers.images.generate_variants(self.folder, 'logo.png')
+
+        with Image.open(os.path.join(self.folder, variants['card'])) as card:
+            self.assertEqual(card.mode, 'RGBA')
+
+
+class ProcessPictureTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.folder = temporary_directory.name
+        Image.new('RGB', (300, 300), 'red').save(os.path.join(self.folder, 'phone.jpg'))
+        self.flask_app = flask.Flask(__name__)
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+        # A thread pool runs the same code as the process pool, without spawning processes.
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.flask_app.extensions[backend.managers.images.IMAGE_PROCESSOR_EXTENSION] = self.executor
+        mock.patch.object(backend.managers.images, 'upload_folder', return_value=self.folder).start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        self.app_context.pop()
+        super().tearDown()
+
+    def test_process_picture_records_variants(self) -> None:
+        record = mock.Mock(return_value=True)
+
+        backend.managers.images.process_picture('phone.jpg', record)
+        self.executor.shutdown(wait=True)
+
+        record.assert_called_once_with({
+            'thumbnail': 'phone_thumbnail.webp', 'card': 'phone_card.webp', 'full': 'phone_full.webp'
+        })
+        self.assertTrue(os.path.exists(os.path.join(self.folder, 'phone_thumbnail.webp')))
+
+    def test_process_picture_ignores_invalid_images(self) -> None:
+        with open(os.path.join(self.folder, 'broken.jpg'), 'wb') as file:
+            file.write(b'not an image')
+        record = mock.Mock()
+
+        backend.managers.images.process_picture('broken.jpg', record)
+        self.executor.shutdown(wait=True)
+
+        record.assert_not_called()
+
+    def test_process_picture_is_disabled_without_workers(self) -> None:
+        del self.flask_app.extensions[backend.managers.images.IMAGE_PROCESSOR_EXTENSION]
+        self.flask_app.config['IMAGE_WORKERS'] = 0
+        record = mock.Mock()
+
+        backend.managers.images.process_picture('phone.jpg', record)
+
+        record.assert_not_called()
+        self.assertIsNone(self.flask_app.extensions[backend.managers.images.IMAGE_PROCESSOR_EXTENSION])
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -0,0 +1,47 @@
+from typing import Optional
+
+# Arabic code points which are typed in place of their Persian equivalents, and digits which are mapped to ASCII.
+_CHARACTER_MAPPING = {
+    'ي': 'ی',  # Arabic yeh -> Persian yeh.
+    'ى': 'ی',  # Alef maksura -> Persian yeh.
+    'ك': 'ک',  # Arabic kaf -> Persian keheh.
+    'ة': 'ه',  # Teh marbuta -> heh.
+    'ۀ': 'ه',  # Heh with yeh above -> heh.
+    'أ': 'ا',  # Alef with hamza above -> alef.
+    'إ': 'ا',  # Alef with hamza below -> alef.
+    **{chr(0x06f0 + digit): str(digit) for digit in range(10)},  # Persian digits.
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits.
+}
+# Characters which are dropped: zero-width (non-)joiners and marks, tatweel and diacritics.
+_REMOVED_CHARACTERS = [
+    '\u200c',  # Zero-width non-joiner.
+    '\u200d',  # Zero-width joiner.
+    '\u200e',  # Left-to-right mark.
+    '\u200f',  # Right-to-left mark.
+    '\ufeff',  # Zero-width no-break space.
+    '\u0640',  # Tatweel.
+    '\u0670',  # Superscript alef.
+    *[chr(code_point) for code_point in range(0x064b, 0x0660)],  # Diacritics.
+]
+_TRANSLATION_TABLE = str.maketrans({
+    **_CHARACTER_MAPPING,
+    **{character: None for character in _REMOVED_CHARACTERS},
+})
+
+
+def normalize_text(text: Optional[str]) -> Optional[str]:
+    """
+    Normalize text for searching, so different spellings of the same Persian/Arabic text become equal.
+
+    Arabic variants of letters are mapped to Persian ones, Persian and Arabic digits to ASCII digits,
+    zero-width characters, tatweel and diacritics are removed, case is folded and whitespace is collapsed.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text, or None if text is None.
+    """
+    if text is None:
+        return None
+    return ' '.join(text.translate(_TRANSLATION_TABLE).casefold().split())
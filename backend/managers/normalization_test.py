@@ -0,0 +1,35 @@
+from absl.testing import absltest
+
+import backend.managers.normalization
+
+
+class NormalizationTest(absltest.TestCase):
+    def test_arabic_letters_become_persian(self) -> None:
+        """Test Arabic variants of yeh and kaf are mapped to Persian ones."""
+        self.assertEqual(
+            backend.managers.normalization.normalize_text('كيف'),
+            backend.managers.normalization.normalize_text('کیف'),
+        )
+
+    def test_digits_become_ascii(self) -> None:
+        """Test Persian and Arabic-Indic digits are mapped to ASCII digits."""
+        self.assertEqual(backend.managers.normalization.normalize_text('۱۲۳ ٤٥٦'), '123 456')
+
+    def test_invisible_characters_and_diacritics_are_removed(self) -> None:
+        """Test zero-width non-joiner, tatweel and diacritics are removed."""
+        self.assertEqual(
+            backend.managers.normalization.normalize_text('کتاب\u200cهـــاَ'),
+            backend.managers.normalization.normalize_text('کتابها'),
+        )
+
+    def test_case_and_whitespace_are_normalized(self) -> None:
+        """Test case is folded and whitespace is collapsed."""
+        self.assertEqual(backend.managers.normalization.normalize_text('  Apple \t iPhone\n'), 'apple iphone')
+
+    def test_none(self) -> None:
+        """Test None is kept as is."""
+        self.assertIsNone(backend.managers.normalization.normalize_text(None))
+
+
+if __name__ == "__main__":
+    absltest.main()
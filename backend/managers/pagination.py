@@ -0,0 +1,97 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import Optional
+
+import sqlalchemy
+
+
+def order_by_clauses(keys: list) -> list:
+    """
+    Build ORDER BY clauses for a list of sort keys.
+
+    Args:
+        keys (list): List of (column, descending) tuples, the last one must be unique (e.g., primary key).
+
+    Returns:
+        list: The clauses to pass to 'order_by'.
+    """
+    return [column.desc() if descending else column.asc() for column, descending in keys]
+
+
+def seek_condition(keys: list, values: list) -> sqlalchemy.ColumnElement:
+    """
+    Build the WHERE condition which skips every row up to (and including) the cursor position.
+
+    Args:
+        keys (list): List of (column, descending) tuples the query is ordered by.
+        values (list): Values of the sort keys of the last row of the previous page.
+
+    Returns:
+        sqlalchemy.ColumnElement: The condition selecting rows strictly after the cursor.
+    """
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        # All keys have the same direction, so a row-value comparison can be used, which is answered
+        # directly by a composite index scan.
+        columns = sqlalchemy.tuple_(*[column for column, _ in keys])
+        cursor = sqlalchemy.tuple_(*values)
+        return columns < cursor if directions.pop() else columns > cursor
+
+    # Mixed directions: (k1 after v1) OR (k1 = v1 AND k2 after v2) OR ...
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [prefix_column == value for (prefix_column, _), value in zip(keys[:i], values[:i])]
+        after = column < values[i] if descending else column > values[i]
+        clauses.append(sqlalchemy.and_(*equal_prefix, after))
+    return sqlalchemy.or_(*clauses)
+
+
+def encode_cursor(keys: list, row) -> str:
+    """
+    Encode sort key values of a row as an opaque cursor.
+
+    Args:
+        keys (list): List of (column, descending) tuples the query is ordered by.
+        row: The last returned row of the page.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    values = []
+    for column, _ in keys:
+        value = getattr(row, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime.datetime) else value)
+    payload = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(keys: list, cursor: str) -> Optional[list]:
+    """
+    Decode a cursor created by 'encode_cursor' for the same sort keys.
+
+    Args:
+        keys (list): List of (column, descending) tuples the query is ordered by.
+        cursor (str): The cursor received from the client.
+
+    Returns:
+        list: Values of the sort keys, or None if the cursor is malformed or belongs to another ordering.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != len(keys):
+        return None
+    try:
+        for i, (column, _) in enumerate(keys):
+            if isinstance(column.type, sqlalchemy.DateTime):
+                values[i] = datetime.datetime.fromisoformat(values[i])
+            elif isinstance(column.type, (sqlalchemy.Integer, sqlalchemy.Float)):
+                if isinstance(values[i], bool) or not isinstance(values[i], (int, float)):
+                    return None
+    except (TypeError, ValueError):
+        return None
+    return values
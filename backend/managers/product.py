@@ -1,11 +1,25 @@
-import os
-import datetime
+import json
+import threading
+import time
+import functools
+from typing import Callable, Collection, Iterable, Optional
 
 import flask
+import sqlalchemy.orm
 
 import backend.models.product
 import backend.initializers.database
 import backend.initializers.settings
+import backend.managers.autocomplete
+import backend.managers.cache
+import backend.managers.conditional
+import backend.managers.images
+import backend.managers.normalization
+import backend.managers.pagination
+import backend.managers.product_import
+import backend.managers.similarity
+import backend.managers.storage
+import backend.managers.streaming
 import backend.models.user
 import backend.models.report
 import flask_jwt_extended
@@ -13,6 +27,18 @@ import flask_jwt_extended
 
 class ProductManager:
     instance = None
+    # Key of the search results cache in 'flask_app.extensions'.
+    SEARCH_CACHE_EXTENSION = 'product_search_cache'
+    # Key of the cache of serialized products with their seller, in 'flask_app.extensions'.
+    CARD_CACHE_EXTENSION = 'product_card_cache'
+    # Key of the prefix indexes of product names and cities in 'flask_app.extensions'.
+    SUGGESTIONS_EXTENSION = 'product_suggestions'
+    # Key of the cache of product lists of sellers in 'flask_app.extensions'.
+    SELLER_PRODUCTS_CACHE_EXTENSION = 'seller_products_cache'
+    # Key of the index of similar products in 'flask_app.extensions'.
+    SIMILARITY_EXTENSION = 'product_similarity'
+    # Key of the lock held while the index of similar products is built, in 'flask_app.extensions'.
+    SIMILARITY_LOCK_EXTENSION = 'product_similarity_lock'
 
     def __init__(self, flask_app: flask.Flask):
         if not ProductManager.instance:
@@ -41,102 +67,694 @@ class ProductManager:
             category=product_data['category'],
             city_name=product_data.get('city_name', ''),
         )
+        self._normalize_search_fields(new_product)
+        suggested = [(new_product.name, new_product.city_name)]
         backend.initializers.database.DB.session.add(new_product)
         backend.initializers.database.DB.session.commit()
+        self.update_suggestions(added=suggested)
 
-        # Iterate over the list of pictures to save each one.
-        for file, filename in zip(product_data['images'], product_data['images_path']):
-            # Generate a new filename by appending a timestamp to avoid duplicate name.
-            base, extension = os.path.splitext(filename)
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            new_filename = f"{base}_{timestamp}{extension}"
-            file_path = f"./backend/{flask.current_app.config['UPLOAD_FOLDER']}{new_filename}"
-            file.save(file_path)
-            # Create a new Picture instance associated with the newly created product.
-            new_picture = backend.models.product.Picture(
-                filename=new_filename,
-                product_id=new_product.id,
-            )
-            backend.initializers.database.DB.session.add(new_picture)
-
+        pictures = self._save_pictures(new_product.id, product_data['images'], product_data['images_path'])
         backend.initializers.database.DB.session.commit()
+        self._process_pictures(pictures)
+        self.invalidate_search_cache()
+        self.invalidate_seller_products(product_data['user_username'])
         return (
             flask.jsonify({"message": "Product created successfully."}),
             backend.initializers.settings.HTTPStatus.CREATED.value
         )
 
-    def search_product(self, filters: dict) -> (flask.Flask, int):
+    def import_products(self, user_username: str, rows: Iterable) -> (flask.Flask, int):
+        """
+        Create products of a seller from rows of an imported file, skipping and reporting invalid rows.
+
+        Valid rows are inserted by multi-row INSERT statements in batches of 'PRODUCT_IMPORT_BATCH_SIZE', each one
+        committed on its own, so memory use doesn't grow with the size of the file.
+
+        Args:
+            user_username (str): Username of the seller of the products.
+            rows (Iterable): Rows of the file, as 'backend.managers.product_import.read_rows' yields them.
+                Values of rows are validated by 'backend.managers.product_import.validate_product'.
+
+        Returns:
+            tuple: A tuple containing:
+                - A Flask response object containing the number of 'created' products, the number of 'failed'
+                  rows and 'errors' of the first 'PRODUCT_IMPORT_MAX_REPORTED_ERRORS' failed rows, each one with
+                  the line number of the 'row' and an error 'message'.
+                - An integer representing the HTTP status code (200 for success).
+        """
+        created = 0
+        failed = 0
+        errors = []
+        batch = []
+        for row_number, values, error in rows:
+            if error is None:
+                product_data, error = backend.managers.product_import.validate_product(values)
+            if error is not None:
+                failed += 1
+                if len(errors) < backend.initializers.settings.PRODUCT_IMPORT_MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'message': error})
+                continue
+            batch.append(product_data)
+            if len(batch) == backend.initializers.settings.PRODUCT_IMPORT_BATCH_SIZE:
+                self._insert_products(user_username, batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            self._insert_products(user_username, batch)
+            created += len(batch)
+
+        return (
+            flask.jsonify({'created': created, 'failed': failed, 'errors': errors}),
+            backend.initializers.settings.HTTPStatus.OK.value
+        )
+
+    def _insert_products(self, user_username: str, batch: list) -> None:
+        """Inserts and commits a batch of validated products of a seller, without loading them into the session."""
+        backend.initializers.database.DB.session.execute(sqlalchemy.insert(backend.models.product.Product), [
+            {
+                **product_data,
+                'user_username': user_username,
+                'name_normalized': backend.managers.normalization.normalize_text(product_data['name']),
+                'description_normalized': backend.managers.normalization.normalize_text(product_data['description']),
+                'city_name_normalized': backend.managers.normalization.normalize_text(product_data['city_name']),
+            }
+            for product_data in batch
+        ])
+        backend.initializers.database.DB.session.commit()
+        self.invalidate_search_cache()
+        self.invalidate_seller_products(user_username)
+        self.update_suggestions(added=[(product_data['name'], product_data['city_name']) for product_data in batch])
+
+    @staticmethod
+    def _normalize_search_fields(product: backend.models.product.Product) -> None:
+        """Fills the normalized copies of a product's searchable text."""
+        product.name_normalized = backend.managers.normalization.normalize_text(product.name)
+        product.description_normalized = backend.managers.normalization.normalize_text(product.description)
+        product.city_name_normalized = backend.managers.normalization.normalize_text(product.city_name)
+
+    def search_product(
+            self, filters: dict, stream: bool = False, fields: Optional[dict] = None
+    ) -> (flask.Flask, int):
         """
         Search for products based on various filters.
 
         This method constructs a query to search for products in the database
-        based on the provided filters. It supports filtering by name, price range,
-        status, and sorting by creation date or price. The results are returned
-        in JSON format along with a 200 OK status code.
+        based on the provided filters. It supports full-text search, filtering by
+        name, price range, status, and sorting by creation date, price or relevance.
+        Banned products and products of banned sellers are never returned. The results
+        are returned in JSON format along with a 200 OK status code.
 
         Args:
             filters (dict): A dictionary containing filter criteria for the search.
+                - 'q' (str): A full-text query matched against product names and descriptions.
                 - 'name' (str): A substring to search for in product names.
+                  Text filters must be normalized by 'backend.managers.normalization.normalize_text'.
+                - 'fuzzy' (bool): Whether to match 'name' by trigram similarity, ranking the most similar first.
+                - 'city_name' (str): A substring to search for in product city names.
                 - 'min_price' (float): Minimum price for filtering products.
                 - 'max_price' (float): Maximum price for filtering products.
                 - 'status' (list): List of statuses of the product.
                 - 'category' (list): List of categories of the product (e.g., 'for sale', 'sold').
                 - 'sort_created_at' (str): Sorting order for creation date ('asc' or 'dsc').
                 - 'sort_price' (str): Sorting order for price ('asc' or 'dsc').
+                - 'sort_relevance' (str): Sorting order for relevance to 'q' ('asc' or 'dsc').
+                - 'limit' (int): Maximum number of products in a page. If given, results are paginated
+                  and the response contains 'next_cursor' (None on the last page).
+                - 'cursor' (str): Opaque cursor returned as 'next_cursor' of the previous page.
+            stream (bool): Whether to stream unpaginated results while reading them from the database,
+                instead of loading them all first. Streamed results aren't cached.
+            fields (dict): Fields of products to return, mapped to the fields of their 'seller' (None for all of
+                them). Only columns and relationships of these fields are loaded. All fields are returned by default.
 
         Returns:
             tuple: A tuple containing:
                 - A Flask response object containing the JSON representation of the products.
+                - An integer representing the HTTP status code (200 for success, 400 for invalid cursor).
+        """
+        if stream and 'limit' not in filters:
+            return self._stream_search_product(filters, fields)
+        return self._cached_search_response(
+            'products', {**filters, 'fields': self._fields_cache_key(fields)},
+            lambda: self._search_product_in_database(filters, fields),
+        )
+
+    def search_facets(self, filters: dict, price_bucket_size: int) -> (flask.Flask, int):
+        """
+        Count products matching search filters per category, per status and per price range.
+
+        All the counts are computed by a single aggregate query over the products which 'search_product' would
+        return for the same filters.
+
+        Args:
+            filters (dict): Filter criteria of 'search_product', sorting and pagination are not used.
+            price_bucket_size (int): Width of price ranges of the price histogram.
+
+        Returns:
+            tuple: A tuple containing:
+                - A Flask response object containing the total number of products and counts of each facet value.
+                  Price ranges without products are left out, a range contains prices in ['min', 'max').
                 - An integer representing the HTTP status code (200 for success).
         """
-        query = backend.models.product.Product.query
+        return self._cached_search_response(
+            'facets', {**filters, 'price_bucket_size': price_bucket_size},
+            lambda: self._search_facets_in_database(filters, price_bucket_size),
+        )
+
+    def _search_facets_in_database(self, filters: dict, price_bucket_size: int) -> (flask.Flask, int):
+        """Runs the aggregate query of 'search_facets'."""
+        if filters.get('fuzzy'):
+            self._set_similarity_threshold()
+        product = backend.models.product.Product
+        # The bucket size is rendered inline, so the grouped expression is identical to the selected one.
+        price_bucket = sqlalchemy.func.floor(
+            product.price / sqlalchemy.literal(price_bucket_size, sqlalchemy.Integer, literal_execute=True)
+        ).label('price_bucket')
+        facets = [product.category, product.status, price_bucket]
+        count = sqlalchemy.func.count().label('count')
+
+        def aggregate(group_by: list) -> sqlalchemy.Select:
+            return sqlalchemy.select(*facets, count).select_from(product).join(product.seller).where(
+                *self._search_conditions(filters)
+            ).group_by(*group_by)
+
+        if backend.initializers.database.DB.session.get_bind().dialect.name == 'postgresql':
+            # Every facet and the total are aggregated in a single scan of the matching rows.
+            # Columns out of the grouping set of a row are NULL, and the facets themselves are never NULL.
+            statement = aggregate([sqlalchemy.func.grouping_sets(
+                *[sqlalchemy.tuple_(facet) for facet in facets], sqlalchemy.tuple_()
+            )])
+        else:
+            # Equivalent union of a GROUP BY per facet for databases without grouping sets.
+            statement = sqlalchemy.union_all(*[
+                aggregate([facet]).with_only_columns(
+                    *[column if column is facet else sqlalchemy.null().label(column.key) for column in facets], count
+                )
+                for facet in facets
+            ], aggregate([]).with_only_columns(*[sqlalchemy.null().label(column.key) for column in facets], count))
+
+        total = 0
+        categories, statuses, prices = {}, {}, []
+        for category, status, bucket, bucket_count in backend.initializers.database.DB.session.execute(statement):
+            if category is not None:
+                categories[category] = bucket_count
+            elif status is not None:
+                statuses[status] = bucket_count
+            elif bucket is not None:
+                price_min = int(bucket) * price_bucket_size
+                prices.append({'min': price_min, 'max': price_min + price_bucket_size, 'count': bucket_count})
+            else:
+                total = bucket_count
+        prices.sort(key=lambda price: price['min'])
+
+        return flask.jsonify({
+            'total': total,
+            'category': categories,
+            'status': statuses,
+            'price': prices,
+        }), backend.initializers.settings.HTTPStatus.OK.value
+
+    def _cached_search_response(self, kind: str, filters: dict, search: Callable) -> (flask.Flask, int):
+        """
+        Returns the response of 'search()', serving it from the search cache if possible.
+
+        Serialized responses of the same kind and filters are reused until a product or seller changes.
+        """
+        cache = self._search_cache()
+        cache_key = self._search_cache_key(kind, filters)
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            return (
+                flask.current_app.response_class(cached_response, mimetype='application/json'),
+                backend.initializers.settings.HTTPStatus.OK.value
+            )
+
+        generation = cache.generation
+        response, status = search()
+        if status == backend.initializers.settings.HTTPStatus.OK.value:
+            cache.set(cache_key, response.get_data(), generation)
+        return response, status
+
+    @staticmethod
+    def _search_cache() -> backend.managers.cache.Cache:
+        """Returns the search results cache of the current app, creating it on first use."""
+        extensions = flask.current_app.extensions
+        if ProductManager.SEARCH_CACHE_EXTENSION not in extensions:
+            extensions.setdefault(ProductManager.SEARCH_CACHE_EXTENSION, backend.managers.cache.Cache(
+                max_size=flask.current_app.config.get(
+                    'SEARCH_CACHE_SIZE', backend.initializers.settings.DEFAULT_SEARCH_CACHE_SIZE
+                ),
+                ttl_seconds=flask.current_app.config.get(
+                    'SEARCH_CACHE_TTL_SECONDS', backend.initializers.settings.DEFAULT_SEARCH_CACHE_TTL_SECONDS
+                ),
+            ))
+        return extensions[ProductManager.SEARCH_CACHE_EXTENSION]
+
+    @staticmethod
+    def _search_cache_key(kind: str, filters: dict) -> str:
+        """Returns the cache key of search filters, equal for filters which select the same results."""
+        # Order of statuses and categories doesn't change the results.
+        return json.dumps(
+            [kind, {key: sorted(value) if isinstance(value, list) else value for key, value in filters.items()}],
+            sort_keys=True,
+        )
+
+    @staticmethod
+    def _fields_cache_key(fields: Optional[dict]) -> Optional[list]:
+        """Returns requested fields as a sorted list of field names, where fields of the seller are dotted."""
+        if fields is None:
+            return None
+        return sorted(
+            field if nested_fields is None else f'{field}.{nested_field}'
+            for field, nested_fields in fields.items()
+            for nested_field in (nested_fields or [None])
+        )
+
+    @staticmethod
+    def invalidate_search_cache() -> None:
+        """
+        Drops cached search results of the current app.
+
+        Must be called after committing any change to products or sellers which may appear in search results.
+        """
+        cache = flask.current_app.extensions.get(ProductManager.SEARCH_CACHE_EXTENSION)
+        if cache is not None:
+            cache.clear()
+
+    def _search_product_in_database(self, filters: dict, fields: Optional[dict]) -> (flask.Flask, int):
+        """Runs the search query of 'search_product' and serializes its results."""
+        if filters.get('fuzzy'):
+            self._set_similarity_threshold()
+        # Cards are only spliced if they're cached, otherwise products are loaded by a single query.
+        if fields is None and self._card_cache().max_size > 0:
+            return self._search_product_cards(filters)
+
+        # Paginated results are sorted in SQL and the next page is seeked by the last returned sort keys.
+        if 'limit' in filters:
+            keys = self._search_sort_keys(filters)
+            # Sort keys are loaded even if they aren't requested, since the next page's cursor is built from them.
+            sort_columns = [
+                column for column, _ in keys if not isinstance(column, sqlalchemy.sql.expression.Label)
+            ]
+            query = self._query_with_seller_and_pictures(fields, sort_columns).filter(
+                *self._search_conditions(filters)
+            )
+            for column, _ in keys:
+                if isinstance(column, sqlalchemy.sql.expression.Label):
+                    # Load computed sort keys (e.g., rank) of products as their attributes.
+                    query = query.options(sqlalchemy.orm.with_expression(
+                        getattr(backend.models.product.Product, column.key), column
+                    ))
+            return self._search_product_page(
+                query, filters,
+                lambda products, next_cursor: flask.jsonify({
+                    "products": [self._product_with_seller_dict(product, fields) for product in products],
+                    "next_cursor": next_cursor,
+                }),
+            )
+
+        # Execute the query and get results.
+        query = self._query_with_seller_and_pictures(fields).filter(*self._search_conditions(filters))
+        products = self._sort_search_query(query, filters).all()
+        products_as_dicts = [self._product_with_seller_dict(product, fields) for product in products]
+
+        return flask.jsonify({"products": products_as_dicts}), backend.initializers.settings.HTTPStatus.OK.value
+
+    def _search_product_cards(self, filters: dict) -> (flask.Flask, int):
+        """
+        Runs the search query of 'search_product' for all fields, splicing serialized products from the card cache.
+
+        The search query only selects IDs and versions of the matching products (and sort keys of a page), then
+        products missing from the cache are loaded with their seller and pictures by a single 'IN' query.
+        """
+        product = backend.models.product.Product
+        query = self._card_rows_query().filter(*self._search_conditions(filters))
+
+        if 'limit' in filters:
+            # Sort keys are selected too, since the next page's cursor is built from them.
+            query = query.add_columns(*(
+                column for column, _ in self._search_sort_keys(filters) if column is not product.id
+            ))
+            return self._search_product_page(
+                query, filters,
+                lambda rows, next_cursor: self._cards_response(rows, {'next_cursor': next_cursor}),
+            )
+        return (
+            self._cards_response(self._sort_search_query(query, filters).all()),
+            backend.initializers.settings.HTTPStatus.OK.value
+        )
+
+    @staticmethod
+    def _card_rows_query():
+        """Returns a query of rows of product IDs and versions, which '_product_cards' serializes."""
+        product = backend.models.product.Product
+        return backend.initializers.database.DB.session.query(
+            product.id, product.version.label('product_version'),
+            backend.models.user.User.version.label('seller_version'),
+        ).select_from(product).join(product.seller)
+
+    def _cards_response(self, rows: list, extra: Optional[dict] = None) -> flask.Response:
+        """
+        Returns the JSON response {'products': [...], **extra} for rows of product IDs and versions.
+
+        Args:
+            rows (list): Rows with 'id', 'product_version' and 'seller_version' of products, in response order.
+            extra (dict): Other JSON serializable items of the response.
+        """
+        cards = self._product_cards(rows)
+        body = [b'{"products":[', b','.join(cards), b']']
+        for key, value in (extra or {}).items():
+            body.append(f',{flask.json.dumps(key)}:{flask.json.dumps(value)}'.encode())
+        body.append(b'}')
+        return flask.current_app.response_class(b''.join(body), mimetype='application/json')
+
+    def _product_cards(self, rows: list) -> list:
+        """
+        Returns serialized products (with their seller) of rows of product IDs and versions, in the same order.
+
+        Cards are reused while versions of both the product and its seller are unchanged, so writes never
+        leave a stale card behind. Missing cards are loaded by a single query, along with their pictures.
+        Products deleted since the rows were read are left out.
+        """
+        cache = self._card_cache()
+        cards = {}
+        missing_ids = []
+        for row in rows:
+            entry = cache.get(row.id)
+            if entry is not None and entry[0] == (row.product_version, row.seller_version):
+                cards[row.id] = entry[1]
+            else:
+                missing_ids.append(row.id)
+
+        if missing_ids:
+            generation = cache.generation
+            products = self._query_with_seller_and_pictures().filter(
+                backend.models.product.Product.id.in_(missing_ids)
+            ).all()
+            for product in products:
+                card = flask.json.dumps(self._product_with_seller_dict(product)).encode()
+                cards[product.id] = card
+                cache.set(product.id, ((product.version, product.seller.version), card), generation)
+        return [cards[row.id] for row in rows if row.id in cards]
+
+    @staticmethod
+    def _card_cache() -> backend.managers.cache.Cache:
+        """Returns the product card cache of the current app, creating it on first use."""
+        extensions = flask.current_app.extensions
+        if ProductManager.CARD_CACHE_EXTENSION not in extensions:
+            extensions.setdefault(ProductManager.CARD_CACHE_EXTENSION, backend.managers.cache.Cache(
+                max_size=flask.current_app.config.get(
+                    'PRODUCT_CARD_CACHE_SIZE', backend.initializers.settings.DEFAULT_PRODUCT_CARD_CACHE_SIZE
+                ),
+                ttl_seconds=backend.initializers.settings.PRODUCT_CARD_CACHE_TTL_SECONDS,
+            ))
+        return extensions[ProductManager.CARD_CACHE_EXTENSION]
+
+    @staticmethod
+    def invalidate_product_cards(product_ids: Collection[int]) -> None:
+        """
+        Drops cached cards of products of the current app.
+
+        Cards are keyed by versions, so this only frees memory of cards which won't be served anymore.
+        Should be called after committing a change to the products.
+        """
+        cache = flask.current_app.extensions.get(ProductManager.CARD_CACHE_EXTENSION)
+        if cache is not None:
+            for product_id in product_ids:
+                cache.delete(product_id)
+
+    @staticmethod
+    def invalidate_seller_product_cards(username: str) -> None:
+        """Drops cached cards of products of a seller of the current app, after committing a change to the seller."""
+        if flask.current_app.extensions.get(ProductManager.CARD_CACHE_EXTENSION) is None:
+            return
+        product_ids = backend.initializers.database.DB.session.scalars(
+            sqlalchemy.select(backend.models.product.Product.id).where(
+                backend.models.product.Product.user_username == username
+            )
+        ).all()
+        ProductManager.invalidate_product_cards(product_ids)
+
+    def _stream_search_product(self, filters: dict, fields: Optional[dict]) -> (flask.Flask, int):
+        """Streams all the results of 'search_product', reading them from the database in batches."""
+        if filters.get('fuzzy'):
+            self._set_similarity_threshold()
+        query = self._query_with_seller_and_pictures(fields).filter(*self._search_conditions(filters))
+        return (
+            backend.managers.streaming.query_list_response(
+                'products', self._sort_search_query(query, filters),
+                lambda product: self._product_with_seller_dict(product, fields),
+            ),
+            backend.initializers.settings.HTTPStatus.OK.value
+        )
+
+    def _sort_search_query(self, query, filters: dict):
+        """Returns the unpaginated search query sorted by the sorting options of filters."""
+        # Sort based on relevance to the full-text query if asked.
+        if 'sort_relevance' in filters:
+            if filters['sort_relevance'] == 'dsc':
+                query = query.order_by(self._search_rank(filters['q']).desc())
+            elif filters['sort_relevance'] == 'asc':
+                query = query.order_by(self._search_rank(filters['q']).asc())
+
+        # Rank fuzzy matches by their similarity.
+        if filters.get('fuzzy') and 'name' in filters:
+            query = query.order_by(self._search_similarity(filters['name']).desc())
+
+        # Sort based on created_at time if asked.
+        if 'sort_created_at' in filters:
+            if filters['sort_created_at'] == 'dsc':
+                query = query.order_by(backend.models.product.Product.created_at.desc())
+            elif filters['sort_created_at'] == 'asc':
+                query = query.order_by(backend.models.product.Product.created_at.asc())
+
+        # Sort based on price if asked.
+        if 'sort_price' in filters:
+            if filters['sort_price'] == 'dsc':
+                query = query.order_by(backend.models.product.Product.price.desc())
+            elif filters['sort_price'] == 'asc':
+                query = query.order_by(backend.models.product.Product.price.asc())
+
+        return query
+
+    @staticmethod
+    def _search_conditions(filters: dict) -> list:
+        """
+        Returns the WHERE conditions of a product search.
+
+        Visibility rules are part of the conditions, so the database only returns rows which are shipped to
+        the client. The query must be joined with the sellers.
+        """
+        conditions = [
+            # Banned products and products of banned sellers are hidden.
+            backend.models.product.Product.is_banned.isnot(True),
+            backend.models.user.User.is_banned.isnot(True),
+        ]
+
+        # Check for full-text query in filters, answered by the GIN index on the search document.
+        if 'q' in filters:
+            conditions.append(
+                backend.models.product.Product.search_vector.op('@@')(ProductManager._full_text_query(filters['q']))
+            )
 
         # Check for name in filters and apply similarity filtering
         if 'name' in filters:
             name_filter = filters['name']
-            # Using ILIKE for case-insensitive matching.
-            query = query.filter(backend.models.product.Product.name.ilike(f'%{name_filter}%'))
+            if filters.get('fuzzy'):
+                # Using trigram similarity above the threshold, which tolerates typos.
+                conditions.append(backend.models.product.Product.name_normalized.op('%')(name_filter))
+            else:
+                # Using ILIKE for case-insensitive matching, which is answered by the trigram index too.
+                conditions.append(backend.models.product.Product.name_normalized.ilike(f'%{name_filter}%'))
+
+        # Check for city name in filters.
+        if 'city_name' in filters:
+            city_name_filter = filters['city_name']
+            conditions.append(backend.models.product.Product.city_name_normalized.ilike(f'%{city_name_filter}%'))
 
         # Check for price range in filters.
         if 'min_price' in filters and 'max_price' in filters:
             min_price = filters['min_price']
             max_price = filters['max_price']
-            query = query.filter(backend.models.product.Product.price.between(min_price, max_price))
+            conditions.append(backend.models.product.Product.price.between(min_price, max_price))
 
         # Check for status in filters.
         if 'status' in filters:
             status_filter = filters['status']
-            query = query.filter(backend.models.product.Product.status.in_(status_filter))
+            conditions.append(backend.models.product.Product.status.in_(status_filter))
 
         # Check for category in filters.
         if 'category' in filters:
             category_filter = filters['category']
-            query = query.filter(backend.models.product.Product.category.in_(category_filter))
+            conditions.append(backend.models.product.Product.category.in_(category_filter))
 
-        # Sort based on created_at time if asked.
-        if 'sort_created_at' in filters:
-            if filters['sort_created_at'] == 'dsc':
-                query = query.order_by(backend.models.product.Product.created_at.desc())
-            elif filters['sort_created_at'] == 'asc':
-                query = query.order_by(backend.models.product.Product.created_at.asc())
+        return conditions
 
-        # Sort based on price if asked.
-        if 'sort_price' in filters:
-            if filters['sort_price'] == 'dsc':
-                query = query.order_by(backend.models.product.Product.price.desc())
-            elif filters['sort_price'] == 'asc':
-                query = query.order_by(backend.models.product.Product.price.asc())
+    @staticmethod
+    def _query_with_seller_and_pictures(fields: Optional[dict] = None, required_columns: Collection = ()):
+        """
+        Returns a product query which loads sellers and pictures along with the products.
 
-        # Execute the query and get results.
-        products = query.all()
-        products_as_dicts = [product.to_dict() for product in products if not product.is_banned]
-        for product in products_as_dicts:
-            seller = backend.models.user.User.query.get(product['user_username'])
-            product['seller'] = seller.to_dict()
+        Sellers are fetched by a join in the same statement, and pictures of all returned products are fetched
+        by a single additional 'IN' query, so the number of round-trips does not grow with the result size.
 
-        return flask.jsonify({"products": products_as_dicts}), backend.initializers.settings.HTTPStatus.OK.value
+        Args:
+            fields (dict): Requested fields of products, see 'search_product'. Only their columns are loaded.
+            required_columns (Collection): Columns of products to load even if they aren't requested.
+        """
+        query = backend.models.product.Product.query.join(backend.models.product.Product.seller)
+        return query.options(*ProductManager._product_load_options(
+            fields, sqlalchemy.orm.contains_eager, required_columns=required_columns
+        ))
 
-    def get_product(self, product_id: int) -> (flask.Flask, int):
+    @staticmethod
+    def _product_load_options(
+            fields: Optional[dict], seller_loader: Callable = sqlalchemy.orm.joinedload,
+            required_columns: Collection = (), required_seller_columns: Collection = (),
+    ) -> list:
+        """
+        Returns loader options of a product query which load only the requested fields of products.
+
+        Args:
+            fields (dict): Requested fields of products, see 'search_product'. All fields are loaded if None.
+            seller_loader (Callable): Loader strategy of the seller, if it's requested.
+            required_columns (Collection): Columns of products to load even if they aren't requested.
+            required_seller_columns (Collection): Columns of the seller to load with its requested fields.
+        """
+        product = backend.models.product.Product
+        if fields is None:
+            return [seller_loader(product.seller), sqlalchemy.orm.selectinload(product.pictures)]
+
+        options = []
+        if 'seller' in fields:
+            seller_option = seller_loader(product.seller)
+            if fields['seller'] is not None:
+                seller_option = seller_option.load_only(
+                    *(getattr(backend.models.user.User, field) for field in fields['seller']),
+                    *required_seller_columns
+                )
+            options.append(seller_option)
+        if any(field in fields for field in product.PICTURE_FIELDS):
+            options.append(sqlalchemy.orm.selectinload(product.pictures))
+        # Products are identified by ID, so it's loaded even if not requested.
+        columns = {product.id, *required_columns}
+        columns.update(getattr(product, field) for field in fields if field not in ('seller', *product.PICTURE_FIELDS))
+        options.append(sqlalchemy.orm.load_only(*columns))
+        return options
+
+    @staticmethod
+    def _product_with_seller_dict(product: backend.models.product.Product, fields: Optional[dict] = None) -> dict:
+        """Converts a product to a dictionary which embeds its seller's info, with only the requested fields."""
+        product_dict = product.to_dict(fields)
+        if fields is None or 'seller' in fields:
+            product_dict['seller'] = product.seller.to_dict(None if fields is None else fields['seller'])
+        return product_dict
+
+    @staticmethod
+    def _full_text_query(text: str) -> sqlalchemy.ColumnElement:
+        """Converts a user's search text (supporting quotes, 'or' and '-') to a full-text query."""
+        return sqlalchemy.func.websearch_to_tsquery('simple', text)
+
+    @staticmethod
+    def _search_rank(text: str) -> sqlalchemy.ColumnElement:
+        """Returns relevance of products to the full-text query of a search."""
+        # Rank is converted to double precision, so its value round-trips exactly through pagination cursors.
+        return sqlalchemy.cast(
+            sqlalchemy.func.ts_rank(
+                backend.models.product.Product.search_vector, ProductManager._full_text_query(text)
+            ),
+            sqlalchemy.Float
+        ).label('search_rank')
+
+    @staticmethod
+    def _search_similarity(name: str) -> sqlalchemy.ColumnElement:
+        """Returns trigram similarity of product names to the name of a fuzzy search."""
+        # Similarity is converted to double precision, so its value round-trips exactly through pagination cursors.
+        return sqlalchemy.cast(
+            sqlalchemy.func.similarity(backend.models.product.Product.name_normalized, name),
+            sqlalchemy.Float
+        ).label('search_similarity')
+
+    @staticmethod
+    def _set_similarity_threshold() -> None:
+        """Sets the minimum similarity matched by the trigram '%' operator for the current transaction."""
+        threshold = flask.current_app.config.get(
+            'SEARCH_SIMILARITY_THRESHOLD', backend.initializers.settings.DEFAULT_SEARCH_SIMILARITY_THRESHOLD
+        )
+        backend.initializers.database.DB.session.execute(
+            sqlalchemy.text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+            {'threshold': str(threshold)}
+        )
+
+    @staticmethod
+    def _search_sort_keys(filters: dict) -> list:
+        """Returns the (column, descending) sort keys of a search, ending with the product ID as tie-breaker."""
+        keys = []
+        if filters.get('sort_relevance') in ('asc', 'dsc'):
+            keys.append((ProductManager._search_rank(filters['q']), filters['sort_relevance'] == 'dsc'))
+        if filters.get('fuzzy') and 'name' in filters:
+            # Fuzzy results are ranked by similarity, best matches first.
+            keys.append((ProductManager._search_similarity(filters['name']), True))
+        if filters.get('sort_created_at') in ('asc', 'dsc'):
+            keys.append((backend.models.product.Product.created_at, filters['sort_created_at'] == 'dsc'))
+        if filters.get('sort_price') in ('asc', 'dsc'):
+            keys.append((backend.models.product.Product.price, filters['sort_price'] == 'dsc'))
+        # Follow direction of the last sort key, so a single index scan direction serves the whole ordering.
+        keys.append((backend.models.product.Product.id, keys[-1][1] if keys else False))
+        return keys
+
+    def _search_product_page(self, query, filters: dict, render: Callable) -> (flask.Flask, int):
+        """
+        Returns a single page of the filtered search query, see '_page_rows'.
+
+        Args:
+            query: The filtered search query. Its rows must have attributes of all sort keys, including computed
+                   ones (e.g., rank), since the next page's cursor is built from them.
+            filters (dict): Filter criteria of 'search_product', with 'limit' and an optional 'cursor'.
+            render (Callable): Creates the response of the rows of the page and the next page's cursor.
+        """
+        rows, next_cursor = self._page_rows(query, self._search_sort_keys(filters), filters)
+        if rows is None:
+            return (
+                flask.jsonify({'message': 'Invalid cursor.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        return render(rows, next_cursor), backend.initializers.settings.HTTPStatus.OK.value
+
+    @staticmethod
+    def _page_rows(query, keys: list, filters: dict) -> (Optional[list], Optional[str]):
+        """
+        Returns rows of a single page of the query using keyset pagination, and the next page's cursor.
+
+        Instead of OFFSET, the page starts right after the sort keys encoded in the cursor, so the database
+        only reads 'limit' rows from the index regardless of how deep the client has paged.
+
+        Args:
+            query: The filtered query. Its rows must have attributes of all sort keys.
+            keys (list): List of (column, descending) tuples the page is ordered by, the last one must be unique.
+            filters (dict): Filter criteria with 'limit' and an optional 'cursor'.
+
+        Returns:
+            tuple: A tuple containing:
+                - Rows of the page, or None if the cursor is invalid.
+                - The cursor of the next page, or None if this is the last page.
+        """
+        query = query.order_by(*backend.managers.pagination.order_by_clauses(keys))
+        if filters.get('cursor'):
+            values = backend.managers.pagination.decode_cursor(keys, filters['cursor'])
+            if values is None:
+                return None, None
+            query = query.filter(backend.managers.pagination.seek_condition(keys, values))
+
+        limit = filters['limit']
+        # Fetch one more row than asked to know whether another page exists.
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = backend.managers.pagination.encode_cursor(keys, rows[-1])
+        return rows, next_cursor
+
+    def get_product(self, product_id: int, fields: Optional[dict] = None) -> (flask.Flask, int):
         """
         Retrieve a product by its ID.
 
@@ -147,23 +765,296 @@ class ProductManager:
 
         Args:
             product_id (int): The ID of the product to retrieve.
+            fields (dict): Fields of the product to return, see 'search_product'. All fields are returned by default.
 
         Returns:
             tuple: A tuple containing:
                 - A Flask response object containing the JSON representation of the product or an error message.
-                - An integer representing the HTTP status code (200 for success, 404 if not found).
+                - An integer representing the HTTP status code (200 for success, 304 if the client's ETag
+                  matches, 404 if not found).
         """
-        product = backend.models.product.Product.query.get(product_id)
+        product = backend.initializers.database.DB.session.get(
+            backend.models.product.Product,
+            product_id,
+            options=self._product_load_options(
+                fields,
+                required_columns=[backend.models.product.Product.version],
+                required_seller_columns=[backend.models.user.User.version],
+            ),
+        )
         if not product:
             return (
                 flask.jsonify({'message': 'No product found with the provided ID.'}),
                 backend.initializers.settings.HTTPStatus.NOT_FOUND.value
             )
-        product_dict = product.to_dict()
-        if product.user_username:
-            seller = backend.models.user.User.query.get(product.user_username).to_dict()
-            product_dict['seller'] = seller
-        return flask.jsonify({"product": product_dict}), backend.initializers.settings.HTTPStatus.OK.value
+        seller = product.seller if fields is None or 'seller' in fields else None
+        # The embedded seller is part of the representation, so its version is part of the ETag too.
+        entity_tag = backend.managers.conditional.etag(
+            'product', product.id, product.version, seller.version if seller else None,
+            self._fields_cache_key(fields),
+        )
+        not_modified = backend.managers.conditional.not_modified_response(entity_tag)
+        if not_modified:
+            return not_modified
+
+        product_dict = product.to_dict(fields)
+        if seller:
+            product_dict['seller'] = seller.to_dict(None if fields is None else fields['seller'])
+        return (
+            backend.managers.conditional.with_etag(flask.jsonify({"product": product_dict}), entity_tag),
+            backend.initializers.settings.HTTPStatus.OK.value
+        )
+
+    def suggest(self, prefix: str, limit: int) -> (flask.Flask, int):
+        """
+        Suggest names and cities of visible products starting with what's typed in the search box.
+
+        Suggestions are served from in-memory prefix indexes without querying the database. They're built
+        from the database once per process and updated by every write of this process.
+
+        Args:
+            prefix (str): The typed text, matched after normalization (see 'backend.managers.normalization').
+            limit (int): Maximum number of suggested names, and of suggested cities.
+
+        Returns:
+            tuple: A tuple containing:
+                - A Flask response object containing lists of suggested 'names' and 'cities', each one with its
+                  'text' and the 'count' of products having it, the most common first.
+                - An integer representing the HTTP status code (200 for success).
+        """
+        suggestions = self._suggestions()
+        prefix = backend.managers.normalization.normalize_text(prefix)
+        return flask.jsonify({
+            'names': suggestions.names.suggest(prefix, limit),
+            'cities': suggestions.cities.suggest(prefix, limit),
+        }), backend.initializers.settings.HTTPStatus.OK.value
+
+    @staticmethod
+    def build_suggestions() -> backend.managers.autocomplete.ProductSuggestions:
+        """
+        Build suggestions of the current app from names and cities of visible products.
+
+        Products are streamed from the database in batches, so they're never all loaded at once.
+        """
+        suggestions = backend.managers.autocomplete.ProductSuggestions()
+        suggestions.add(backend.initializers.database.DB.session.execute(
+            sqlalchemy.select(
+                backend.models.product.Product.name, backend.models.product.Product.city_name
+            ).join(backend.models.product.Product.seller).where(
+                backend.models.product.Product.is_banned.isnot(True),
+                backend.models.user.User.is_banned.isnot(True),
+            ).execution_options(yield_per=backend.initializers.settings.STREAM_BATCH_SIZE)
+        ))
+        flask.current_app.extensions[ProductManager.SUGGESTIONS_EXTENSION] = suggestions
+        return suggestions
+
+    @staticmethod
+    def _suggestions() -> backend.managers.autocomplete.ProductSuggestions:
+        """Returns suggestions of the current app, building them on first use."""
+        suggestions = flask.current_app.extensions.get(ProductManager.SUGGESTIONS_EXTENSION)
+        if suggestions is None:
+            suggestions = ProductManager.build_suggestions()
+        return suggestions
+
+    @staticmethod
+    def update_suggestions(removed: Collection = (), added: Collection = ()) -> None:
+        """
+        Updates suggestions of the current app after committing a change to visible products.
+
+        Args:
+            removed (Collection): (name, city_name) pairs of products which were visible before the change.
+            added (Collection): (name, city_name) pairs of products which are visible after the change.
+        """
+        suggestions = flask.current_app.extensions.get(ProductManager.SUGGESTIONS_EXTENSION)
+        # Suggestions which aren't built yet will be built from the database along with the change.
+        if suggestions is not None:
+            suggestions.remove(removed)
+            suggestions.add(added)
+
+    @staticmethod
+    def suggested_entries(product: backend.models.product.Product) -> list:
+        """Returns the (name, city_name) pair of the product in suggestions, or none if it isn't visible."""
+        if product.is_banned or product.seller is not None and product.seller.is_banned:
+            return []
+        return [(product.name, product.city_name)]
+
+    @staticmethod
+    def update_seller_suggestions(username: str, visible: bool) -> None:
+        """
+        Updates suggestions of the current app after committing a change to visibility of a seller's products.
+
+        Args:
+            username (str): Username of the seller.
+            visible (bool): Whether products of the seller became visible (unbanned), or hidden (banned).
+        """
+        suggestions = flask.current_app.extensions.get(ProductManager.SUGGESTIONS_EXTENSION)
+        if suggestions is None:
+            return
+        products = backend.initializers.database.DB.session.execute(
+            sqlalchemy.select(
+                backend.models.product.Product.name, backend.models.product.Product.city_name
+            ).where(
+                backend.models.product.Product.user_username == username,
+                backend.models.product.Product.is_banned.isnot(True),
+            )
+        ).all()
+        if visible:
+            suggestions.add(products)
+        else:
+            suggestions.remove(products)
+
+    def get_similar_products(self, product_id: int, limit: int) -> (flask.Flask, int):
+        """
+        Recommend products similar to a product, by name, description, category and city.
+
+        Candidates are ranked by the in-memory similarity index (see 'backend.managers.similarity'), which is
+        rebuilt periodically. Banned and sold products are left out, including the ones which changed since
+        the index was built.
+
+        Args:
+            product_id (int): ID of the product, which may be banned, sold or newer than the index.
+            limit (int): Maximum number of recommended products.
+
+        Returns:
+            tuple: A tuple containing:
+                - A Flask response object containing the similar 'products', the most similar first, or an error
+                  message if the product doesn't exist.
+                - An integer representing the HTTP status code (200 for success, 404 for a missing product).
+        """
+        product = backend.models.product.Product
+        terms = backend.initializers.database.DB.session.execute(
+            sqlalchemy.select(product.name, product.description, product.category, product.city_name).where(
+                product.id == product_id
+            )
+        ).first()
+        if terms is None:
+            return (
+                flask.jsonify({'message': 'Product not found.'}),
+                backend.initializers.settings.HTTPStatus.NOT_FOUND.value
+            )
+
+        terms = backend.managers.similarity.product_terms(*terms)
+        index = self._similarity_index()
+        use_cards = self._card_cache().max_size > 0
+        conditions = [product.status != 'sold', *self._search_conditions({})]
+        # Some extra candidates replace the ones which were banned or sold since the index was built. If too many
+        # of them were, twice as many candidates are ranked, until enough are left or there are no more.
+        count = 2 * limit
+        found = []
+        checked = set()
+        while True:
+            candidates = index.similar(terms, count, exclude_id=product_id)
+            positions = {candidate_id: i for i, (candidate_id, _) in enumerate(candidates)}
+            unchecked = [candidate_id for candidate_id in positions if candidate_id not in checked]
+            checked.update(unchecked)
+            if unchecked:
+                query = self._card_rows_query() if use_cards else self._query_with_seller_and_pictures()
+                found.extend(query.filter(product.id.in_(unchecked), *conditions).all())
+            if len(found) >= limit or len(candidates) < count:
+                break
+            count *= 2
+        found = sorted(found, key=lambda row: positions.get(row.id, len(positions)))[:limit]
+
+        if use_cards:
+            return self._cards_response(found), backend.initializers.settings.HTTPStatus.OK.value
+        return flask.jsonify({
+            'products': [self._product_with_seller_dict(similar_product) for similar_product in found],
+        }), backend.initializers.settings.HTTPStatus.OK.value
+
+    @staticmethod
+    def build_similarity_index() -> backend.managers.similarity.SimilarityIndex:
+        """
+        Build the similarity index of the current app from visible products which aren't sold.
+
+        Products are streamed from the database in batches, so they're never all loaded at once.
+        """
+        product = backend.models.product.Product
+        index = backend.managers.similarity.SimilarityIndex(backend.initializers.database.DB.session.execute(
+            sqlalchemy.select(
+                product.id, product.name, product.description, product.category, product.city_name
+            ).join(product.seller).where(
+                product.status != 'sold', *ProductManager._search_conditions({})
+            ).order_by(product.id).execution_options(yield_per=backend.initializers.settings.STREAM_BATCH_SIZE)
+        ))
+        flask.current_app.extensions[ProductManager.SIMILARITY_EXTENSION] = index
+        return index
+
+    @staticmethod
+    def _similarity_index() -> backend.managers.similarity.SimilarityIndex:
+        """
+        Returns the similarity index of the current app.
+
+        Once the index is older than the refresh period, it's rebuilt by a single background thread while requests
+        keep using it. Only the first build, before there's an index to use, is waited for.
+        """
+        flask_app = flask.current_app._get_current_object()
+        lock = flask_app.extensions.setdefault(ProductManager.SIMILARITY_LOCK_EXTENSION, threading.Lock())
+        index = flask_app.extensions.get(ProductManager.SIMILARITY_EXTENSION)
+        if index is None:
+            with lock:
+                index = flask_app.extensions.get(ProductManager.SIMILARITY_EXTENSION)
+                if index is None:
+                    index = ProductManager.build_similarity_index()
+            return index
+        refresh_seconds = flask_app.config.get(
+            'SIMILARITY_REFRESH_SECONDS', backend.initializers.settings.DEFAULT_SIMILARITY_REFRESH_SECONDS
+        )
+        if time.monotonic() - index.built_at >= refresh_seconds and lock.acquire(blocking=False):
+            threading.Thread(
+                target=ProductManager._rebuild_similarity_index, args=(flask_app, lock),
+                name='similarity-index', daemon=True,
+            ).start()
+        return index
+
+    @staticmethod
+    def _rebuild_similarity_index(flask_app: flask.Flask, lock: threading.Lock) -> None:
+        """Builds the similarity index of an app in its own app context, then releases the lock of the build."""
+        try:
+            with flask_app.app_context():
+                ProductManager.build_similarity_index()
+        except Exception:
+            flask_app.logger.exception('Failed to rebuild the similarity index, the previous one is kept.')
+        finally:
+            lock.release()
+
+    def get_product_batch(self, product_ids: list, fields: Optional[dict] = None) -> (flask.Flask, int):
+        """
+        Retrieve several products by their IDs, as 'get_product' does for each of them.
+
+        Products are loaded along with their sellers by a single 'IN' query and their pictures by another one,
+        unless they're served from the card cache.
+
+        Args:
+            product_ids (list): IDs of the products to retrieve, a repeated ID is returned once.
+            fields (dict): Fields of products to return, see 'search_product'. All fields are returned by default.
+
+        Returns:
+            tuple: A tuple containing:
+                - A Flask response object containing the found products in the order of their IDs, and the
+                  list of 'missing' IDs which weren't found.
+                - An integer representing the HTTP status code (200 for success).
+        """
+        positions = {product_id: i for i, product_id in enumerate(dict.fromkeys(product_ids))}
+        id_condition = backend.models.product.Product.id.in_(list(positions))
+
+        if fields is None and self._card_cache().max_size > 0:
+            rows = sorted(self._card_rows_query().filter(id_condition).all(), key=lambda row: positions[row.id])
+            found_ids = {row.id for row in rows}
+            missing_ids = [product_id for product_id in positions if product_id not in found_ids]
+            return (
+                self._cards_response(rows, {'missing': missing_ids}),
+                backend.initializers.settings.HTTPStatus.OK.value
+            )
+
+        products = sorted(
+            self._query_with_seller_and_pictures(fields).filter(id_condition).all(),
+            key=lambda product: positions[product.id]
+        )
+        found_ids = {product.id for product in products}
+        return flask.jsonify({
+            'products': [self._product_with_seller_dict(product, fields) for product in products],
+            'missing': [product_id for product_id in positions if product_id not in found_ids],
+        }), backend.initializers.settings.HTTPStatus.OK.value
 
     def delete_product(self, username: str, product_id: int) -> (flask.Flask, int):
         """
@@ -188,16 +1079,18 @@ class ProductManager:
                 flask.jsonify({'message': 'You do not have access to edit this product.'}),
                 backend.initializers.settings.HTTPStatus.UNAUTHORIZED.value
             )
-        product_pictures = backend.models.product.Picture.query.filter_by(product_id=product_id).all()
-        for picture in product_pictures:
-            if os.path.exists(f'backend/uploads/{picture.filename}'):
-                os.remove(f'backend/uploads/{picture.filename}')
-        backend.models.product.Picture.query.filter_by(product_id=product_id).delete()
+        # Banned products aren't suggested, and sellers of products they can delete aren't banned.
+        suggested = [] if product.is_banned else [(product.name, product.city_name)]
+        self._remove_pictures(product_id)
 
         backend.models.report.ProductReport.query.filter_by(reported_product=product_id).delete()
 
         backend.models.product.Product.query.filter_by(id=product_id).delete()
         backend.initializers.database.DB.session.commit()
+        self.invalidate_search_cache()
+        self.invalidate_product_cards([product_id])
+        self.invalidate_seller_products(username)
+        self.update_suggestions(removed=suggested)
         return (
             flask.jsonify({"message": "Product deleted successfully."}),
             backend.initializers.settings.HTTPStatus.NO_CONTENT.value
@@ -227,6 +1120,7 @@ class ProductManager:
                 flask.jsonify({'message': 'You do not have access to edit this product.'}),
                 backend.initializers.settings.HTTPStatus.UNAUTHORIZED.value
             )
+        suggested_before = [] if product.is_banned else [(product.name, product.city_name)]
         product.name = product_data.get('name', product.name)
         product.price = product_data.get('price', product.price)
         product.city_name = product_data.get('city_name', product.city_name)
@@ -234,34 +1128,103 @@ class ProductManager:
         product.status = product_data.get('status', product.status)
         product.category = product_data.get('category', product.category)
         product.user_username = product_data.get('user_username', product.user_username)
+        self._normalize_search_fields(product)
+        product.bump_version()
+        suggested_after = [] if product.is_banned else [(product.name, product.city_name)]
 
         # Adding new pictures
+        pictures = []
         if 'images' in product_data.keys():
-            # Delete Previous Pictures
-            product_pictures = backend.models.product.Picture.query.filter_by(product_id=product_id).all()
-            for picture in product_pictures:
-                if os.path.exists(f'backend/uploads/{picture.filename}'):
-                    os.remove(f'backend/uploads/{picture.filename}')
-            backend.models.product.Picture.query.filter_by(product_id=product_id).delete()
-
-            for file, filename in zip(product_data['images'], product_data['images_path']):
-                # Generate a new filename by appending a timestamp to avoid duplicate name.
-                base, extension = os.path.splitext(filename)
-                timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-                new_filename = f"{base}_{timestamp}{extension}"
-                file_path = f"./backend/{flask.current_app.config['UPLOAD_FOLDER']}{new_filename}"
-                file.save(file_path)
-                # Create a new Picture instance associated with the newly created product.
-                new_picture = backend.models.product.Picture(
-                    filename=new_filename,
-                    product_id=product_id,
-                )
-                backend.initializers.database.DB.session.add(new_picture)
+            # Delete Previous Pictures, files of pictures uploaded again are kept.
+            self._remove_pictures(product_id)
+            pictures = self._save_pictures(product_id, product_data['images'], product_data['images_path'])
 
         backend.initializers.database.DB.session.commit()
+        self._process_pictures(pictures)
+        self.invalidate_search_cache()
+        self.invalidate_product_cards([product_id])
+        self.invalidate_seller_products(username)
+        self.update_suggestions(removed=suggested_before, added=suggested_after)
 
         return flask.jsonify({"message": "Product edited successfully."}), backend.initializers.settings.HTTPStatus.OK.value
 
+    @staticmethod
+    def _save_pictures(product_id: int, images: list, images_path: list) -> list:
+        """
+        Stores uploaded pictures of a product, and adds their Picture instances to the session.
+
+        Files are stored by their contents (see 'backend.managers.storage'), so a picture uploaded again, e.g., by
+        an edit of the product, isn't stored twice.
+
+        Args:
+            product_id (int): The id of the product.
+            images (list): The uploaded files.
+            images_path (list): The secured filenames of the uploaded files.
+
+        Returns:
+            list: The new Picture instances, in the order of the files.
+        """
+        pictures = []
+        for file, filename in zip(images, images_path):
+            stored_filename = backend.managers.storage.store(file.stream, filename)
+            # Create a new Picture instance associated with the product.
+            new_picture = backend.models.product.Picture(filename=stored_filename, product_id=product_id)
+            backend.initializers.database.DB.session.add(new_picture)
+            pictures.append(new_picture)
+        return pictures
+
+    @staticmethod
+    def _remove_pictures(product_id: int) -> None:
+        """
+        Deletes the pictures of a product, and releases their files.
+
+        Files which aren't referred to anymore are removed in the background once the deletion is committed, see
+        'backend.managers.storage.release'.
+        """
+        pictures = backend.models.product.Picture.query.filter_by(product_id=product_id).all()
+        backend.models.product.Picture.query.filter_by(product_id=product_id).delete()
+        backend.managers.storage.release([picture.filename for picture in pictures])
+
+    @staticmethod
+    def _process_pictures(pictures: list) -> None:
+        """Generates variants of committed pictures in the background, see 'record_picture_variants'."""
+        for picture in pictures:
+            backend.managers.images.process_picture(
+                picture.filename,
+                functools.partial(ProductManager.record_picture_variants, picture.id, picture.filename)
+            )
+
+    @staticmethod
+    def record_picture_variants(picture_id: int, filename: str, variants: dict) -> bool:
+        """
+        Stores generated variants on a picture, and bumps the version of its product so cached copies are replaced.
+
+        Args:
+            picture_id (int): The id of the picture.
+            filename (str): Name of the file of the picture.
+            variants (dict): Names of the files of the variants, by the name of the variant.
+
+        Returns:
+            bool: Whether the picture still exists, e.g., it's not replaced by an edit of its product meanwhile.
+                Otherwise, the variants are queued for removal along with the file, which is kept if another picture
+                refers to it.
+        """
+        picture = backend.initializers.database.DB.session.get(backend.models.product.Picture, picture_id)
+        if picture is None:
+            backend.managers.storage.schedule_removal([filename])
+            backend.initializers.database.DB.session.commit()
+            return False
+        picture.variants = variants
+        product_id = picture.product_id
+        product = backend.initializers.database.DB.session.get(backend.models.product.Product, product_id)
+        product.bump_version()
+        username = product.user_username
+        backend.initializers.database.DB.session.commit()
+        ProductManager.invalidate_search_cache()
+        ProductManager.invalidate_product_cards([product_id])
+        ProductManager.invalidate_seller_products(username)
+        return True
+
     def report_product(self, reporter_username: str, reported_product: int, description: str) -> (flask.Flask, int):
         """
         Report product.
@@ -291,19 +1254,191 @@ class ProductManager:
         return flask.jsonify(
             {"message": "Product is reported successfully."}), backend.initializers.settings.HTTPStatus.OK.value
 
-    def get_products(self, user_username: str) -> (flask.Flask, int):
+    def get_products(
+            self, user_username: str, stream: bool = False, fields: Optional[dict] = None,
+            filters: Optional[dict] = None,
+    ) -> (flask.Flask, int):
         """
-        Returns a list of products belonging to a user that are on sale.
+        Returns a list of products belonging to a user, the newest first.
+
+        Lists which aren't streamed are served from the seller products cache until the seller's products change.
 
         Args:
             user_username (str): username of the user
+            stream (bool): Whether to stream products while reading them from the database in batches.
+            fields (dict): Fields of products to return, see 'search_product'. All fields are returned by default.
+            filters (dict): Optional filter criteria:
+                - 'status' (list): Statuses of products to return.
+                - 'limit' (int): Page size. If provided, a single page is returned along with a 'next_cursor'.
+                - 'cursor' (str): 'next_cursor' of the previous page. Streamed lists aren't paginated.
         Returns:
             response (flask.Response): A Flask response object containing successfully returning a list.
             status_code (int):
                 200: successful search
+                304: the client's ETag matches the current list
+                400: the cursor is invalid
         """
-        products = backend.models.product.Product.query.filter_by(
-            user_username=user_username,
-        ).all()
-        products_as_dicts = [product.to_dict() for product in products]
-        return flask.jsonify({"products": products_as_dicts}), backend.initializers.settings.HTTPStatus.OK.value
+        filters = filters or {}
+        if stream:
+            entity_tag = self._products_etag(user_username, fields, filters)
+            not_modified = backend.managers.conditional.not_modified_response(entity_tag)
+            if not_modified:
+                return not_modified
+            query = self._seller_products_query(user_username, fields, filters).order_by(
+                *backend.managers.pagination.order_by_clauses(self._seller_products_sort_keys())
+            )
+            return (
+                backend.managers.conditional.with_etag(
+                    backend.managers.streaming.query_list_response(
+                        'products', query, lambda product: product.to_dict(fields)
+                    ),
+                    entity_tag
+                ),
+                backend.initializers.settings.HTTPStatus.OK.value
+            )
+
+        cache = self._seller_products_cache()
+        generation = cache.generation
+        page_key = (
+            self._seller_products_token(user_username),
+            self._search_cache_key('products', {**filters, 'fields': self._fields_cache_key(fields)}),
+        )
+        page = cache.get(page_key)
+        if page is None:
+            # The ETag of a whole list is aggregated in the database, so a conditional request is answered
+            # without loading the list. The ETag of a page is derived from its products.
+            if 'limit' not in filters and flask.has_request_context() and flask.request.if_none_match:
+                not_modified = backend.managers.conditional.not_modified_response(
+                    self._products_etag(user_username, fields, filters)
+                )
+                if not_modified:
+                    return not_modified
+            page = self._seller_products_page(user_username, fields, filters)
+            if page is None:
+                return (
+                    flask.jsonify({'message': 'Invalid cursor.'}),
+                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+                )
+            cache.set(page_key, page, generation)
+
+        body, entity_tag = page
+        return backend.managers.conditional.not_modified_response(entity_tag) or (
+            backend.managers.conditional.with_etag(
+                flask.current_app.response_class(body, mimetype='application/json'), entity_tag
+            ),
+            backend.initializers.settings.HTTPStatus.OK.value
+        )
+
+    def _seller_products_page(self, user_username: str, fields: Optional[dict], filters: dict) -> Optional[tuple]:
+        """
+        Loads the list (or a page of it) of 'get_products' from the database.
+
+        Returns:
+            tuple: The serialized response body and its ETag, or None if the cursor is invalid.
+        """
+        query = self._seller_products_query(user_username, fields, filters)
+        keys = self._seller_products_sort_keys()
+        response = {}
+        if 'limit' in filters:
+            products, response['next_cursor'] = self._page_rows(query, keys, filters)
+            if products is None:
+                return None
+        else:
+            products = query.order_by(*backend.managers.pagination.order_by_clauses(keys)).all()
+        entity_tag = self._products_etag(user_username, fields, filters, (
+            len(products), sum(product.id for product in products), sum(product.version for product in products)
+        ), response.get('next_cursor'))
+        body = flask.jsonify({'products': [product.to_dict(fields) for product in products], **response}).get_data()
+        return body, entity_tag
+
+    @staticmethod
+    def _seller_products_query(user_username: str, fields: Optional[dict], filters: dict):
+        """Returns the unordered query of products of 'get_products', which loads their pictures too."""
+        if fields is None:
+            options = [sqlalchemy.orm.selectinload(backend.models.product.Product.pictures)]
+        else:
+            # Sort keys are loaded too, since the next page's cursor is built from them.
+            options = ProductManager._product_load_options(fields, required_columns=[
+                backend.models.product.Product.version, backend.models.product.Product.created_at
+            ])
+        return backend.models.product.Product.query.options(*options).filter(
+            *ProductManager._seller_products_conditions(user_username, filters)
+        )
+
+    @staticmethod
+    def _seller_products_conditions(user_username: str, filters: dict) -> list:
+        """Returns the WHERE conditions of 'get_products', answered by the index on the seller and creation date."""
+        conditions = [backend.models.product.Product.user_username == user_username]
+        if filters.get('status'):
+            conditions.append(backend.models.product.Product.status.in_(filters['status']))
+        return conditions
+
+    @staticmethod
+    def _seller_products_sort_keys() -> list:
+        """Returns the (column, descending) sort keys of 'get_products', the newest products first."""
+        return [(backend.models.product.Product.created_at, True), (backend.models.product.Product.id, True)]
+
+    def _products_etag(
+            self, user_username: str, fields: Optional[dict], filters: dict, summary: Optional[tuple] = None,
+            next_cursor: Optional[str] = None,
+    ) -> str:
+        """
+        Returns the ETag of the list of a user's products.
+
+        The list is summarized by the number of its products and the sums of their IDs and versions, which change
+        whenever a product is added, removed or written. The summary is aggregated in the database unless given.
+        A page is summarized by its own products, along with the cursor of the next page.
+        """
+        if summary is None:
+            product = backend.models.product.Product
+            summary = tuple(backend.initializers.database.DB.session.execute(
+                sqlalchemy.select(
+                    sqlalchemy.func.count(),
+                    sqlalchemy.func.coalesce(sqlalchemy.func.sum(product.id), 0),
+                    sqlalchemy.func.coalesce(sqlalchemy.func.sum(product.version), 0),
+                ).where(*self._seller_products_conditions(user_username, filters))
+            ).one())
+        return backend.managers.conditional.etag(
+            'products', user_username, *summary, self._fields_cache_key(fields),
+            self._search_cache_key('products', filters), next_cursor,
+        )
+
+    @staticmethod
+    def _seller_products_cache() -> backend.managers.cache.Cache:
+        """Returns the seller products cache of the current app, creating it on first use."""
+        extensions = flask.current_app.extensions
+        if ProductManager.SELLER_PRODUCTS_CACHE_EXTENSION not in extensions:
+            extensions.setdefault(ProductManager.SELLER_PRODUCTS_CACHE_EXTENSION, backend.managers.cache.Cache(
+                max_size=flask.current_app.config.get(
+                    'SELLER_PRODUCTS_CACHE_SIZE', backend.initializers.settings.DEFAULT_SELLER_PRODUCTS_CACHE_SIZE
+                ),
+                ttl_seconds=backend.initializers.settings.SELLER_PRODUCTS_CACHE_TTL_SECONDS,
+            ))
+        return extensions[ProductManager.SELLER_PRODUCTS_CACHE_EXTENSION]
+
+    @staticmethod
+    def _seller_products_token(user_username: str) -> object:
+        """
+        Returns the token of a seller's cached product list in the current app, which keys the pages of the list.
+
+        Each page is an entry of the seller products cache of its own, keyed by (token, page key), so the cache
+        bounds the number of pages rather than of sellers. Writes of the seller drop the token, so a page loaded
+        by a read racing with a write is stored under the dropped token and never served.
+        """
+        cache = ProductManager._seller_products_cache()
+        token = cache.get(user_username)
+        if token is None:
+            token = object()
+            cache.set(user_username, token, cache.generation)
+        return token
+
+    @staticmethod
+    def invalidate_seller_products(user_username: str) -> None:
+        """
+        Drops cached product lists of a seller of the current app.
+
+        Must be called after committing any change to products of the seller.
+        """
+        cache = flask.current_app.extensions.get(ProductManager.SELLER_PRODUCTS_CACHE_EXTENSION)
+        if cache is not None:
+            cache.delete(user_username)
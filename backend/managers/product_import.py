@@ -0,0 +1,126 @@
+import csv
+import json
+from typing import IO, Iterator, Mapping, Optional
+
+import backend.models.product
+
+# Formats of imported files, by the media type they're sent with.
+MEDIA_TYPE_FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+}
+# Maximum length of each text field, longer values are rejected instead of failing a whole batch in the database.
+_MAX_LENGTHS = {
+    'name': backend.models.product.Product.PRODUCT_NAME_MAX_LENGTH,
+    'city_name': backend.models.product.Product.CITY_NAME_MAX_LENGTH,
+    'description': backend.models.product.Product.DESCRIPTION_MAX_LENGTH,
+}
+
+
+def validate_product(values: Mapping) -> (Optional[dict], Optional[str]):
+    """
+    Validate fields of a new product, given by the product creation form or by a row of an imported file.
+
+    Args:
+        values (Mapping): Values of 'name', 'price', 'city_name', 'description', 'status' and 'category'.
+            Values may be strings, as in forms and CSV files, or JSON values, as in NDJSON files.
+
+    Returns:
+        tuple: A tuple containing:
+            - The validated fields of the product, with price converted to a float, or None if they are invalid.
+            - A message explaining why the fields are invalid, or None if they are valid.
+    """
+    for field in ('name', 'city_name', 'description', 'status', 'category'):
+        value = values.get(field)
+        if value is not None and not isinstance(value, str):
+            return None, f'Invalid value for {field}.'
+        if value and field in _MAX_LENGTHS and len(value) > _MAX_LENGTHS[field]:
+            return None, f'Value of {field} must be at most {_MAX_LENGTHS[field]} characters.'
+
+    # Validate product name exists.
+    name = values.get('name')
+    if not name:
+        return None, 'Missing product name.'
+    # Validate price exists and it is a valid float number.
+    price = values.get('price')
+    if price is None or price == '':
+        return None, 'Missing price.'
+    if isinstance(price, bool):
+        return None, 'Price must be a valid float number.'
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        return None, 'Price must be a valid float number.'
+    description = values.get('description')
+    if not description:
+        return None, 'Missing description.'
+    # Validate status exists and has a value in defined status enum.
+    status = values.get('status')
+    if not status:
+        return None, 'Missing status.'
+    if status not in backend.models.product.Product.STATUS_OPTIONS:
+        return None, 'Invalid value for status.'
+    # Validate category exists and has a value in defined category enum.
+    category = values.get('category')
+    if not category:
+        return None, 'Missing category.'
+    if category not in backend.models.product.Product.CATEGORY_OPTIONS:
+        return None, 'Invalid value for category.'
+
+    return {
+        'name': name,
+        'price': price,
+        'city_name': values.get('city_name'),
+        'description': description,
+        'status': status,
+        'category': category,
+    }, None
+
+
+def read_rows(import_format: str, stream: IO[bytes]) -> Iterator[tuple]:
+    """
+    Parses rows of an imported file while reading it, so only a row is held in memory at once.
+
+    Args:
+        import_format (str): Format of the file, 'csv' (with a header row) or 'ndjson' (a JSON object per line).
+        stream (IO[bytes]): The UTF-8 encoded file.
+
+    Yields:
+        tuple: Number of the line of the row, its values (or None) and a message explaining why the row can't be
+            parsed (or None).
+    """
+    if import_format == 'csv':
+        return _read_csv(stream)
+    if import_format == 'ndjson':
+        return _read_ndjson(stream)
+    raise ValueError(f'Unknown import format: {import_format}')
+
+
+def _read_csv(stream: IO[bytes]) -> Iterator[tuple]:
+    # Lines are decoded one at a time, so rows before an undecodable line are still read.
+    lines = (line.decode('utf-8-sig' if i == 0 else 'utf-8') for i, line in enumerate(stream))
+    reader = csv.DictReader(lines)
+    try:
+        for values in reader:
+            if None in values:
+                yield reader.line_num, None, 'Row has more values than the header.'
+            else:
+                yield reader.line_num, values, None
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Lines after a malformed one can't be told apart reliably, so the rest of the file is rejected.
+        yield reader.line_num + 1, None, f'Invalid CSV, the rest of the file is skipped: {e}'
+
+
+def _read_ndjson(stream: IO[bytes]) -> Iterator[tuple]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            values = json.loads(line)
+        except ValueError:
+            yield line_number, None, 'Invalid JSON.'
+            continue
+        if not isinstance(values, dict):
+            yield line_number, None, 'Row must be a JSON object.'
+            continue
+        yield line_number, values, None
@@ -0,0 +1,84 @@
+import io
+
+from absl.testing import absltest
+
+import backend.managers.product_import
+
+VALID_PRODUCT = {
+    'name': 'Phone', 'price': '10.5', 'city_name': 'Tehran', 'description': 'A phone.', 'status': 'for sale',
+    'category': 'Others',
+}
+
+
+class ValidateProductTest(absltest.TestCase):
+    def test_valid_product(self) -> None:
+        product, error = backend.managers.product_import.validate_product(VALID_PRODUCT)
+
+        self.assertIsNone(error)
+        self.assertEqual(product, {**VALID_PRODUCT, 'price': 10.5})
+
+    def test_json_values(self) -> None:
+        product, error = backend.managers.product_import.validate_product({**VALID_PRODUCT, 'price': 0})
+        self.assertIsNone(error)
+        self.assertEqual(product['price'], 0.0)
+
+        _, error = backend.managers.product_import.validate_product({**VALID_PRODUCT, 'price': True})
+        self.assertEqual(error, 'Price must be a valid float number.')
+        _, error = backend.managers.product_import.validate_product({**VALID_PRODUCT, 'name': 5})
+        self.assertEqual(error, 'Invalid value for name.')
+
+    def test_invalid_product(self) -> None:
+        for values, expected_error in [
+            ({**VALID_PRODUCT, 'name': ''}, 'Missing product name.'),
+            ({**VALID_PRODUCT, 'name': 'x' * 51}, 'Value of name must be at most 50 characters.'),
+            ({**VALID_PRODUCT, 'price': None}, 'Missing price.'),
+            ({**VALID_PRODUCT, 'price': 'ten'}, 'Price must be a valid float number.'),
+            ({**VALID_PRODUCT, 'description': None}, 'Missing description.'),
+            ({**VALID_PRODUCT, 'status': 'new'}, 'Invalid value for status.'),
+            ({**VALID_PRODUCT, 'category': ''}, 'Missing category.'),
+            ({**VALID_PRODUCT, 'category': 'Cars'}, 'Invalid value for category.'),
+        ]:
+            product, error = backend.managers.product_import.validate_product(values)
+            self.assertIsNone(product)
+            self.assertEqual(error, expected_error)
+
+
+class ReadRowsTest(absltest.TestCase):
+    def test_read_csv(self) -> None:
+        stream = io.BytesIO(
+            '﻿name,price,description\n'
+            'Phone,10,"A phone,\nwith a case"\n'
+            'Chair,5,A chair,extra\n'
+            'گوشی,7,\n'.encode()
+        )
+
+        self.assertEqual(list(backend.managers.product_import.read_rows('csv', stream)), [
+            (3, {'name': 'Phone', 'price': '10', 'description': 'A phone,\nwith a case'}, None),
+            (4, None, 'Row has more values than the header.'),
+            (5, {'name': 'گوشی', 'price': '7', 'description': ''}, None),
+        ])
+
+    def test_read_invalid_csv(self) -> None:
+        stream = io.BytesIO(b'name,price\nPhone,10\n\xff\xfe,1\n')
+
+        rows = list(backend.managers.product_import.read_rows('csv', stream))
+        self.assertEqual(rows[0], (2, {'name': 'Phone', 'price': '10'}, None))
+        self.assertLen(rows, 2)
+        self.assertStartsWith(rows[1][2], 'Invalid CSV')
+
+    def test_read_ndjson(self) -> None:
+        stream = io.BytesIO(b'{"name": "Phone", "price": 10}\n\n[1]\n{"name": \n')
+
+        self.assertEqual(list(backend.managers.product_import.read_rows('ndjson', stream)), [
+            (1, {'name': 'Phone', 'price': 10}, None),
+            (3, None, 'Row must be a JSON object.'),
+            (4, None, 'Invalid JSON.'),
+        ])
+
+    def test_read_unknown_format(self) -> None:
+        with self.assertRaises(ValueError):
+            backend.managers.product_import.read_rows('xml', io.BytesIO())
+
+
+if __name__ == "__main__":
+    absltest.main()
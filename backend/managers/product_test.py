@@ -1,13 +1,25 @@
+import datetime
+import io
+import json
 from unittest import mock
 
 import flask
 import flask_jwt_extended
+import sqlalchemy
+import sqlalchemy.dialects.postgresql
 from absl.testing import absltest
 
+import backend.initializers.database
 import backend.initializers.settings
 import backend.initializers.test_util
+import backend.managers.admin
+import backend.managers.normalization
+import backend.managers.pagination
 import backend.managers.product
+import backend.managers.product_import
+import backend.managers.storage
 import backend.models.product
+import backend.models.upload
 import backend.models.user
 
 
@@ -16,6 +28,8 @@ class ProductManagerTest(absltest.TestCase):
         super().setUp()
         self.flask_app = flask.Flask(__name__)
         self.flask_app.config['JWT_SECRET_KEY'] = 'app_secret_key'
+        # Searches load products by the mocked query chain, instead of splicing cached cards.
+        self.flask_app.config['PRODUCT_CARD_CACHE_SIZE'] = 0
         self.jwt_manager = flask_jwt_extended.JWTManager(self.flask_app)
         self.flask_app.app_context().push()
         self.product_manager = backend.managers.product.ProductManager(flask_app=self.flask_app)
@@ -27,25 +41,28 @@ class ProductManagerTest(absltest.TestCase):
         self.mock_product_picture_query = mock.patch("backend.models.product.Picture.query").start()
         self.mock_user_picture_query = mock.patch("backend.models.user.ProfilePicture.query").start()
         self.mock_product_report_query = mock.patch("backend.models.report.ProductReport.query").start()
+        # Loading sellers and pictures along with products keeps the query chain unchanged.
+        self.mock_product_query.join.return_value = self.mock_product_query
+        self.mock_product_query.options.return_value = self.mock_product_query
         # Create instances of products and users for test inputs.
         self.user1 = backend.models.user.User(username='seller1', email='seller@email.com')
         self.user2 = backend.models.user.User(username='seller2', email='seller2@email.com')
         self.product1 = backend.models.product.Product(id=1, name='Apple iPhone 13', price=999.99, status='reserved',
-                                                       user_username='seller1')
+                                                       user_username='seller1', seller=self.user1)
         self.product2 = backend.models.product.Product(id=2, name='Samsung Galaxy S21', price=799.99, status='reserved',
-                                                       user_username='seller1')
+                                                       user_username='seller1', seller=self.user1)
         self.product3 = backend.models.product.Product(id=3, name='Apple Watch Series 6', price=399.99, status='sold',
-                                                       user_username='seller1')
+                                                       user_username='seller1', seller=self.user1)
         self.product4 = backend.models.product.Product(id=4, name='Apple Watch Series 6', price=399.99, status='sold',
-                                                       user_username='seller1')
+                                                       user_username='seller1', seller=self.user1)
         self.product5 = backend.models.product.Product(id=5, name='Laptop Asus', price=399.99, status='for sale',
-                                                       user_username='seller1')
+                                                       user_username='seller1', seller=self.user1)
         self.product6 = backend.models.product.Product(id=6, name='Red Phone', price=399.99, status='for sale',
-                                                       user_username='seller2')
+                                                       user_username='seller2', seller=self.user2, version=1)
         self.product7 = backend.models.product.Product(id=7, name='Blue Phone', price=400.99, status='for sale',
-                                                       user_username='seller2')
+                                                       user_username='seller2', seller=self.user2, version=1)
         self.product8 = backend.models.product.Product(id=8, name='Pink Phone', price=367.99, status='sold',
-                                                       user_username='seller2')
+                                                       user_username='seller2', seller=self.user2, version=1)
 
     def tearDown(self) -> None:
         self.mock_db_session.stop()
@@ -61,7 +78,6 @@ class ProductManagerTest(absltest.TestCase):
     def test_search_product_name_filter(self) -> None:
         """Test applying filter on product name."""
         self.mock_product_query.filter.return_value.all.return_value = [self.product1, self.product3]
-        self.mock_user_query.get.return_value = self.user1
         filters = {'name': 'Apple'}
         result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
 
@@ -74,7 +90,6 @@ class ProductManagerTest(absltest.TestCase):
     def test_search_product_price_range_filter(self) -> None:
         """Test applying filter on product price."""
         self.mock_product_query.filter.return_value.all.return_value = [self.product2, self.product3]
-        self.mock_user_query.get.return_value = self.user1
         filters = {'min_price': 300, 'max_price': 800}
         result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
 
@@ -86,9 +101,9 @@ class ProductManagerTest(absltest.TestCase):
 
     def test_search_product_sort_price_asc(self) -> None:
         """Test applying filter on sorting price asc."""
-        self.mock_product_query.filter.return_value.all.return_value = [self.product2, self.product3]
-        self.mock_product_query.order_by.return_value.all.return_value = [self.product2, self.product3]
-        self.mock_user_query.get.return_value = self.user1
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = [
+            self.product2, self.product3
+        ]
         filters = {'sort_price': 'asc'}
         result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
 
@@ -99,9 +114,9 @@ class ProductManagerTest(absltest.TestCase):
 
     def test_search_product_sort_price_dsc(self) -> None:
         """Test applying filter on sorting price dsc."""
-        self.mock_product_query.filter.return_value.all.return_value = [self.product3, self.product2]
-        self.mock_product_query.order_by.return_value.all.return_value = [self.product3, self.product2]
-        self.mock_user_query.get.return_value = self.user1
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = [
+            self.product3, self.product2
+        ]
         filters = {'sort_price': 'asc'}
         result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
 
@@ -112,9 +127,9 @@ class ProductManagerTest(absltest.TestCase):
 
     def test_search_product_sort_created_time_asc(self) -> None:
         """Test applying filter on created time asc."""
-        self.mock_product_query.filter.return_value.all.return_value = [self.product1, self.product2]
-        self.mock_product_query.order_by.return_value.all.return_value = [self.product1, self.product2]
-        self.mock_user_query.get.return_value = self.user1
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = [
+            self.product1, self.product2
+        ]
         filters = {'sort_created_at': 'asc'}
         result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
 
@@ -125,9 +140,9 @@ class ProductManagerTest(absltest.TestCase):
 
     def test_search_product_sort_created_time_dsc(self) -> None:
         """Test applying filter on created time dsc."""
-        self.mock_product_query.filter.return_value.all.return_value = [self.product2, self.product1]
-        self.mock_product_query.order_by.return_value.all.return_value = [self.product2, self.product1]
-        self.mock_user_query.get.return_value = self.user1
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = [
+            self.product2, self.product1
+        ]
         filters = {'sort_created_at': 'dsc'}
         result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
 
@@ -139,7 +154,6 @@ class ProductManagerTest(absltest.TestCase):
     def test_search_product_status_filter(self) -> None:
         """Test applying filter on product status."""
         self.mock_product_query.filter.return_value.all.return_value = [self.product3]
-        self.mock_user_query.get.return_value = self.user1
         filters = {'status': ['sold']}
         result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
 
@@ -149,25 +163,139 @@ class ProductManagerTest(absltest.TestCase):
         self.assertNotIn(1, result_product_ids)
         self.assertNotIn(2, result_product_ids)
 
+    def test_search_product_paginated_returns_next_cursor(self) -> None:
+        """Test paginated search returns a page of products and a cursor to the next page."""
+        self.mock_product_query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [
+            self.product1, self.product2, self.product3
+        ]
+        result, status = self.product_manager.search_product(filters={'limit': 2})
+
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual([product['id'] for product in result.json['products']], [1, 2])
+        self.assertIsNotNone(result.json['next_cursor'])
+        # One extra row is fetched to detect existence of the next page.
+        self.mock_product_query.filter.return_value.order_by.return_value.limit.assert_called_once_with(3)
+        keys = self.product_manager._search_sort_keys({})
+        self.assertEqual(backend.managers.pagination.decode_cursor(keys, result.json['next_cursor']), [2])
+
+    def test_search_product_paginated_last_page(self) -> None:
+        """Test paginated search returns no cursor on the last page."""
+        self.mock_product_query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [
+            self.product1
+        ]
+        result, status = self.product_manager.search_product(filters={'limit': 2})
+
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(len(result.json['products']), 1)
+        self.assertIsNone(result.json['next_cursor'])
+
+    def test_search_product_paginated_cursor_follows_sort_keys(self) -> None:
+        """Test cursor of a page sorted by price contains both price and ID."""
+        query = self.mock_product_query.filter.return_value.order_by.return_value
+        query.filter.return_value.limit.return_value.all.return_value = [self.product6, self.product7]
+        keys = self.product_manager._search_sort_keys({'sort_price': 'asc'})
+        cursor = backend.managers.pagination.encode_cursor(keys, self.product5)
+        result, status = self.product_manager.search_product(
+            filters={'sort_price': 'asc', 'limit': 1, 'cursor': cursor}
+        )
+
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual([product['id'] for product in result.json['products']], [6])
+        self.assertEqual(backend.managers.pagination.decode_cursor(keys, result.json['next_cursor']), [399.99, 6])
+
+    def test_search_product_paginated_invalid_cursor(self) -> None:
+        """Test malformed cursors or cursors of another ordering are rejected."""
+        result, status = self.product_manager.search_product(filters={'limit': 2, 'cursor': 'not-a-cursor'})
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        keys = self.product_manager._search_sort_keys({'sort_price': 'asc'})
+        cursor = backend.managers.pagination.encode_cursor(keys, self.product5)
+        result, status = self.product_manager.search_product(filters={'limit': 2, 'cursor': cursor})
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+    def test_search_product_fuzzy_name(self) -> None:
+        """Test fuzzy search matches names by trigram similarity and ranks the most similar first."""
+        self.flask_app.config['SEARCH_SIMILARITY_THRESHOLD'] = 0.4
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = [
+            self.product1, self.product3
+        ]
+        result_products, result_product_ids, status = self.extract_product_info_for_filters(
+            {'name': 'Aple', 'fuzzy': True}
+        )
+
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(result_product_ids, [1, 3])
+        # Threshold of the similarity operator is set for the transaction of the search.
+        statement, parameters = self.mock_db_session.execute.call_args.args
+        self.assertIn('pg_trgm.similarity_threshold', str(statement))
+        self.assertEqual(parameters, {'threshold': '0.4'})
+        conditions = self.product_manager._search_conditions({'name': 'Aple', 'fuzzy': True})
+        sql = str(sqlalchemy.and_(*conditions).compile(dialect=sqlalchemy.dialects.postgresql.dialect()))
+        self.assertIn('products.name_normalized %', sql)
+        order = self.mock_product_query.filter.return_value.order_by.call_args.args[0]
+        sql = str(order.compile(dialect=sqlalchemy.dialects.postgresql.dialect()))
+        self.assertIn('similarity(products.name_normalized', sql)
+
+    def test_search_product_city_name_filter(self) -> None:
+        """Test applying filter on city name."""
+        conditions = self.product_manager._search_conditions({'city_name': 'Kazan'})
+        sql = str(sqlalchemy.and_(*conditions).compile(dialect=sqlalchemy.dialects.postgresql.dialect()))
+        self.assertIn('products.city_name_normalized ILIKE', sql)
+
+    def test_search_product_full_text_query(self) -> None:
+        """Test full-text query is matched against the indexed search document."""
+        conditions = self.product_manager._search_conditions({'q': 'iphone -pro'})
+        sql = str(sqlalchemy.and_(*conditions).compile(dialect=sqlalchemy.dialects.postgresql.dialect()))
+        self.assertIn('products.search_vector @@ websearch_to_tsquery', sql)
+
+        self.mock_product_query.filter.return_value.all.return_value = [self.product1]
+        result_products, result_product_ids, status = self.extract_product_info_for_filters({'q': 'iphone'})
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(result_product_ids, [1])
+
+    def test_search_product_sort_relevance(self) -> None:
+        """Test sorting by relevance orders by the rank of the full-text query."""
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = [
+            self.product3, self.product1
+        ]
+        filters = {'q': 'apple', 'sort_relevance': 'dsc'}
+        result_products, result_product_ids, status = self.extract_product_info_for_filters(filters)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(result_product_ids, [3, 1])
+        order = self.mock_product_query.filter.return_value.order_by.call_args.args[0]
+        self.assertIn('ts_rank', str(order.compile(dialect=sqlalchemy.dialects.postgresql.dialect())))
+
+    def test_search_product_paginated_sort_relevance_cursor(self) -> None:
+        """Test cursor of a page sorted by relevance contains the rank of the last product."""
+        self.product1.search_rank = 0.5
+        self.product3.search_rank = 0.25
+        query = self.mock_product_query.filter.return_value.options.return_value.order_by.return_value
+        query.limit.return_value.all.return_value = [self.product1, self.product3]
+        filters = {'q': 'apple', 'sort_relevance': 'dsc', 'limit': 1}
+        result, status = self.product_manager.search_product(filters=filters)
+
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        keys = self.product_manager._search_sort_keys(filters)
+        self.assertEqual(backend.managers.pagination.decode_cursor(keys, result.json['next_cursor']), [0.5, 1])
+
     def test_get_product_by_id(self) -> None:
         """Test Retrieving product by id."""
-        self.mock_product_query.get.return_value = self.product1
-        self.mock_user_query.get.return_value = self.user1
+        self.mock_db_session.get.return_value = self.product1
         result, status = self.product_manager.get_product(1)
         self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
         expected = {
             'category': None, 'city_name': None, 'created_at': None, 'description': None, 'id': 1, 'is_banned': None,
-            'name': 'Apple iPhone 13', 'pictures': [], 'price': 999.99,
+            'name': 'Apple iPhone 13', 'pictures': [], 'picture_variants': [], 'price': 999.99,
             'seller': {
                 'email': 'seller@email.com', 'first_name': None, 'is_admin': None, 'is_banned': None,
                 'is_verified': None, 'last_name': None, 'phone_number': None, 'profile_picture': None,
-                'username': 'seller1', 'address': None}, 'status': 'reserved', 'user_username': 'seller1'}
+                'profile_picture_variants': {}, 'username': 'seller1', 'address': None},
+            'status': 'reserved', 'user_username': 'seller1'}
         self.assertEqual(expected, result.json['product'])
 
     def test_get_product_by_id_returns_seller_info_too(self) -> None:
         """Test Retrieving product by id."""
-        self.mock_user_query.get.return_value = self.user1
-        self.mock_product_query.get.return_value = self.product4
+        self.mock_db_session.get.return_value = self.product4
         result, status = self.product_manager.get_product(4)
         self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
         expected_product = self.product4.to_dict()
@@ -193,7 +321,6 @@ class ProductManagerTest(absltest.TestCase):
     def test_edit_product_success(self):
         """Test successful editing of a product."""
         self.mock_product_query.filter_by.return_value.first.return_value = self.product5
-        self.mock_user_query.get.return_value = self.user1
         product_data = {
             'name': 'Laptop Lenovo',
             'price': 499.99,
@@ -223,7 +350,7 @@ class ProductManagerTest(absltest.TestCase):
 
     def test_get_products_success(self):
         """Test retrieving a list of products for a user."""
-        self.mock_product_query.filter_by.return_value.all.return_value = [
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = [
             self.product6, self.product7, self.product8
         ]
         with mock.patch("flask_jwt_extended.get_jwt_identity", return_value='seller2'):
@@ -237,7 +364,7 @@ class ProductManagerTest(absltest.TestCase):
 
     def test_get_products_no_products(self):
         """Test retrieving products when no products exist for a user."""
-        self.mock_product_query.filter_by.return_value.all.return_value = []
+        self.mock_product_query.filter.return_value.order_by.return_value.all.return_value = []
         with mock.patch("flask_jwt_extended.get_jwt_identity", return_value='empty_user'):
             response, status_code = self.product_manager.get_products('empty_user')
         self.assertEqual(status_code, backend.initializers.settings.HTTPStatus.OK.value)
@@ -275,16 +402,721 @@ class ProductManagerTest(absltest.TestCase):
         self.mock_product_query.filter_by.return_value.all.return_value = [product]
         self.mock_product_picture_query.filter_by.return_value.all.return_value = [product_picture]
         self.mock_product_report_query.filter_by.return_value.all.return_value = [product_report]
+        mock_release = mock.patch.object(backend.managers.storage, 'release').start()
 
         response, status_code = self.product_manager.delete_product(user.username, product.id)
 
         self.assertEqual(status_code, backend.initializers.settings.HTTPStatus.NO_CONTENT.value)
+        mock_release.assert_called_once_with(['picture.jpg'])
 
         self.mock_product_picture_query.filter_by(product_id=product.id).delete.assert_called_once()
         self.mock_product_report_query.filter_by(product_id=product.id).delete.assert_called_once()
         self.mock_product_query.filter_by(id=product.id).delete.assert_called_once()
 
 
+class ProductManagerDatabaseTest(absltest.TestCase):
+    """Tests product manager against an in-memory database."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        # Undo model mocks which may have been left started by other tests.
+        mock.patch.stopall()
+        self.flask_app = backend.initializers.test_util.create_database_app()
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+        self.product_manager = backend.managers.product.ProductManager(flask_app=self.flask_app)
+        self.admin_manager = backend.managers.admin.AdminManager(flask_app=self.flask_app)
+        self.products_count = 0
+
+    def tearDown(self) -> None:
+        backend.initializers.database.DB.session.remove()
+        self.app_context.pop()
+        super().tearDown()
+
+    def create_products(self, count: int, is_banned: bool = False) -> None:
+        """Create products, each one with a distinct seller and two pictures."""
+        session = backend.initializers.database.DB.session
+        for _ in range(count):
+            self.products_count += 1
+            username = f'seller{self.products_count}'
+            session.add(backend.models.user.User(username=username, password='password', email=f'{username}@email.com'))
+            product = backend.models.product.Product(
+                name=f'product{self.products_count}', price=self.products_count, user_username=username,
+                status='for sale', category='Others', is_banned=is_banned,
+            )
+            session.add(product)
+            session.flush()
+            session.add(backend.models.product.Picture(filename=f'{username}_1.jpg', product_id=product.id))
+            session.add(backend.models.product.Picture(filename=f'{username}_2.jpg', product_id=product.id))
+        session.commit()
+        # Products are written without the manager, which would have dropped cached search results.
+        backend.managers.product.ProductManager.invalidate_search_cache()
+
+    def count_queries(self, method, *args) -> (int, dict):
+        """Returns number of queries issued by the method and its JSON response."""
+        # Start from an empty identity map, as a new request would.
+        backend.initializers.database.DB.session.expunge_all()
+        with backend.initializers.test_util.count_queries() as statements:
+            response, _ = method(*args)
+        return len(statements), response.json
+
+    def test_search_product_query_count_is_constant(self) -> None:
+        """Test searching products loads sellers and pictures without a query per product."""
+        self.create_products(2)
+        small_count, _ = self.count_queries(self.product_manager.search_product, {})
+        self.create_products(20)
+        large_count, response = self.count_queries(self.product_manager.search_product, {})
+
+        self.assertEqual(small_count, large_count)
+        self.assertLen(response['products'], 22)
+        for product in response['products']:
+            self.assertEqual(product['seller']['username'], product['user_username'])
+            self.assertLen(product['pictures'], 2)
+
+    def test_search_product_page_query_count_is_constant(self) -> None:
+        """Test a page of search results is loaded with a constant number of queries."""
+        self.create_products(22)
+        small_count, _ = self.count_queries(self.product_manager.search_product, {'limit': 2})
+        large_count, response = self.count_queries(self.product_manager.search_product, {'limit': 20})
+
+        self.assertEqual(small_count, large_count)
+        self.assertLen(response['products'], 20)
+        self.assertIsNotNone(response['next_cursor'])
+
+    def test_search_product_pages_cover_all_products(self) -> None:
+        """Test following cursors visits every product exactly once in the requested order."""
+        self.create_products(7)
+        filters = {'sort_price': 'dsc', 'limit': 3}
+        prices = []
+        while True:
+            response, _ = self.product_manager.search_product(filters)
+            prices.extend(product['price'] for product in response.json['products'])
+            if not response.json['next_cursor']:
+                break
+            filters['cursor'] = response.json['next_cursor']
+        self.assertEqual(prices, [7, 6, 5, 4, 3, 2, 1])
+
+    def test_search_product_hides_banned_products_and_sellers(self) -> None:
+        """Test banned products and products of banned sellers are filtered by the database."""
+        self.create_products(3)
+        self.create_products(1, is_banned=True)
+        backend.models.user.User.query.filter_by(username='seller1').update({'is_banned': True})
+        backend.initializers.database.DB.session.commit()
+
+        with backend.initializers.test_util.count_queries() as statements:
+            response, _ = self.product_manager.search_product({})
+        self.assertEqual([product['name'] for product in response.json['products']], ['product2', 'product3'])
+        self.assertIn('users.is_banned IS NOT', statements[0])
+
+        response, _ = self.product_manager.search_product({'limit': 1})
+        self.assertEqual([product['name'] for product in response.json['products']], ['product2'])
+
+    def test_search_product_matches_spelling_variants(self) -> None:
+        """Test products created with Arabic code points are found by Persian search terms and vice versa."""
+        session = backend.initializers.database.DB.session
+        session.add(backend.models.user.User(username='seller', password='password', email='seller@email.com'))
+        session.commit()
+        for name, city_name in [('كتاب\u200cهاي قديمي', 'Tehran'), ('یخچال ۲ درب', 'Karaj')]:
+            self.product_manager.create_product({
+                'name': name, 'description': 'description', 'price': 1, 'user_username': 'seller',
+                'status': 'for sale', 'category': 'Others', 'city_name': city_name, 'images': [], 'images_path': [],
+            })
+
+        response, _ = self.product_manager.search_product(
+            {'name': backend.managers.normalization.normalize_text('کتابهای')}
+        )
+        names = [product['name'] for product in response.json['products']]
+        self.assertEqual(names, ['كتاب\u200cهاي قديمي'])
+        response, _ = self.product_manager.search_product(
+            {'name': backend.managers.normalization.normalize_text('يخچال 2')}
+        )
+        self.assertEqual([product['name'] for product in response.json['products']], ['یخچال ۲ درب'])
+        response, _ = self.product_manager.search_product({'city_name': 'kara'})
+        self.assertEqual([product['city_name'] for product in response.json['products']], ['Karaj'])
+
+    def test_search_product_serves_cached_results(self) -> None:
+        """Test repeating a search with equivalent filters doesn't query the database."""
+        self.create_products(3)
+        response, _ = self.product_manager.search_product({'status': ['for sale', 'sold'], 'sort_price': 'dsc'})
+
+        count, cached_response = self.count_queries(
+            self.product_manager.search_product, {'sort_price': 'dsc', 'status': ['sold', 'for sale']}
+        )
+        self.assertEqual(count, 0)
+        self.assertEqual(cached_response, response.json)
+
+    def test_search_product_cache_is_invalidated_by_writes(self) -> None:
+        """Test cached search results are dropped when a product is edited, banned, unbanned or deleted."""
+        self.create_products(2)
+
+        def search_names() -> list:
+            response, _ = self.product_manager.search_product({'sort_price': 'asc'})
+            return [product['name'] for product in response.json['products']]
+
+        self.assertEqual(search_names(), ['product1', 'product2'])
+        self.product_manager.edit_product('seller1', 1, {'name': 'edited'})
+        self.assertEqual(search_names(), ['edited', 'product2'])
+        self.admin_manager.ban_product(2)
+        self.assertEqual(search_names(), ['edited'])
+        self.admin_manager.unban_product(2)
+        self.assertEqual(search_names(), ['edited', 'product2'])
+        self.product_manager.delete_product('seller1', 1)
+        self.assertEqual(search_names(), ['product2'])
+
+    def test_search_product_reuses_cached_cards(self) -> None:
+        """Test searches splice cached products, loading only the ones which aren't cached yet."""
+        self.create_products(3)
+        _, expected = self.count_queries(self.product_manager.search_product, {'sort_price': 'asc', 'limit': 2})
+        self.create_products(1)
+
+        count, response = self.count_queries(self.product_manager.search_product, {'sort_price': 'asc'})
+        # IDs and versions of products, and the product which isn't cached yet with its pictures.
+        self.assertEqual(count, 3)
+        self.assertEqual(response['products'][:2], expected['products'])
+        self.assertLen(response['products'], 4)
+
+        backend.managers.product.ProductManager.invalidate_search_cache()
+        count, cached_response = self.count_queries(self.product_manager.search_product, {'sort_price': 'asc'})
+        self.assertEqual(count, 1)
+        self.assertEqual(cached_response, response)
+
+    def test_search_product_cards_follow_versions(self) -> None:
+        """Test cached products are replaced once the product or its seller is written."""
+        self.create_products(2)
+        self.product_manager.search_product({})
+
+        self.product_manager.edit_product('seller1', 1, {'price': 100})
+        seller = backend.models.user.User.query.filter_by(username='seller2').first()
+        # A seller written without the manager isn't invalidated explicitly, its version still changes.
+        seller.first_name = 'Seller'
+        seller.bump_version()
+        backend.initializers.database.DB.session.commit()
+        backend.managers.product.ProductManager.invalidate_search_cache()
+
+        _, response = self.count_queries(self.product_manager.search_product, {})
+        self.assertEqual(response['products'][0]['price'], 100)
+        self.assertEqual(response['products'][1]['seller']['first_name'], 'Seller')
+
+        self.product_manager.delete_product('seller1', 1)
+        _, response = self.count_queries(self.product_manager.search_product, {})
+        self.assertEqual([product['id'] for product in response['products']], [2])
+
+    def test_invalidate_product_cards(self) -> None:
+        """Test cards of written products and sellers are dropped from the cache."""
+        self.create_products(3)
+        self.product_manager.search_product({})
+        cache = self.product_manager._card_cache()
+        self.assertLen(cache, 3)
+
+        backend.managers.product.ProductManager.invalidate_product_cards([1])
+        self.assertLen(cache, 2)
+        backend.managers.product.ProductManager.invalidate_seller_product_cards('seller2')
+        self.assertLen(cache, 1)
+        self.assertIsNotNone(cache.get(3))
+
+    def test_search_facets(self) -> None:
+        """Test counts of facet values are computed over products matching the filters."""
+        self.create_products(5)
+        self.create_products(1, is_banned=True)
+        backend.models.product.Product.query.filter_by(id=2).update({'category': 'Kitchenware', 'status': 'sold'})
+        backend.initializers.database.DB.session.commit()
+        backend.managers.product.ProductManager.invalidate_search_cache()
+
+        count, response = self.count_queries(self.product_manager.search_facets, {}, 2)
+        self.assertEqual(count, 1)
+        self.assertEqual(response, {
+            'total': 5,
+            'category': {'Others': 4, 'Kitchenware': 1},
+            'status': {'for sale': 4, 'sold': 1},
+            'price': [
+                {'min': 0, 'max': 2, 'count': 1},
+                {'min': 2, 'max': 4, 'count': 2},
+                {'min': 4, 'max': 6, 'count': 2},
+            ],
+        })
+
+        _, response = self.count_queries(self.product_manager.search_facets, {'status': ['for sale']}, 10)
+        self.assertEqual(response, {
+            'total': 4,
+            'category': {'Others': 4},
+            'status': {'for sale': 4},
+            'price': [{'min': 0, 'max': 10, 'count': 4}],
+        })
+
+    def test_search_facets_are_cached(self) -> None:
+        """Test facets are served from the search cache until products change."""
+        self.create_products(2)
+        self.product_manager.search_facets({}, 10)
+        count, response = self.count_queries(self.product_manager.search_facets, {}, 10)
+        self.assertEqual(count, 0)
+        self.assertEqual(response['total'], 2)
+
+        self.admin_manager.ban_product(1)
+        _, response = self.count_queries(self.product_manager.search_facets, {}, 10)
+        self.assertEqual(response['total'], 1)
+
+    def test_search_product_stream(self) -> None:
+        """Test streamed search results are equal to the loaded ones, and aren't cached."""
+        self.create_products(30)
+        self.create_products(1, is_banned=True)
+        filters = {'status': ['for sale'], 'sort_price': 'dsc'}
+        expected, _ = self.product_manager.search_product(filters)
+
+        with self.flask_app.test_request_context():
+            with mock.patch('backend.initializers.settings.STREAM_BATCH_SIZE', 7):
+                response, status = self.product_manager.search_product(filters, stream=True)
+                self.assertTrue(response.is_streamed)
+                body = response.get_data()
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(flask.json.loads(body), expected.json)
+
+    def test_get_products_and_admin_lists_stream(self) -> None:
+        """Test streamed lists are equal to the loaded ones."""
+        self.create_products(3)
+        self.create_products(3, is_banned=True)
+        list_methods = [
+            (self.product_manager.get_products, 'seller1'),
+            (self.admin_manager.get_banned_product_list,),
+            (self.admin_manager.get_banned_user_list,),
+            (self.admin_manager.get_list_of_reported_products,),
+            (self.admin_manager.get_list_of_reported_users,),
+        ]
+        for method, *args in list_methods:
+            expected, _ = method(*args)
+            with self.flask_app.test_request_context():
+                response, _ = method(*args, stream=True)
+                self.assertTrue(response.is_streamed)
+                self.assertEqual(flask.json.loads(response.get_data()), expected.json)
+
+    def test_get_product_query_count(self) -> None:
+        """Test getting a product loads its seller and pictures in at most two queries."""
+        self.create_products(1)
+        count, response = self.count_queries(self.product_manager.get_product, 1)
+
+        self.assertLessEqual(count, 2)
+        self.assertEqual(response['product']['seller']['username'], 'seller1')
+        self.assertLen(response['product']['pictures'], 2)
+
+    def test_get_products_query_count_is_constant(self) -> None:
+        """Test listing products of a seller loads pictures without a query per product."""
+        session = backend.initializers.database.DB.session
+        session.add(backend.models.user.User(username='seller', password='password', email='seller@email.com'))
+        for i in range(10):
+            product = backend.models.product.Product(
+                name=f'product{i}', price=i, user_username='seller', status='for sale', category='Others'
+            )
+            session.add(product)
+            session.flush()
+            session.add(backend.models.product.Picture(filename=f'picture{i}.jpg', product_id=product.id))
+        session.commit()
+        count, response = self.count_queries(self.product_manager.get_products, 'seller')
+
+        self.assertLessEqual(count, 2)
+        self.assertLen(response['products'], 10)
+
+    def test_search_product_fields_load_only_requested_columns(self) -> None:
+        """Test searching products with sparse fields selects only their columns and skips unrequested relations."""
+        self.create_products(3)
+        backend.initializers.database.DB.session.expunge_all()
+        fields = {'name': None, 'seller': {'first_name'}}
+        with backend.initializers.test_util.count_queries() as statements:
+            response, _ = self.product_manager.search_product({'sort_price': 'asc'}, fields=fields)
+
+        self.assertLen(statements, 1)
+        for column in ('products.description', 'products.city_name', 'users.email', 'users.password', 'picture'):
+            self.assertNotIn(column, statements[0])
+        self.assertEqual(
+            response.json['products'],
+            [{'name': f'product{i}', 'seller': {'first_name': None}} for i in range(1, 4)]
+        )
+
+    def test_search_product_fields_pages_cover_all_products(self) -> None:
+        """Test paginated searches with sparse fields still build cursors from unrequested sort keys."""
+        self.create_products(5)
+        filters = {'sort_price': 'dsc', 'limit': 2}
+        names = []
+        while True:
+            response, status = self.product_manager.search_product(filters, fields={'name': None})
+            self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+            names.extend(product['name'] for product in response.json['products'])
+            if not response.json['next_cursor']:
+                break
+            filters = {**filters, 'cursor': response.json['next_cursor']}
+
+        self.assertEqual(names, [f'product{i}' for i in range(5, 0, -1)])
+
+    def test_search_product_cache_key_includes_fields(self) -> None:
+        """Test cached searches with different fields aren't served each other's results."""
+        self.create_products(1)
+        response, _ = self.product_manager.search_product({}, fields={'name': None})
+        self.assertEqual(response.json['products'], [{'name': 'product1'}])
+        response, _ = self.product_manager.search_product({}, fields={'price': None})
+        self.assertEqual(response.json['products'], [{'price': 1}])
+
+    def test_get_product_fields(self) -> None:
+        """Test getting a product with sparse fields loads neither its seller nor pictures unless requested."""
+        self.create_products(1)
+        count, response = self.count_queries(self.product_manager.get_product, 1, {'price': None})
+
+        self.assertEqual(count, 1)
+        self.assertEqual(response['product'], {'price': 1})
+
+        count, response = self.count_queries(self.product_manager.get_product, 1, {'pictures': None, 'seller': None})
+        self.assertLessEqual(count, 2)
+        self.assertLen(response['product']['pictures'], 2)
+        self.assertEqual(response['product']['seller']['username'], 'seller1')
+
+    def test_get_product_etag(self) -> None:
+        """Test a product is answered with 304 until it or its embedded seller is written."""
+        self.create_products(1)
+
+        def get_product(entity_tag: str = None, fields: dict = None) -> (flask.Response, int):
+            backend.initializers.database.DB.session.expunge_all()
+            headers = {'If-None-Match': f'"{entity_tag}"'} if entity_tag else {}
+            with self.flask_app.test_request_context(headers=headers):
+                return self.product_manager.get_product(1, fields)
+
+        response, status = get_product()
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        entity_tag, weak = response.get_etag()
+        self.assertFalse(weak)
+        response, status = get_product(entity_tag)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value)
+        self.assertEqual(response.get_data(), b'')
+        # Other fields are another representation.
+        _, status = get_product(entity_tag, {'name': None})
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+
+        self.product_manager.edit_product('seller1', 1, {'price': 2})
+        response, status = get_product(entity_tag)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(response.json['product']['price'], 2)
+        entity_tag, _ = response.get_etag()
+
+        name_tag, _ = get_product(fields={'name': None})[0].get_etag()
+        self.admin_manager.ban_user('seller1')
+        _, status = get_product(entity_tag)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        # The seller isn't part of a representation without it.
+        _, status = get_product(name_tag, {'name': None})
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value)
+
+    def test_get_products_etag(self) -> None:
+        """Test a list of products is answered with 304 until a product of it is added, written or removed."""
+        self.create_products(2)
+
+        def get_products(entity_tag: str = None, stream: bool = False) -> (flask.Response, int):
+            backend.initializers.database.DB.session.expunge_all()
+            headers = {'If-None-Match': f'"{entity_tag}"'} if entity_tag else {}
+            with self.flask_app.test_request_context(headers=headers):
+                return self.product_manager.get_products('seller1', stream)
+
+        response, _ = get_products()
+        entity_tag, _ = response.get_etag()
+        # The ETag of loaded products is equal to the one aggregated in the database.
+        self.assertEqual(get_products(stream=True)[0].get_etag(), (entity_tag, False))
+        with backend.initializers.test_util.count_queries() as statements:
+            response, status = get_products(entity_tag)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value)
+        self.assertEmpty(statements)  # The list is cached.
+        backend.managers.product.ProductManager.invalidate_seller_products('seller1')
+        with backend.initializers.test_util.count_queries() as statements:
+            response, status = get_products(entity_tag)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value)
+        self.assertLen(statements, 1)
+
+        self.admin_manager.ban_product(1)
+        response, status = get_products(entity_tag)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        entity_tag, _ = response.get_etag()
+
+        self.product_manager.delete_product('seller1', 1)
+        response, status = get_products(entity_tag)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(response.json['products'], [])
+
+    def test_get_products_cache_bounds_pages(self) -> None:
+        """Test pages of a single seller's list are evicted by the size of the seller products cache."""
+        self.create_products(3)
+        self.flask_app.config['SELLER_PRODUCTS_CACHE_SIZE'] = 3
+        for limit in range(1, 6):
+            self.product_manager.get_products('seller1', filters={'limit': limit})
+
+        cache = self.flask_app.extensions[backend.managers.product.ProductManager.SELLER_PRODUCTS_CACHE_EXTENSION]
+        self.assertLen(cache, 3)
+        # The most recently used pages are still served from the cache.
+        count, _ = self.count_queries(self.product_manager.get_products, 'seller1', False, None, {'limit': 5})
+        self.assertEqual(count, 0)
+
+    def test_get_products_pages(self) -> None:
+        """Test pages of a seller's products cover the filtered list, the newest first."""
+        session = backend.initializers.database.DB.session
+        session.add(backend.models.user.User(username='seller', password='password', email='seller@email.com'))
+        created_at = datetime.datetime(2024, 1, 1)
+        for i in range(7):
+            session.add(backend.models.product.Product(
+                name=f'product{i}', price=i, user_username='seller', status='sold' if i % 3 == 0 else 'for sale',
+                category='Others', created_at=created_at + datetime.timedelta(days=i // 2),
+            ))
+        session.commit()
+
+        names = []
+        filters = {'status': ['for sale'], 'limit': 2}
+        while True:
+            count, response = self.count_queries(self.product_manager.get_products, 'seller', False, None, filters)
+            self.assertLessEqual(count, 2)
+            names.extend(product['name'] for product in response['products'])
+            if response['next_cursor'] is None:
+                break
+            filters = {**filters, 'cursor': response['next_cursor']}
+        self.assertEqual(names, ['product5', 'product4', 'product2', 'product1'])
+
+        response, status = self.product_manager.get_products('seller', filters={'limit': 2, 'cursor': 'invalid'})
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+    def test_get_products_cache_is_invalidated_by_seller_writes(self) -> None:
+        """Test cached lists of a seller are served until a product of the seller is written."""
+        self.create_products(2)
+
+        def get_names(username: str) -> (int, list):
+            count, response = self.count_queries(self.product_manager.get_products, username)
+            return count, [product['name'] for product in response['products']]
+
+        self.assertEqual(get_names('seller1')[1], ['product1'])
+        self.assertEqual(get_names('seller1'), (0, ['product1']))
+        self.product_manager.edit_product('seller1', 1, {'name': 'edited'})
+        self.assertEqual(get_names('seller1')[1], ['edited'])
+        get_names('seller2')
+        self.admin_manager.ban_product(2)
+        self.assertEqual(get_names('seller1')[0], 0)
+        self.assertNotEqual(get_names('seller2')[0], 0)
+        self.product_manager.delete_product('seller1', 1)
+        self.assertEqual(get_names('seller1')[1], [])
+
+    def test_import_products(self) -> None:
+        """Test valid rows of an imported file are created in batches, and invalid rows are reported."""
+        self.create_products(1)
+        self.product_manager.suggest('p', 10)
+        self.product_manager.get_products('seller1')
+        lines = [
+            {'name': f'Imported {i}', 'price': i, 'description': 'Imported.', 'status': 'for sale',
+             'category': 'Others', 'city_name': 'Tehran'}
+            for i in range(5)
+        ]
+        lines[1]['status'] = 'new'
+        stream = io.BytesIO(b'\n'.join(json.dumps(line).encode() for line in [*lines, [1]]))
+
+        with mock.patch.object(backend.initializers.settings, 'PRODUCT_IMPORT_BATCH_SIZE', 2):
+            response, status = self.product_manager.import_products(
+                'seller1', backend.managers.product_import.read_rows('ndjson', stream)
+            )
+
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(response.json, {
+            'created': 4,
+            'failed': 2,
+            'errors': [
+                {'row': 2, 'message': 'Invalid value for status.'},
+                {'row': 6, 'message': 'Row must be a JSON object.'},
+            ],
+        })
+        # Imported products are searchable, listed and suggested right away.
+        response, _ = self.product_manager.search_product({'name': 'imported'})
+        self.assertEqual(sorted(product['price'] for product in response.json['products']), [0, 2, 3, 4])
+        response, _ = self.product_manager.get_products('seller1')
+        self.assertLen(response.json['products'], 5)
+        response, _ = self.product_manager.suggest('imp', 10)
+        self.assertLen(response.json['names'], 4)
+
+    def test_record_picture_variants(self) -> None:
+        """Test variants are stored on the picture, and replace cached copies of its product."""
+        self.create_products(1)
+        response, _ = self.product_manager.get_product_batch([1])
+        self.assertEqual(response.json['products'][0]['picture_variants'], [{}, {}])
+        picture = backend.models.product.Picture.query.filter_by(filename='seller1_1.jpg').one()
+
+        recorded = self.product_manager.record_picture_variants(
+            picture.id, picture.filename, {'thumbnail': 'seller1_1_thumbnail.webp'}
+        )
+
+        self.assertTrue(recorded)
+        response, _ = self.product_manager.get_product_batch([1])
+        self.assertEqual(response.json['products'][0]['picture_variants'], [
+            {'thumbnail': '/backend/uploads/seller1_1_thumbnail.webp'}, {}
+        ])
+        self.assertEqual(backend.initializers.database.DB.session.get(backend.models.product.Product, 1).version, 2)
+        # Pictures removed before their variants are generated aren't recorded, and their files are queued for removal.
+        self.assertFalse(self.product_manager.record_picture_variants(100, 'removed.jpg', {'thumbnail': 'x.webp'}))
+        self.assertEqual(
+            [row.name for row in backend.models.upload.PendingFileRemoval.query.all()], ['removed.jpg']
+        )
+
+    def test_get_product_batch(self) -> None:
+        """Test a batch of products is returned in the order of requested IDs, with IDs which weren't found."""
+        self.create_products(5)
+        count, response = self.count_queries(self.product_manager.get_product_batch, [4, 99, 2, 4, 5])
+
+        self.assertLessEqual(count, 3)
+        self.assertEqual([product['id'] for product in response['products']], [4, 2, 5])
+        self.assertEqual(response['missing'], [99])
+        self.assertEqual(response['products'][0]['seller']['username'], 'seller4')
+        self.assertLen(response['products'][0]['pictures'], 2)
+
+        # Cached products are spliced without loading them.
+        count, cached_response = self.count_queries(self.product_manager.get_product_batch, [4, 99, 2, 4, 5])
+        self.assertEqual(count, 1)
+        self.assertEqual(cached_response, response)
+
+    def test_get_product_batch_fields(self) -> None:
+        """Test a batch of products with sparse fields is loaded by a single query."""
+        self.create_products(3)
+        count, response = self.count_queries(
+            self.product_manager.get_product_batch, [3, 1], {'name': None, 'seller': {'username'}}
+        )
+
+        self.assertEqual(count, 1)
+        self.assertEqual(response, {
+            'products': [
+                {'name': 'product3', 'seller': {'username': 'seller3'}},
+                {'name': 'product1', 'seller': {'username': 'seller1'}},
+            ],
+            'missing': [],
+        })
+
+    def test_suggest(self) -> None:
+        """Test suggestions are built from visible products without querying again."""
+        self.create_products(3)
+        self.create_products(1, is_banned=True)
+
+        count, response = self.count_queries(self.product_manager.suggest, 'PRODUCT', 10)
+        self.assertEqual(count, 1)
+        self.assertEqual([name['text'] for name in response['names']], ['product1', 'product2', 'product3'])
+        count, response = self.count_queries(self.product_manager.suggest, 'product3', 10)
+        self.assertEqual(count, 0)
+        self.assertEqual(response['names'], [{'text': 'product3', 'count': 1}])
+
+    def test_suggest_follows_writes(self) -> None:
+        """Test suggestions are updated when products are edited, deleted, banned or unbanned."""
+        self.create_products(3)
+        self.product_manager.suggest('p', 10)
+
+        def suggest_names() -> list:
+            response, _ = self.product_manager.suggest('', 10)
+            return sorted(name['text'] for name in response.json['names'])
+
+        self.product_manager.edit_product('seller1', 1, {'name': 'Phone', 'city_name': 'Tehran'})
+        self.assertEqual(suggest_names(), ['Phone', 'product2', 'product3'])
+        response, _ = self.product_manager.suggest('teh', 10)
+        self.assertEqual(response.json['cities'], [{'text': 'Tehran', 'count': 1}])
+        self.admin_manager.ban_product(2)
+        self.assertEqual(suggest_names(), ['Phone', 'product3'])
+        # Banning the seller of a banned product doesn't remove it twice.
+        self.admin_manager.ban_user('seller2')
+        self.admin_manager.ban_user('seller3')
+        self.assertEqual(suggest_names(), ['Phone'])
+        self.admin_manager.unban_user('seller3')
+        self.admin_manager.unban_user('seller2')
+        self.assertEqual(suggest_names(), ['Phone', 'product3'])
+        self.admin_manager.unban_product(2)
+        self.assertEqual(suggest_names(), ['Phone', 'product2', 'product3'])
+        self.product_manager.delete_product('seller1', 1)
+        self.assertEqual(suggest_names(), ['product2', 'product3'])
+
+        # Updated suggestions are the ones built from the database.
+        self.assertEqual(
+            backend.managers.product.ProductManager.build_suggestions().names.suggest('', 10),
+            self.product_manager._suggestions().names.suggest('', 10),
+        )
+
+    def test_get_similar_products(self) -> None:
+        """Test similar products are ranked by the index, leaving out the product itself and hidden products."""
+        session = backend.initializers.database.DB.session
+        self.create_products(6)
+        for product_id, name, city_name in [
+            (1, 'red phone', 'Tehran'), (2, 'red phone case', 'Tehran'), (3, 'blue phone', 'Kazan'),
+            (4, 'red phone', 'Tehran'), (5, 'red phone', 'Tehran'), (6, 'wooden chair', 'Tehran'),
+        ]:
+            product = session.get(backend.models.product.Product, product_id)
+            product.name, product.city_name = name, city_name
+        session.commit()
+
+        response, status = self.product_manager.get_similar_products(1, 3)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual([product['id'] for product in response.json['products']], [5, 4, 2])
+        self.assertEqual(response.json['products'][0]['seller']['username'], 'seller5')
+
+        # Products banned or sold after the index was built are left out until it's rebuilt.
+        self.admin_manager.ban_product(5)
+        self.product_manager.edit_product('seller4', 4, {'status': 'sold'})
+        response, _ = self.product_manager.get_similar_products(1, 3)
+        self.assertEqual([product['id'] for product in response.json['products']], [2, 3, 6])
+
+        response, status = self.product_manager.get_similar_products(99, 3)
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.NOT_FOUND.value)
+
+    def test_get_similar_products_ranks_more_candidates_when_many_are_hidden(self) -> None:
+        """Test similar products are filled up to the limit when most top candidates changed since the index."""
+        session = backend.initializers.database.DB.session
+        self.create_products(10)
+        names = {1: 'red phone', 8: 'red phone case', 9: 'blue phone', 10: 'wooden chair'}
+        for product_id in range(1, 11):
+            product = session.get(backend.models.product.Product, product_id)
+            product.name, product.city_name = names.get(product_id, 'red phone'), 'Tehran'
+        session.commit()
+        response, _ = self.product_manager.get_similar_products(1, 2)
+        self.assertLen(response.json['products'], 2)
+
+        # The six most similar products are sold or banned after the index was built, more than twice the limit.
+        for product_id in range(2, 8):
+            product = session.get(backend.models.product.Product, product_id)
+            if product_id % 2:
+                product.status = 'sold'
+            else:
+                product.is_banned = True
+        session.commit()
+        response, status = self.product_manager.get_similar_products(1, 2)
+
+        self.assertEqual(status, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual([product['id'] for product in response.json['products']], [8, 9])
+        self.flask_app.config['PRODUCT_CARD_CACHE_SIZE'] = 0
+        del self.flask_app.extensions[backend.managers.product.ProductManager.CARD_CACHE_EXTENSION]
+        response, _ = self.product_manager.get_similar_products(1, 3)
+        self.assertEqual([product['id'] for product in response.json['products']], [8, 9, 10])
+
+    def test_similarity_index_is_refreshed(self) -> None:
+        """Test a stale similarity index is served while a single background thread rebuilds it."""
+        self.create_products(2)
+        self.flask_app.config['SIMILARITY_REFRESH_SECONDS'] = 60
+        index = self.product_manager._similarity_index()
+        self.assertLen(index, 2)
+        self.create_products(1)
+        self.assertIs(self.product_manager._similarity_index(), index)
+
+        threads = []
+        with mock.patch('time.monotonic', return_value=index.built_at + 60), \
+                mock.patch.object(backend.managers.product.threading, 'Thread') as mock_thread:
+            mock_thread.side_effect = lambda **kwargs: threads.append(kwargs) or mock.Mock()
+            self.assertIs(self.product_manager._similarity_index(), index)
+            # Requests during the rebuild don't start another one.
+            self.assertIs(self.product_manager._similarity_index(), index)
+        self.assertLen(threads, 1)
+
+        threads[0]['target'](*threads[0]['args'])
+        self.assertLen(self.product_manager._similarity_index(), 3)
+        lock = self.flask_app.extensions[backend.managers.product.ProductManager.SIMILARITY_LOCK_EXTENSION]
+        self.assertFalse(lock.locked())
+
+    def test_get_banned_product_list_query_count_is_constant(self) -> None:
+        """Test listing banned products loads pictures without a query per product."""
+        self.create_products(2, is_banned=True)
+        small_count, _ = self.count_queries(self.admin_manager.get_banned_product_list)
+        self.create_products(20, is_banned=True)
+        large_count, response = self.count_queries(self.admin_manager.get_banned_product_list)
+
+        self.assertEqual(small_count, large_count)
+        self.assertLen(response['banned_products'], 22)
+
+
 if __name__ == "__main__":
     backend.initializers.test_util.pass_flags_as_parsed()
     absltest.main()
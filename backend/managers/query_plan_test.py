@@ -0,0 +1,190 @@
+import os
+
+import sqlalchemy
+from absl.testing import absltest
+from unittest import mock
+
+import backend.initializers.database
+import backend.initializers.test_util
+import backend.managers.admin
+import backend.managers.product
+import backend.managers.user
+import backend.models.product
+import backend.models.report
+import backend.models.user
+
+# URI of a PostgreSQL database the tests may wipe, plans of other databases are not representative.
+DATABASE_URI_ENVIRONMENT_VARIABLE = 'BACKEND_TEST_DATABASE_URI'
+PRODUCTS_COUNT = 20000
+SELLERS_COUNT = 5000
+BANNED_PRODUCTS_COUNT = 10
+BANNED_USERS_COUNT = 5
+UNRESOLVED_REPORTS_COUNT = 5
+RESOLVED_REPORTS_COUNT = 2000
+
+
+@absltest.skipUnless(
+    os.environ.get(DATABASE_URI_ENVIRONMENT_VARIABLE),
+    f'{DATABASE_URI_ENVIRONMENT_VARIABLE} is not set.'
+)
+class QueryPlanTest(absltest.TestCase):
+    """Tests queries issued by the managers are answered by indexes instead of sequential scans."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # Undo model mocks which may have been left started by other tests.
+        mock.patch.stopall()
+        cls.flask_app = backend.initializers.test_util.create_database_app(
+            os.environ[DATABASE_URI_ENVIRONMENT_VARIABLE]
+        )
+        with cls.flask_app.app_context():
+            backend.initializers.database.DB.drop_all()
+            backend.initializers.database.DB.create_all()
+            cls.seed()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        with cls.flask_app.app_context():
+            backend.initializers.database.DB.drop_all()
+        super().tearDownClass()
+
+    @staticmethod
+    def seed() -> None:
+        """Fill tables with enough rows, distributed like production ones, for the planner to prefer indexes."""
+        session = backend.initializers.database.DB.session
+        session.execute(sqlalchemy.insert(backend.models.user.User), [
+            {
+                'username': f'seller{i}',
+                'password': 'password',
+                'email': f'seller{i}@email.com',
+                'is_banned': i < BANNED_USERS_COUNT,
+            }
+            for i in range(SELLERS_COUNT)
+        ])
+        statuses = backend.models.product.Product.STATUS_OPTIONS
+        categories = backend.models.product.Product.CATEGORY_OPTIONS
+        session.execute(sqlalchemy.insert(backend.models.product.Product), [
+            {
+                'name': f'widget {i:05d}',
+                'name_normalized': f'widget {i:05d}',
+                'price': i % 1000,
+                'user_username': f'seller{i % SELLERS_COUNT}',
+                # Most products are for sale, only a few are sold or reserved.
+                'status': statuses[0] if i % 100 else statuses[1 + i // 100 % 2],
+                'category': categories[i % len(categories)],
+                'is_banned': i < BANNED_PRODUCTS_COUNT,
+            }
+            for i in range(PRODUCTS_COUNT)
+        ])
+        session.execute(sqlalchemy.insert(backend.models.product.Picture), [
+            {'filename': f'picture{i}.jpg', 'product_id': i + 1} for i in range(PRODUCTS_COUNT)
+        ])
+        reports_count = UNRESOLVED_REPORTS_COUNT + RESOLVED_REPORTS_COUNT
+        session.execute(sqlalchemy.insert(backend.models.report.ProductReport), [
+            {
+                'reported_product': i + 1,
+                'reporter_username': f'seller{i % SELLERS_COUNT}',
+                'description': 'report',
+                'is_resolved': i >= UNRESOLVED_REPORTS_COUNT,
+            }
+            for i in range(reports_count)
+        ])
+        session.execute(sqlalchemy.insert(backend.models.report.UserReport), [
+            {
+                'reported_user': f'seller{i % SELLERS_COUNT}',
+                'reporter_username': f'seller{(i + 1) % SELLERS_COUNT}',
+                'description': 'report',
+                'is_resolved': i >= UNRESOLVED_REPORTS_COUNT,
+            }
+            for i in range(reports_count)
+        ])
+        session.commit()
+        session.execute(sqlalchemy.text('ANALYZE'))
+        session.commit()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+        self.product_manager = backend.managers.product.ProductManager(flask_app=self.flask_app)
+        self.admin_manager = backend.managers.admin.AdminManager(flask_app=self.flask_app)
+        self.user_manager = backend.managers.user.UserManager(flask_app=self.flask_app)
+
+    def tearDown(self) -> None:
+        backend.initializers.database.DB.session.remove()
+        self.app_context.pop()
+        super().tearDown()
+
+    def assertNoSequentialScan(self, method, *args) -> None:
+        """Asserts none of SELECT queries issued by the method scans a whole table."""
+        queries = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                queries.append((statement, parameters))
+
+        engine = backend.initializers.database.DB.engine
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            method(*args)
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        self.assertNotEmpty(queries)
+        connection = backend.initializers.database.DB.session.connection()
+        for statement, parameters in queries:
+            plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()[0]['Plan']
+            nodes = [plan]
+            while nodes:
+                node = nodes.pop()
+                self.assertNotEqual(
+                    node['Node Type'], 'Seq Scan',
+                    f"Sequential scan on {node.get('Relation Name')} for query:\n{statement}"
+                )
+                nodes.extend(node.get('Plans', []))
+
+    def test_search_product_by_name(self) -> None:
+        self.assertNoSequentialScan(self.product_manager.search_product, {'name': 'widget 01234'})
+
+    def test_search_product_by_status_and_category(self) -> None:
+        self.assertNoSequentialScan(
+            self.product_manager.search_product,
+            {'status': ['sold'], 'category': ['Automobile'], 'min_price': 10, 'max_price': 500}
+        )
+
+    def test_search_product_page(self) -> None:
+        self.assertNoSequentialScan(self.product_manager.search_product, {'limit': 20})
+
+    def test_get_product(self) -> None:
+        self.assertNoSequentialScan(self.product_manager.get_product, 1234)
+
+    def test_get_product_batch(self) -> None:
+        self.assertNoSequentialScan(self.product_manager.get_product_batch, [1234, 42, 9876])
+
+    def test_get_products(self) -> None:
+        self.assertNoSequentialScan(self.product_manager.get_products, 'seller1234')
+
+    def test_get_products_page(self) -> None:
+        self.assertNoSequentialScan(
+            self.product_manager.get_products, 'seller1234', False, None, {'status': ['sold'], 'limit': 20}
+        )
+
+    def test_get_profile(self) -> None:
+        self.assertNoSequentialScan(self.user_manager.get_profile, 'seller1234')
+
+    def test_get_banned_product_list(self) -> None:
+        self.assertNoSequentialScan(self.admin_manager.get_banned_product_list)
+
+    def test_get_banned_user_list(self) -> None:
+        self.assertNoSequentialScan(self.admin_manager.get_banned_user_list)
+
+    def test_get_list_of_reported_products(self) -> None:
+        self.assertNoSequentialScan(self.admin_manager.get_list_of_reported_products)
+
+    def test_get_list_of_reported_users(self) -> None:
+        self.assertNoSequentialScan(self.admin_manager.get_list_of_reported_users)
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -0,0 +1,115 @@
+import collections
+import re
+import time
+from typing import Iterable, Optional
+
+import numpy
+
+import backend.managers.normalization
+
+# Words of names describe a product better than words of descriptions, so they count as many occurrences.
+NAME_TERM_WEIGHT = 3
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def product_terms(
+        name: Optional[str], description: Optional[str], category: Optional[str], city_name: Optional[str]
+) -> collections.Counter:
+    """
+    Returns occurrences of terms of a product: normalized words of its name and description, its category and city.
+
+    Category and city are single terms with a prefix, so they never match words of names or descriptions.
+    """
+    terms = collections.Counter()
+    for word in _WORD_PATTERN.findall(backend.managers.normalization.normalize_text(name) or ''):
+        terms[word] += NAME_TERM_WEIGHT
+    terms.update(_WORD_PATTERN.findall(backend.managers.normalization.normalize_text(description) or ''))
+    if category:
+        terms[f'category:{category}'] += 1
+    city_name = backend.managers.normalization.normalize_text(city_name)
+    if city_name:
+        terms[f'city:{city_name}'] += 1
+    return terms
+
+
+class SimilarityIndex:
+    """
+    TF-IDF vectors of products, answering which products are the most similar to a given one by cosine similarity.
+
+    Vectors are kept as a sparse inverted index in NumPy arrays: for each term, the positions of the products
+    having it and their normalized weights. Scoring a product only touches products sharing a term with it,
+    each term with a single vectorized operation, so a query takes milliseconds even for large catalogs.
+    The index is immutable, it's rebuilt to follow changes of the products.
+    """
+
+    def __init__(self, products: Iterable):
+        """
+        Builds the index in a single pass over the products.
+
+        Args:
+            products (Iterable): (id, name, description, category, city_name) rows of the indexed products,
+                e.g., rows of a query.
+        """
+        self.vocabulary = {}
+        product_ids = []
+        term_counts = []
+        columns = []
+        counts = []
+        for product_id, name, description, category, city_name in products:
+            terms = product_terms(name, description, category, city_name)
+            product_ids.append(product_id)
+            term_counts.append(len(terms))
+            for term, count in terms.items():
+                columns.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+        self.built_at = time.monotonic()
+        self.product_ids = numpy.array(product_ids, dtype=numpy.int64)
+
+        rows = numpy.repeat(numpy.arange(len(product_ids)), term_counts)
+        columns = numpy.array(columns, dtype=numpy.int64)
+        document_frequencies = numpy.bincount(columns, minlength=len(self.vocabulary))
+        # Smoothed inverse document frequency, so terms of every product still have a positive weight.
+        self.idf = numpy.log((1 + len(product_ids)) / (1 + document_frequencies)) + 1
+        weights = (1 + numpy.log(numpy.array(counts, dtype=numpy.float64))) * self.idf[columns]
+        weights /= numpy.sqrt(numpy.bincount(rows, weights=weights ** 2, minlength=len(product_ids)))[rows]
+
+        order = numpy.argsort(columns, kind='stable')
+        self._rows = rows[order]
+        self._weights = weights[order]
+        self._offsets = numpy.concatenate(([0], numpy.cumsum(document_frequencies)))
+
+    def similar(self, terms: collections.Counter, limit: int, exclude_id: Optional[int] = None) -> list:
+        """
+        Returns indexed products the most similar to terms of a product, which doesn't need to be indexed.
+
+        Args:
+            terms (collections.Counter): Occurrences of terms of the product, see 'product_terms'.
+            limit (int): Maximum number of returned products.
+            exclude_id (int): ID of a product which isn't returned, e.g., the product itself.
+
+        Returns:
+            list: (id, score) pairs of products sharing a term with the given one, the most similar first.
+        """
+        known_terms = [(self.vocabulary[term], count) for term, count in terms.items() if term in self.vocabulary]
+        if not known_terms or limit < 1:
+            return []
+        columns, counts = numpy.array(known_terms, dtype=numpy.int64).T
+        weights = (1 + numpy.log(counts)) * self.idf[columns]
+        weights /= numpy.sqrt(numpy.sum(weights ** 2))
+
+        scores = numpy.zeros(len(self.product_ids))
+        for column, weight in zip(columns, weights):
+            start, end = self._offsets[column], self._offsets[column + 1]
+            scores[self._rows[start:end]] += weight * self._weights[start:end]
+        if exclude_id is not None:
+            scores[self.product_ids == exclude_id] = 0
+
+        candidates = numpy.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[numpy.argpartition(-scores[candidates], limit - 1)[:limit]]
+        # The most similar first, and the newest first among equally similar ones.
+        candidates = candidates[numpy.lexsort((-self.product_ids[candidates], -scores[candidates]))]
+        return [(int(self.product_ids[row]), float(scores[row])) for row in candidates]
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
@@ -0,0 +1,63 @@
+from absl.testing import absltest
+
+import backend.managers.similarity
+
+
+class ProductTermsTest(absltest.TestCase):
+    def test_product_terms(self) -> None:
+        terms = backend.managers.similarity.product_terms('Red  PHONE', 'A red phone, barely used.', 'Others', 'تهران')
+
+        self.assertEqual(terms['red'], backend.managers.similarity.NAME_TERM_WEIGHT + 1)
+        self.assertEqual(terms['barely'], 1)
+        self.assertEqual(terms['category:Others'], 1)
+        self.assertEqual(terms['city:تهران'], 1)
+
+    def test_product_terms_of_missing_fields(self) -> None:
+        self.assertEqual(backend.managers.similarity.product_terms(None, None, None, None), {})
+
+
+class SimilarityIndexTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.index = backend.managers.similarity.SimilarityIndex([
+            (1, 'red phone', 'an old phone', 'Others', 'Tehran'),
+            (2, 'blue phone', None, 'Others', 'Kazan'),
+            (3, 'red phone case', None, 'Others', 'Tehran'),
+            (4, 'wooden chair', 'comfortable', 'Home', 'Shiraz'),
+        ])
+
+    def similar_ids(self, name: str, limit: int = 10, exclude_id: int = None) -> list:
+        terms = backend.managers.similarity.product_terms(name, None, None, None)
+        return [product_id for product_id, _ in self.index.similar(terms, limit, exclude_id=exclude_id)]
+
+    def test_similar_ranks_by_cosine_similarity(self) -> None:
+        terms = backend.managers.similarity.product_terms('red phone', 'an old phone', 'Others', 'Tehran')
+        similar = self.index.similar(terms, 10, exclude_id=1)
+
+        self.assertEqual([product_id for product_id, _ in similar], [3, 2])
+        self.assertGreater(similar[0][1], similar[1][1])
+        self.assertLessEqual(similar[0][1], 1)
+
+    def test_similar_limit(self) -> None:
+        # The first product mentions a phone in its description too.
+        self.assertEqual(self.similar_ids('phone', limit=1), [1])
+        self.assertEqual(self.similar_ids('phone', limit=0), [])
+
+    def test_similar_to_unknown_terms(self) -> None:
+        self.assertEqual(self.similar_ids('laptop'), [])
+
+    def test_similar_ties_newest_first(self) -> None:
+        index = backend.managers.similarity.SimilarityIndex([(i, 'phone', None, None, None) for i in range(1, 4)])
+        terms = backend.managers.similarity.product_terms('phone', None, None, None)
+
+        self.assertEqual([product_id for product_id, _ in index.similar(terms, 10)], [3, 2, 1])
+
+    def test_empty_index(self) -> None:
+        index = backend.managers.similarity.SimilarityIndex([])
+
+        self.assertLen(index, 0)
+        self.assertEqual(index.similar(backend.managers.similarity.product_terms('phone', None, None, None), 3), [])
+
+
+if __name__ == "__main__":
+    absltest.main()
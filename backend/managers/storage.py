@@ -0,0 +1,245 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Collection, IO, Optional
+
+import flask
+import sqlalchemy.exc
+from absl import logging
+
+import backend.initializers.database
+import backend.initializers.settings
+import backend.managers.images
+import backend.models.upload
+
+# Number of bytes of an uploaded file read, hashed and written at once.
+CHUNK_SIZE = 64 * 1024
+# Stored files are spread over two levels of directories named by hex digits, e.g., 'ab/cd/<name>', so none of
+# the directories grows past 256 entries of subdirectories, whatever the number of files.
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+_DIGEST_PATTERN = re.compile(r'[0-9a-f]{64}')
+# Extensions of uploaded pictures, see the upload routes.
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+# Stems of stored pictures: digests of their contents, or names uploaded before with a timestamp appended.
+_STORED_STEM_PATTERN = re.compile(r'[0-9a-f]{64}|.+_[0-9]{14}')
+# Temporary files of 'store', and of variants being written, see 'backend.managers.images.generate_variants'.
+_TEMPORARY_PATTERN = re.compile(r'\.upload-[^/]+|\.(?P<variant>.+)\.[0-9]+')
+
+
+def path(name: str) -> str:
+    """Returns the path of a stored file, in whichever layout it is, see 'resolve'."""
+    return os.path.join(backend.managers.images.upload_folder(), resolve(name))
+
+
+def shard(name: str) -> str:
+    """
+    Returns the name of a file in the sharded layout, which is prefixed by the directories of its shard.
+
+    Files stored by their contents are sharded by their digest, and files uploaded before by a digest of their name.
+    Variants of a picture are in the shard of the picture. Names which are already sharded are returned as they are.
+    """
+    if '/' in name:
+        return name
+    stem = backend.managers.images.variant_source_stem(name)
+    key = stem if _DIGEST_PATTERN.match(stem) else hashlib.sha256(stem.encode()).hexdigest()
+    directories = [key[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)]
+    return '/'.join([*directories, name])
+
+
+def resolve(name: str) -> str:
+    """
+    Returns the relative path of a stored file, given its name in either layout.
+
+    Files of the flat layout are moved to the sharded one by 'backend.migrate_uploads', and their names are
+    rewritten after they're moved. Until then, a flat name is resolved to wherever its file is.
+    """
+    if '/' in name or os.path.exists(os.path.join(backend.managers.images.upload_folder(), name)):
+        return name
+    return shard(name)
+
+
+def is_stored(name: str) -> bool:
+    """
+    Returns whether a path relative to the upload folder is a file written by this module, in either layout.
+
+    Stored pictures, their variants, and temporary files left by interrupted writes of either are matched. Other
+    files, e.g., ones put in the upload folder by operators, never are.
+    """
+    directory, _, filename = name.rpartition('/')
+    temporary = _TEMPORARY_PATTERN.fullmatch(filename)
+    if temporary:
+        if temporary.group('variant') is None:
+            # Uploads are written to the top of the upload folder, before they're hashed.
+            return not directory
+        filename = temporary.group('variant')
+    stem, extension = os.path.splitext(filename)
+    source_stem = backend.managers.images.variant_source_stem(filename)
+    if temporary and source_stem == stem:
+        return False
+    if source_stem == stem and extension.lower() not in STORED_EXTENSIONS:
+        return False
+    if not _STORED_STEM_PATTERN.fullmatch(source_stem):
+        return False
+    return not directory or shard(filename) == f'{directory}/{filename}'
+
+
+def store(stream: IO[bytes], filename: str) -> str:
+    """
+    Stores an uploaded file under the SHA-256 digest of its contents, and adds a reference to it.
+
+    The file is hashed while it's written to a temporary file, so it's read once. A file with the same contents
+    is stored once, however many times it's uploaded. The reference is added in the current transaction,
+    so the file must be referred to by a Picture or ProfilePicture committed along with it.
+
+    Args:
+        stream (IO[bytes]): Contents of the file, e.g., the stream of an uploaded 'werkzeug.datastructures.FileStorage'.
+        filename (str): The secured name of the uploaded file, only its extension is kept.
+
+    Returns:
+        str: Name of the stored file, in the sharded layout.
+    """
+    folder = backend.managers.images.upload_folder()
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=folder, prefix='.upload-', delete=False) as temporary_file:
+        try:
+            while chunk := stream.read(CHUNK_SIZE):
+                digest.update(chunk)
+                temporary_file.write(chunk)
+        except BaseException:
+            temporary_file.close()
+            os.remove(temporary_file.name)
+            raise
+    name = shard(f'{digest.hexdigest()}{os.path.splitext(filename)[1].lower()}')
+
+    _add_reference(name)
+    # The upload's row is locked until the transaction ends, so a concurrent 'process_pending_removals' can't remove
+    # the file after it's found here.
+    if os.path.exists(path(name)):
+        os.remove(temporary_file.name)
+    else:
+        os.makedirs(os.path.dirname(path(name)), exist_ok=True)
+        os.replace(temporary_file.name, path(name))
+    return name
+
+
+def release(names: Collection[str]) -> None:
+    """
+    Removes a reference to each of the stored files, in the current transaction.
+
+    Files which aren't referred to anymore are queued for removal in the same transaction, so they're removed only
+    if it's committed, by 'process_pending_removals' outside of the request.
+
+    Args:
+        names (Collection): Names of the stored files, a name is released as many times as it's given.
+    """
+    upload = backend.models.upload.Upload
+    unreferenced = []
+    for name in names:
+        reference_count = backend.initializers.database.DB.session.execute(
+            sqlalchemy.update(upload).where(upload.name == name).values(reference_count=upload.reference_count - 1)
+            .returning(upload.reference_count)
+        ).scalar()
+        if reference_count is not None and reference_count <= 0:
+            unreferenced.append(name)
+    schedule_removal(unreferenced)
+
+
+def schedule_removal(names: Collection[str]) -> None:
+    """Queues stored files to be removed in the current transaction, they're kept if they're referred to by then."""
+    backend.initializers.database.DB.session.add_all(
+        backend.models.upload.PendingFileRemoval(name=name) for name in names
+    )
+
+
+def process_pending_removals(batch_size: int) -> int:
+    """
+    Removes a batch of the queued files, along with their picture variants, if nothing refers to them anymore.
+
+    Each file is checked and removed while its row is locked, and the batch is committed at once, so a concurrent
+    upload of the same contents either keeps the file or stores it again once the removal is committed. Files
+    without a row, e.g., orphans found by 'backend.sweep_uploads', are locked by inserting one for the removal.
+    Queued files locked by a concurrent worker are skipped.
+
+    Args:
+        batch_size (int): Maximum number of queued files processed.
+
+    Returns:
+        int: Number of queued files processed, fewer than the batch size once the queue is empty.
+    """
+    session = backend.initializers.database.DB.session
+    upload = backend.models.upload.Upload
+    pending = backend.models.upload.PendingFileRemoval
+    queued = session.execute(
+        sqlalchemy.select(pending.id, pending.name).order_by(pending.id).limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    for name in sorted({name for _, name in queued}):
+        try:
+            with session.begin_nested():
+                session.execute(sqlalchemy.insert(upload).values(name=name, reference_count=0))
+        except sqlalchemy.exc.IntegrityError:
+            pass
+        reference_count = session.execute(
+            sqlalchemy.select(upload.reference_count).where(upload.name == name).with_for_update()
+        ).scalar()
+        if reference_count <= 0:
+            for filename in (name, *backend.managers.images.variant_filenames(name)):
+                if os.path.exists(path(filename)):
+                    os.remove(path(filename))
+            session.execute(sqlalchemy.delete(upload).where(upload.name == name))
+    session.execute(sqlalchemy.delete(pending).where(pending.id.in_([row_id for row_id, _ in queued])))
+    session.commit()
+    return len(queued)
+
+
+def start_removal_worker(flask_app: flask.Flask) -> Optional[threading.Thread]:
+    """
+    Starts a thread removing queued files in batches, every 'FILE_REMOVAL_INTERVAL_SECONDS' until the queue is empty.
+
+    Args:
+        flask_app (flask.Flask): The Flask application instance, whose database the queue is read from.
+
+    Returns:
+        threading.Thread: The started daemon thread, or None if the interval is 0, which disables the worker.
+    """
+    interval = flask_app.config.get(
+        'FILE_REMOVAL_INTERVAL_SECONDS', backend.initializers.settings.DEFAULT_FILE_REMOVAL_INTERVAL_SECONDS
+    )
+    if interval <= 0:
+        return None
+
+    def run():
+        while True:
+            try:
+                with flask_app.app_context():
+                    batch_size = backend.initializers.settings.FILE_REMOVAL_BATCH_SIZE
+                    while process_pending_removals(batch_size) == batch_size:
+                        pass
+            except Exception:
+                logging.exception('Failed to remove queued files, they are retried later.')
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name='file-removal', daemon=True)
+    thread.start()
+    return thread
+
+
+def _add_reference(name: str) -> None:
+    """Adds a reference to a stored file in the current transaction, creating its row if it's new."""
+    session = backend.initializers.database.DB.session
+    upload = backend.models.upload.Upload
+    increment = sqlalchemy.update(upload).where(upload.name == name).values(
+        reference_count=upload.reference_count + 1
+    )
+    if session.execute(increment).rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.add(upload(name=name, reference_count=1))
+    except sqlalchemy.exc.IntegrityError:
+        # The same contents are being uploaded concurrently, and the other upload created the row first.
+        session.execute(increment)
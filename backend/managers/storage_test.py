@@ -0,0 +1,181 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+
+import backend.initializers.database
+import backend.initializers.test_util
+import backend.managers.images
+import backend.managers.storage
+import backend.models.product
+import backend.models.upload
+
+
+class StorageTest(absltest.TestCase):
+    """Tests storage of uploads against an in-memory database."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        mock.patch.stopall()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.folder = temporary_directory.name
+        mock.patch.object(backend.managers.images, 'upload_folder', return_value=self.folder).start()
+        self.flask_app = backend.initializers.test_util.create_database_app()
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+
+    def tearDown(self) -> None:
+        backend.initializers.database.DB.session.remove()
+        self.app_context.pop()
+        mock.patch.stopall()
+        super().tearDown()
+
+    def stored_files(self) -> list:
+        """Returns relative paths of all files in the upload folder."""
+        return sorted(
+            os.path.relpath(os.path.join(directory, filename), self.folder)
+            for directory, _, filenames in os.walk(self.folder) for filename in filenames
+        )
+
+    def reference_count(self, name: str):
+        upload = backend.initializers.database.DB.session.get(backend.models.upload.Upload, name)
+        return upload and upload.reference_count
+
+    def test_store_deduplicates_by_contents(self) -> None:
+        first = backend.managers.storage.store(io.BytesIO(b'picture'), 'phone.JPG')
+        second = backend.managers.storage.store(io.BytesIO(b'picture'), 'other.jpg')
+        other = backend.managers.storage.store(io.BytesIO(b'another picture'), 'phone.jpg')
+        backend.initializers.database.DB.session.commit()
+
+        # SHA-256 of b'picture', within the shard of its first digits.
+        self.assertEqual(first, '2c/ea/2cea274d0bedc39ec4ab6ba9e59ec889e3ed6fb56a1cf088a64d9b383378dc97.jpg')
+        self.assertEqual(second, first)
+        self.assertNotEqual(other, first)
+        self.assertEqual(self.stored_files(), sorted([first, other]))
+        with open(os.path.join(self.folder, first), 'rb') as file:
+            self.assertEqual(file.read(), b'picture')
+        self.assertEqual(self.reference_count(first), 2)
+        self.assertEqual(self.reference_count(other), 1)
+
+    def test_shard(self) -> None:
+        digest = '2cea274d0bedc39ec4ab6ba9e59ec889e3ed6fb56a1cf088a64d9b383378dc97'
+        self.assertEqual(backend.managers.storage.shard(f'{digest}.jpg'), f'2c/ea/{digest}.jpg')
+        self.assertEqual(backend.managers.storage.shard(f'2c/ea/{digest}.jpg'), f'2c/ea/{digest}.jpg')
+        # Files uploaded before are sharded by a digest of their name, and variants follow their picture.
+        self.assertEqual(backend.managers.storage.shard('phone_20240101.jpg'), '3f/a0/phone_20240101.jpg')
+        self.assertEqual(
+            backend.managers.storage.shard('phone_20240101_thumbnail.webp'), '3f/a0/phone_20240101_thumbnail.webp'
+        )
+
+    def test_is_stored(self) -> None:
+        digest = '2cea274d0bedc39ec4ab6ba9e59ec889e3ed6fb56a1cf088a64d9b383378dc97'
+        for name in (
+                f'{digest}.jpg', f'{digest}_thumbnail.webp', 'phone_20240101120000.JPG',
+                'phone_20240101120000_full.webp',
+        ):
+            # Files are stored in either layout.
+            self.assertTrue(backend.managers.storage.is_stored(name), name)
+            self.assertTrue(backend.managers.storage.is_stored(backend.managers.storage.shard(name)), name)
+        # Temporary files of uploads and of variants being written.
+        self.assertTrue(backend.managers.storage.is_stored('.upload-k2j4h5g6'))
+        self.assertTrue(backend.managers.storage.is_stored(f'2c/ea/.{digest}_card.webp.1234'))
+        for name in (
+                'readme.md', f'2c/ea/{digest}.txt', f'ab/cd/{digest}.jpg', f'2c/{digest}.jpg', 'phone.jpg',
+                f'2c/ea/backup_{digest}.jpg', 'notes/.upload-k2j4h5g6', f'2c/ea/.{digest}.jpg.1234',
+                f'{digest}_thumbnail.jpg',
+        ):
+            self.assertFalse(backend.managers.storage.is_stored(name), name)
+
+    def test_resolve_finds_files_in_either_layout(self) -> None:
+        open(os.path.join(self.folder, 'flat.jpg'), 'wb').close()
+
+        self.assertEqual(backend.managers.storage.resolve('flat.jpg'), 'flat.jpg')
+        # Files which are moved, or were never in the flat layout, are in their shard.
+        self.assertEqual(backend.managers.storage.resolve('moved.jpg'), backend.managers.storage.shard('moved.jpg'))
+        self.assertEqual(backend.managers.storage.resolve('ab/cd/sharded.jpg'), 'ab/cd/sharded.jpg')
+
+    def queued_names(self) -> list:
+        return sorted(row.name for row in backend.models.upload.PendingFileRemoval.query.all())
+
+    def test_files_are_removed_with_their_last_reference(self) -> None:
+        name = backend.managers.storage.store(io.BytesIO(b'picture'), 'phone.jpg')
+        backend.managers.storage.store(io.BytesIO(b'picture'), 'phone.jpg')
+        backend.initializers.database.DB.session.commit()
+        variant = os.path.join(self.folder, backend.managers.images.variant_filename(name, 'thumbnail'))
+        open(variant, 'wb').close()
+
+        backend.managers.storage.release([name])
+        backend.initializers.database.DB.session.commit()
+        self.assertEqual(self.queued_names(), [])
+        self.assertEqual(self.reference_count(name), 1)
+
+        backend.managers.storage.release([name])
+        backend.initializers.database.DB.session.commit()
+        # Files are removed by the worker, not by the release.
+        self.assertEqual(self.queued_names(), [name])
+        self.assertLen(self.stored_files(), 2)
+
+        self.assertEqual(backend.managers.storage.process_pending_removals(10), 1)
+        self.assertEqual(self.queued_names(), [])
+        self.assertIsNone(self.reference_count(name))
+        self.assertEqual(self.stored_files(), [])
+
+    def test_rolled_back_releases_are_not_queued(self) -> None:
+        name = backend.managers.storage.store(io.BytesIO(b'picture'), 'phone.jpg')
+        backend.initializers.database.DB.session.commit()
+
+        backend.managers.storage.release([name])
+        backend.initializers.database.DB.session.rollback()
+
+        self.assertEqual(self.queued_names(), [])
+        self.assertEqual(self.reference_count(name), 1)
+
+    def test_process_pending_removals_keeps_files_referred_to_again(self) -> None:
+        name = backend.managers.storage.store(io.BytesIO(b'picture'), 'phone.jpg')
+        backend.initializers.database.DB.session.commit()
+        backend.managers.storage.release([name])
+        backend.initializers.database.DB.session.commit()
+        # The same picture is uploaded again before the released file is removed.
+        backend.managers.storage.store(io.BytesIO(b'picture'), 'phone.jpg')
+        backend.initializers.database.DB.session.commit()
+
+        backend.managers.storage.process_pending_removals(10)
+
+        self.assertEqual(self.stored_files(), [name])
+        self.assertEqual(self.reference_count(name), 1)
+        self.assertEqual(self.queued_names(), [])
+
+    def test_process_pending_removals_in_batches(self) -> None:
+        names = [backend.managers.storage.store(io.BytesIO(bytes([i])), 'phone.jpg') for i in range(3)]
+        backend.initializers.database.DB.session.commit()
+        backend.managers.storage.release(names)
+        backend.initializers.database.DB.session.commit()
+
+        self.assertEqual(backend.managers.storage.process_pending_removals(2), 2)
+        self.assertLen(self.stored_files(), 1)
+        self.assertEqual(backend.managers.storage.process_pending_removals(2), 1)
+        self.assertEqual(backend.managers.storage.process_pending_removals(2), 0)
+        self.assertEqual(self.stored_files(), [])
+
+    def test_rolled_back_references_are_not_counted(self) -> None:
+        name = backend.managers.storage.store(io.BytesIO(b'picture'), 'phone.jpg')
+        backend.initializers.database.DB.session.rollback()
+
+        self.assertIsNone(self.reference_count(name))
+        # The file is left behind, and removed as an unreferenced one once it's queued.
+        backend.managers.storage.schedule_removal([name])
+        backend.initializers.database.DB.session.commit()
+        backend.managers.storage.process_pending_removals(10)
+        self.assertEqual(self.stored_files(), [])
+        self.assertIsNone(self.reference_count(name))
+
+    def test_start_removal_worker_is_disabled_without_interval(self) -> None:
+        self.flask_app.config['FILE_REMOVAL_INTERVAL_SECONDS'] = 0
+
+        self.assertIsNone(backend.managers.storage.start_removal_worker(self.flask_app))
+
+if __name__ == "__main__":
+    absltest.main()
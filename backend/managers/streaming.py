@@ -0,0 +1,66 @@
+from typing import Callable, Iterable, Iterator
+
+import flask
+
+import backend.initializers.settings
+
+# Approximate number of characters of JSON sent to the client at once.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def json_list_response(key: str, items: Iterable) -> flask.Response:
+    """
+    Create a response streaming the JSON object {key: [*items]} while items are produced.
+
+    Only a chunk of the serialized items is held in memory at once, and the first chunk is sent before the
+    remaining items are read, so items should be produced lazily (e.g., from a query iterated by 'yield_per').
+    The request context is kept while streaming, so items may be loaded from the database session.
+
+    Args:
+        key (str): Name of the list of items in the JSON object.
+        items (Iterable): JSON serializable items of the list.
+
+    Returns:
+        flask.Response: The streamed response.
+    """
+    return flask.Response(
+        flask.stream_with_context(_generate_json_list(key, items)),
+        mimetype='application/json',
+    )
+
+
+def query_list_response(key: str, query, serialize: Callable = lambda row: row.to_dict()) -> flask.Response:
+    """
+    Create a response streaming the JSON object {key: [*rows]} with rows of the query.
+
+    Rows are fetched in batches of 'STREAM_BATCH_SIZE' through a server-side cursor, so neither the rows
+    nor their JSON are ever held in memory all at once.
+
+    Args:
+        key (str): Name of the list of rows in the JSON object.
+        query (sqlalchemy.orm.Query): The query of the rows. Eager loading of collections must use 'selectinload'.
+        serialize (Callable): Converts a row to a JSON serializable item, 'to_dict' of the row by default.
+
+    Returns:
+        flask.Response: The streamed response.
+    """
+    rows = query.yield_per(backend.initializers.settings.STREAM_BATCH_SIZE)
+    return json_list_response(key, (serialize(row) for row in rows))
+
+
+def _generate_json_list(key: str, items: Iterable) -> Iterator[str]:
+    """Yields chunks of the JSON object {key: [*items]}."""
+    chunk = ['{', flask.json.dumps(key), ':[']
+    chunk_size = 0
+    for i, item in enumerate(items):
+        serialized_item = flask.json.dumps(item)
+        if i:
+            chunk.append(',')
+        chunk.append(serialized_item)
+        chunk_size += len(serialized_item)
+        if chunk_size >= STREAM_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            chunk_size = 0
+    chunk.append(']}')
+    yield ''.join(chunk)
@@ -0,0 +1,51 @@
+from unittest import mock
+
+import flask
+from absl.testing import absltest
+
+import backend.managers.streaming
+
+
+class StreamingTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.flask_app = flask.Flask(__name__)
+        self.request_context = self.flask_app.test_request_context()
+        self.request_context.push()
+
+    def tearDown(self) -> None:
+        self.request_context.pop()
+        super().tearDown()
+
+    def test_json_list_response(self) -> None:
+        items = [{'id': i, 'name': f'product "{i}"'} for i in range(100)]
+        with mock.patch('backend.managers.streaming.STREAM_CHUNK_SIZE', 100):
+            response = backend.managers.streaming.json_list_response('products', iter(items))
+            chunks = list(response.response)
+
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/json')
+        # Items are sent in many chunks instead of a single one.
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(flask.json.loads(''.join(chunks)), {'products': items})
+
+    def test_json_list_response_without_items(self) -> None:
+        response = backend.managers.streaming.json_list_response('products', iter([]))
+        self.assertEqual(flask.json.loads(response.get_data()), {'products': []})
+
+    def test_items_are_produced_lazily(self) -> None:
+        produced = []
+
+        def items():
+            for i in range(3):
+                produced.append(i)
+                yield i
+
+        response = backend.managers.streaming.json_list_response('ids', items())
+        self.assertEmpty(produced)
+        self.assertEqual(flask.json.loads(response.get_data()), {'ids': [0, 1, 2]})
+        self.assertEqual(produced, [0, 1, 2])
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -1,15 +1,18 @@
-import os
-import datetime
+import functools
 import itsdangerous
-from typing import Optional
+from typing import Collection, Optional
 
 import flask
 import flask_mail
 import flask_jwt_extended
+import sqlalchemy.orm
 
 import backend.models.user
 import backend.initializers.database
 import backend.initializers.settings
+import backend.managers.conditional
+import backend.managers.images
+import backend.managers.storage
 import backend.models.product
 import backend.models.report
 import backend.managers.product
@@ -122,8 +125,11 @@ class UserManager:
         # Verify the user's email by setting 'is_verified' attribute to True.
         user = backend.models.user.User.query.filter_by(email=email).first()
         user.is_verified = True
+        user.bump_version()
         backend.initializers.database.DB.session.add(user)
         backend.initializers.database.DB.session.commit()
+        # Search results contain profiles of sellers.
+        backend.managers.product.ProductManager.invalidate_search_cache()
         return (
             flask.jsonify({"message": "Email verified successfully."}),
             backend.initializers.settings.HTTPStatus.OK.value
@@ -270,36 +276,52 @@ class UserManager:
         for product in products_to_delete:
             print(backend.managers.product.ProductManager.instance.delete_product(username, product.id)[1] == 204)
 
-        backend.models.user.ProfilePicture.query.filter_by(user_username=username).delete()
+        self._remove_profile_pictures(username)
 
         backend.models.report.UserReport.query.filter_by(reported_user=username).delete()
         backend.models.report.UserReport.query.filter_by(reporter_username=username).delete()
 
         backend.models.user.User.query.filter_by(username=username).delete()
         backend.initializers.database.DB.session.commit()
+        backend.managers.product.ProductManager.invalidate_search_cache()
         return (
             flask.jsonify({"message": "User deleted successfully."}),
             backend.initializers.settings.HTTPStatus.NO_CONTENT.value
         )
 
-    def get_profile(self, username: str) -> (flask.Flask, int):
+    def get_profile(self, username: str, fields: Optional[Collection[str]] = None) -> (flask.Flask, int):
         """
         Get user's profile information.
 
         Args:
             username (str): The username of the user.
+            fields (Collection): Fields of the profile to return, all of them by default. Only their columns are loaded.
 
         Returns:
             response (flask.Response): A Flask response object containing successfully deleted a user.
-            status_code (int): HTTP status code indicating success (200).
+            status_code (int): HTTP status code indicating success (200), or 304 if the client's ETag matches.
         """
-        user = backend.models.user.User.query.filter_by(username=username).first()
+        query = backend.models.user.User.query
+        if fields is not None:
+            query = query.options(sqlalchemy.orm.load_only(
+                *(getattr(backend.models.user.User, field) for field in fields), backend.models.user.User.version
+            ))
+        user = query.filter_by(username=username).first()
         if not user:
             return (
                 flask.jsonify({"message": "User does not exist."}),
                 backend.initializers.settings.HTTPStatus.NOT_FOUND.value
             )
-        return flask.jsonify({"profile": user.to_dict()}), backend.initializers.settings.HTTPStatus.OK.value
+        entity_tag = backend.managers.conditional.etag(
+            'profile', user.username, user.version, None if fields is None else sorted(fields)
+        )
+        not_modified = backend.managers.conditional.not_modified_response(entity_tag)
+        if not_modified:
+            return not_modified
+        return (
+            backend.managers.conditional.with_etag(flask.jsonify({"profile": user.to_dict(fields)}), entity_tag),
+            backend.initializers.settings.HTTPStatus.OK.value
+        )
 
     def edit_profile(self, username: str, info: dict) -> (flask.Flask, int):
         """
@@ -318,34 +340,76 @@ class UserManager:
         user.address = info.get('address', user.address)
         user.first_name = info.get('first_name', user.first_name)
         user.last_name = info.get('last_name', user.last_name)
+        user.bump_version()
 
+        new_filename = None
         if 'image' in info:
-            # Remove the previous profile picture if exists.
-            old_picture = backend.models.user.ProfilePicture.query.filter_by(user_username=user.username).first()
-            if old_picture:
-                # backend.initializers.database.DB.session.delete(old_picture)
-                os.remove(f"./backend/uploads/{old_picture.filename}")
-            backend.models.user.ProfilePicture.query.filter_by(user_username=user.username).delete()
+            # Release the previous profile picture if exists, its file is kept if it's uploaded again.
+            self._remove_profile_pictures(user.username)
             # Save if new profile picture is uploaded.
-            filename = info['image_filename']
-            base, extension = os.path.splitext(filename)
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            new_filename = f"{base}_{timestamp}{extension}"
-            file_path = f"./backend/{flask.current_app.config['UPLOAD_FOLDER']}{new_filename}"
-            info['image'].save(file_path)
+            new_filename = backend.managers.storage.store(info['image'].stream, info['image_filename'])
 
             new_profile_picture = backend.models.user.ProfilePicture(
                 filename=new_filename,
                 user_username=username
             )
             user.profile_picture = new_filename
+            # Variants of the new picture are generated in the background, see 'record_profile_picture_variants'.
+            user.profile_picture_variants = None
             backend.initializers.database.DB.session.add(user)
             backend.initializers.database.DB.session.add(new_profile_picture)
 
         backend.initializers.database.DB.session.commit()
+        if new_filename:
+            backend.managers.images.process_picture(
+                new_filename, functools.partial(self.record_profile_picture_variants, username, new_filename)
+            )
+        # Search results contain profiles of sellers.
+        backend.managers.product.ProductManager.invalidate_search_cache()
+        backend.managers.product.ProductManager.invalidate_seller_product_cards(username)
         return flask.jsonify(
             {"message": "User edited successfully."}), backend.initializers.settings.HTTPStatus.OK.value
 
+    @staticmethod
+    def _remove_profile_pictures(username: str) -> None:
+        """
+        Deletes the profile pictures of a user, and releases their files.
+
+        Files which aren't referred to anymore are removed in the background once the deletion is committed, see
+        'backend.managers.storage.release'.
+        """
+        pictures = backend.models.user.ProfilePicture.query.filter_by(user_username=username).all()
+        backend.models.user.ProfilePicture.query.filter_by(user_username=username).delete()
+        backend.managers.storage.release([picture.filename for picture in pictures])
+
+    @staticmethod
+    def record_profile_picture_variants(username: str, filename: str, variants: dict) -> bool:
+        """
+        Stores generated variants of a profile picture on its user.
+
+        Args:
+            username (str): The username of the user.
+            filename (str): Name of the profile picture the variants are generated from.
+            variants (dict): Names of the files of the variants, by the name of the variant.
+
+        Returns:
+            bool: Whether the picture is still the user's profile picture, e.g., it's not replaced meanwhile.
+                Otherwise, the variants are queued for removal along with the file, which is kept if another picture
+                refers to it.
+        """
+        user = backend.models.user.User.query.filter_by(username=username, profile_picture=filename).first()
+        if user is None:
+            backend.managers.storage.schedule_removal([filename])
+            backend.initializers.database.DB.session.commit()
+            return False
+        user.profile_picture_variants = variants
+        user.bump_version()
+        backend.initializers.database.DB.session.commit()
+        # Search results contain profiles of sellers.
+        backend.managers.product.ProductManager.invalidate_search_cache()
+        backend.managers.product.ProductManager.invalidate_seller_product_cards(username)
+        return True
+
     def report_user(self, reporter_username: str, reported_user: str, description: str) -> (flask.Flask, int):
         """
         Report user.
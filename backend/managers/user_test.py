@@ -8,6 +8,7 @@ from absl.testing import absltest
 
 import backend.initializers.settings
 import backend.initializers.test_util
+import backend.managers.cache
 import backend.managers.user
 import backend.managers.product
 import backend.models.user
@@ -97,6 +98,21 @@ class UserManagerTest(absltest.TestCase):
         self.assertEqual(status_code, backend.initializers.settings.HTTPStatus.OK.value)
         self.assertEqual(response.json, {'message': 'User edited successfully.'})
 
+    def test_confirm_email_clears_search_cache(self) -> None:
+        """Test that verifying a user drops cached searches, which contain profiles of sellers."""
+        user = backend.models.user.User(username="user", email="user@email.com", is_verified=False)
+        self.mock_user_query.filter_by.return_value.first.return_value = user
+        cache = backend.managers.cache.Cache(max_size=10, ttl_seconds=60)
+        cache.set('search', 'results', cache.generation)
+        self.flask_app.extensions[backend.managers.product.ProductManager.SEARCH_CACHE_EXTENSION] = cache
+        email_token = self.user_manager.email_serializer.dumps("user@email.com", salt='email-confirm')
+
+        response, status_code = self.user_manager.confirm_email(email_token)
+
+        self.assertEqual(status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertTrue(user.is_verified)
+        self.assertIsNone(cache.get('search'))
+
     def test_login_incorrect_password(self) -> None:
         """Test that login fails when the password is incorrect."""
         self.mock_user_query.filter_by.return_value.first.return_value = backend.models.user.User(
@@ -155,8 +171,8 @@ class UserManagerTest(absltest.TestCase):
         self.assertEqual(status_code, backend.initializers.settings.HTTPStatus.OK.value)
         self.assertEqual(response.json, {
             'profile': {'email': None, 'first_name': None, 'is_admin': None, 'is_banned': None, 'is_verified': None,
-                        'last_name': None, 'phone_number': None, 'profile_picture': None, 'username': 'user1',
-                        'address': None}})
+                        'last_name': None, 'phone_number': None, 'profile_picture': None,
+                        'profile_picture_variants': {}, 'username': 'user1', 'address': None}})
 
     def test_get_profile_does_not_exist(self):
         """Test non-existent get_profile_by_username."""
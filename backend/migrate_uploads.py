@@ -0,0 +1,125 @@
+r"""
+Move uploaded files of the flat layout, 'uploads/<name>', to the sharded layout, 'uploads/ab/cd/<name>'.
+
+Files are moved in batches, in parallel within a batch, and names of the moved files are rewritten in the
+database once per batch. The migration is resumable: it stops at any point and picks up the files which are
+still in the flat layout when it's run again. The app keeps serving files of both layouts meanwhile, see
+'backend.managers.storage.resolve'.
+
+Usage:
+    python -m backend.migrate_uploads --db_host=localhost --db_port=5432 --db_name=app \
+        --db_username=postgres --db_password=postgres
+"""
+import concurrent.futures
+import os
+
+import flask
+import sqlalchemy
+from absl import app as absl_app
+from absl import flags
+from absl import logging
+
+# Load settings for the defined flags to be parsed before running the migration.
+import backend.initializers.settings
+import backend.initializers.database
+import backend.initializers.json_provider
+import backend.managers.images
+import backend.managers.storage
+import backend.models.product
+import backend.models.upload
+import backend.models.user
+
+migrate_uploads_batch_size = flags.DEFINE_integer(
+    name='migrate_uploads_batch_size', default=500, help='Number of files moved and renamed in the database at once.'
+)
+migrate_uploads_workers = flags.DEFINE_integer(
+    name='migrate_uploads_workers', default=8, help='Number of threads moving files of a batch.'
+)
+
+
+def migrate_uploads(batch_size: int, workers: int) -> int:
+    """
+    Moves files of the flat layout to the sharded one, and rewrites their names in the database.
+
+    A file is moved before its name is rewritten, so the name of a file in the database is always resolved.
+    Pictures removed while their batch is being migrated may miss releasing their file, which is then kept until
+    it's found by 'backend.sweep_uploads'.
+
+    Args:
+        batch_size (int): Number of files moved and renamed at once.
+        workers (int): Number of threads moving files of a batch.
+
+    Returns:
+        int: Number of moved files, not counting their variants.
+    """
+    upload = backend.models.upload.Upload
+    folder = backend.managers.images.upload_folder()
+    migrated = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            names = backend.initializers.database.DB.session.execute(
+                sqlalchemy.select(upload.name).where(upload.name.not_like('%/%')).order_by(upload.name)
+                .limit(batch_size)
+            ).scalars().all()
+            if not names:
+                return migrated
+            for name, moved in zip(names, executor.map(lambda name: _move_files(folder, name), names)):
+                if not moved:
+                    logging.warning('File %s is missing, only its name is migrated.', name)
+            _rename(names)
+            backend.initializers.database.DB.session.commit()
+            migrated += len(names)
+            logging.info('Migrated %d files.', migrated)
+
+
+def _move_files(folder: str, name: str) -> bool:
+    """Moves a file and its picture variants to their shard, returns whether the file exists in either layout."""
+    for filename in (name, *backend.managers.images.variant_filenames(name)):
+        source = os.path.join(folder, filename)
+        if os.path.exists(source):
+            destination = os.path.join(folder, backend.managers.storage.shard(filename))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.replace(source, destination)
+    return os.path.exists(os.path.join(folder, backend.managers.storage.shard(name)))
+
+
+def _rename(names: list) -> None:
+    """Rewrites names of moved files, and of their variants, wherever the database refers to them."""
+    def shard_variants(variants):
+        return variants and {
+            variant: backend.managers.storage.shard(filename) for variant, filename in variants.items()
+        }
+
+    upload = backend.models.upload.Upload
+    for name in names:
+        backend.initializers.database.DB.session.execute(
+            sqlalchemy.update(upload).where(upload.name == name).values(name=backend.managers.storage.shard(name))
+        )
+    for picture in backend.models.product.Picture.query.filter(
+            backend.models.product.Picture.filename.in_(names)
+    ).all():
+        picture.filename = backend.managers.storage.shard(picture.filename)
+        picture.variants = shard_variants(picture.variants)
+    for picture in backend.models.user.ProfilePicture.query.filter(
+            backend.models.user.ProfilePicture.filename.in_(names)
+    ).all():
+        picture.filename = backend.managers.storage.shard(picture.filename)
+    for user in backend.models.user.User.query.filter(backend.models.user.User.profile_picture.in_(names)).all():
+        user.profile_picture = backend.managers.storage.shard(user.profile_picture)
+        user.profile_picture_variants = shard_variants(user.profile_picture_variants)
+
+
+def main(_: list[str]) -> None:
+    import backend.app
+
+    flask_app = flask.Flask(__name__)
+    backend.initializers.json_provider.init_app(flask_app)
+    backend.app.connect_to_db(flask_app)
+    with flask_app.app_context():
+        migrated = migrate_uploads(migrate_uploads_batch_size.value, migrate_uploads_workers.value)
+    logging.info('Done, %d files moved to the sharded layout.', migrated)
+
+
+if __name__ == '__main__':
+    backend.initializers.settings.set_unused_flag_defaults()
+    absl_app.run(main)
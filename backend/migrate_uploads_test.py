@@ -0,0 +1,89 @@
+import os
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+
+import backend.initializers.database
+import backend.initializers.test_util
+import backend.managers.images
+import backend.managers.storage
+import backend.migrate_uploads
+import backend.models.product
+import backend.models.upload
+import backend.models.user
+
+
+class MigrateUploadsTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        mock.patch.stopall()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.folder = temporary_directory.name
+        mock.patch.object(backend.managers.images, 'upload_folder', return_value=self.folder).start()
+        self.flask_app = backend.initializers.test_util.create_database_app()
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+
+        session = backend.initializers.database.DB.session
+        session.add(backend.models.user.User(
+            username='seller', password='password', email='seller@email.com', profile_picture='face.jpg',
+            profile_picture_variants={'thumbnail': 'face_thumbnail.webp'},
+        ))
+        session.add(backend.models.user.ProfilePicture(filename='face.jpg', user_username='seller'))
+        session.add(backend.models.product.Product(
+            id=1, name='phone', price=1, user_username='seller', status='for sale', category='Others'
+        ))
+        session.add(backend.models.product.Picture(filename='phone.jpg', product_id=1))
+        session.add(backend.models.product.Picture(filename='case.jpg', product_id=1))
+        for name in ('face.jpg', 'phone.jpg', 'case.jpg'):
+            session.add(backend.models.upload.Upload(name=name, reference_count=1))
+        session.commit()
+        for name in ('face.jpg', 'face_thumbnail.webp', 'phone.jpg', 'case.jpg'):
+            with open(os.path.join(self.folder, name), 'w') as file:
+                file.write(name)
+
+    def tearDown(self) -> None:
+        backend.initializers.database.DB.session.remove()
+        self.app_context.pop()
+        mock.patch.stopall()
+        super().tearDown()
+
+    def test_migrate_uploads(self) -> None:
+        migrated = backend.migrate_uploads.migrate_uploads(batch_size=2, workers=2)
+
+        shard = backend.managers.storage.shard
+        self.assertEqual(migrated, 3)
+        for name in ('face.jpg', 'face_thumbnail.webp', 'phone.jpg', 'case.jpg'):
+            self.assertFalse(os.path.exists(os.path.join(self.folder, name)))
+            with open(os.path.join(self.folder, shard(name))) as file:
+                self.assertEqual(file.read(), name)
+        user = backend.models.user.User.query.one()
+        self.assertEqual(user.profile_picture, shard('face.jpg'))
+        self.assertEqual(user.profile_picture_variants, {'thumbnail': shard('face_thumbnail.webp')})
+        self.assertEqual(backend.models.user.ProfilePicture.query.one().filename, shard('face.jpg'))
+        self.assertCountEqual(
+            [picture.filename for picture in backend.models.product.Picture.query.all()],
+            [shard('phone.jpg'), shard('case.jpg')]
+        )
+        self.assertCountEqual(
+            [upload.name for upload in backend.models.upload.Upload.query.all()],
+            [shard('face.jpg'), shard('phone.jpg'), shard('case.jpg')]
+        )
+
+    def test_migrate_uploads_resumes(self) -> None:
+        # A previous run moved a file, and stopped before renaming it.
+        os.makedirs(os.path.dirname(os.path.join(self.folder, backend.managers.storage.shard('phone.jpg'))))
+        os.replace(
+            os.path.join(self.folder, 'phone.jpg'),
+            os.path.join(self.folder, backend.managers.storage.shard('phone.jpg'))
+        )
+
+        self.assertEqual(backend.migrate_uploads.migrate_uploads(batch_size=10, workers=1), 3)
+        self.assertEqual(backend.migrate_uploads.migrate_uploads(batch_size=10, workers=1), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.folder, backend.managers.storage.shard('phone.jpg'))))
+
+
+if __name__ == "__main__":
+    absltest.main()
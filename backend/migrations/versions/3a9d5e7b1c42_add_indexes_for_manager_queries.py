@@ -0,0 +1,57 @@
+"""Add indexes for the queries issued by the managers
+
+Revision ID: 3a9d5e7b1c42
+Revises: e2f47a9c0b68
+Create Date: 2026-10-18 13:02:17.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a9d5e7b1c42'
+down_revision = 'e2f47a9c0b68'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial index predicate or None)
+INDEXES = [
+    # Foreign keys used for lookups, joins and cascading reads.
+    ('ix_products_user_username', 'products', ['user_username'], None),
+    ('ix_picture_product_id', 'picture', ['product_id'], None),
+    ('ix_profile_picture_user_username', 'profile_picture', ['user_username'], None),
+    ('ix_product_reports_reported_product', 'product_reports', ['reported_product'], None),
+    ('ix_product_reports_reporter_username', 'product_reports', ['reporter_username'], None),
+    ('ix_user_reports_reported_user', 'user_reports', ['reported_user'], None),
+    ('ix_user_reports_reporter_username', 'user_reports', ['reporter_username'], None),
+    # Search filters and sort keys.
+    ('ix_products_status_category_price_created_at', 'products', ['status', 'category', 'price', 'created_at'], None),
+    # Admin lists, which select a small fraction of their tables.
+    ('ix_products_banned', 'products', ['id'], 'is_banned'),
+    ('ix_users_banned', 'users', ['username'], 'is_banned'),
+    ('ix_product_reports_unresolved', 'product_reports', ['id'], 'NOT is_resolved'),
+    ('ix_user_reports_unresolved', 'user_reports', ['id'], 'NOT is_resolved'),
+]
+
+
+def upgrade():
+    # Indexes are built concurrently so writes to the tables are not blocked, which can't run inside a transaction.
+    # Tables may have been created with the indexes by 'create_all' already.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,32 @@
+"""Add partial index on visible products
+
+Revision ID: 5b2e8c1f9a3d
+Revises: 0dbfb750773d
+Create Date: 2026-10-18 10:12:41.208334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8c1f9a3d'
+down_revision = '0dbfb750773d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables may have been created with the index by 'create_all' already.
+    op.create_index(
+        'ix_products_visible_created_at',
+        'products',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_banned IS NOT TRUE'),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_products_visible_created_at', table_name='products', if_exists=True)
@@ -0,0 +1,58 @@
+"""Add full-text search document to products
+
+Revision ID: 8d4a6f2c7e15
+Revises: 5b2e8c1f9a3d
+Create Date: 2026-10-18 11:02:17.550913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4a6f2c7e15'
+down_revision = '5b2e8c1f9a3d'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_VECTOR_EXPRESSION = """
+    setweight(to_tsvector('simple', coalesce({prefix}name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({prefix}description, '')), 'B')
+"""
+
+
+def upgrade():
+    # Tables may have been created with the column, trigger and index by 'create_all' already.
+    op.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector')
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_EXPRESSION.format(prefix='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute('DROP TRIGGER IF EXISTS products_search_vector_trigger ON products')
+    op.execute("""
+        CREATE TRIGGER products_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, description ON products
+        FOR EACH ROW EXECUTE PROCEDURE products_search_vector_update()
+    """)
+    # Fill the document of existing products.
+    op.execute(f"UPDATE products SET search_vector = {SEARCH_VECTOR_EXPRESSION.format(prefix='')}")
+    op.create_index(
+        'ix_products_search_vector',
+        'products',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_products_search_vector', table_name='products', if_exists=True)
+    op.execute('DROP TRIGGER IF EXISTS products_search_vector_trigger ON products')
+    op.execute('DROP FUNCTION IF EXISTS products_search_vector_update()')
+    op.drop_column('products', 'search_vector')
@@ -0,0 +1,27 @@
+"""Add row versions to products and users
+
+Revision ID: 9f3c1d7e5a20
+Revises: 3a9d5e7b1c42
+Create Date: 2026-10-18 16:05:12.418930
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9f3c1d7e5a20'
+down_revision = '3a9d5e7b1c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables may have been created with the columns by 'create_all' already.
+    # A constant default doesn't rewrite the tables, existing rows start at version 1.
+    op.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1 NOT NULL')
+    op.execute('ALTER TABLE users ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1 NOT NULL')
+
+
+def downgrade():
+    op.drop_column('users', 'version')
+    op.drop_column('products', 'version')
@@ -0,0 +1,49 @@
+"""Index products by seller and creation date
+
+Revision ID: b4e8a2d6f913
+Revises: 9f3c1d7e5a20
+Create Date: 2026-10-18 17:21:40.632118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e8a2d6f913'
+down_revision = '9f3c1d7e5a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Indexes are built concurrently so writes to the table are not blocked, which can't run inside a transaction.
+    # The composite index answers lookups by seller too, so it replaces the index on the seller alone.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_user_username_created_at',
+            'products',
+            ['user_username', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index('ix_products_user_username', table_name='products', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_user_username',
+            'products',
+            ['user_username'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_products_user_username_created_at',
+            table_name='products',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
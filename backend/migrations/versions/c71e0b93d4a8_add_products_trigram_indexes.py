@@ -0,0 +1,44 @@
+"""Add trigram indexes on product name and city name
+
+Revision ID: c71e0b93d4a8
+Revises: 8d4a6f2c7e15
+Create Date: 2026-10-18 11:47:05.731460
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71e0b93d4a8'
+down_revision = '8d4a6f2c7e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Tables may have been created with the indexes by 'create_all' already.
+    op.create_index(
+        'ix_products_name_trgm',
+        'products',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_products_city_name_trgm',
+        'products',
+        ['city_name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'city_name': 'gin_trgm_ops'},
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_products_city_name_trgm', table_name='products', if_exists=True)
+    op.drop_index('ix_products_name_trgm', table_name='products', if_exists=True)
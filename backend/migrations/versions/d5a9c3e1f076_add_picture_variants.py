@@ -0,0 +1,27 @@
+"""Add resized variants of product and profile pictures
+
+Revision ID: d5a9c3e1f076
+Revises: b4e8a2d6f913
+Create Date: 2026-10-18 18:42:09.517342
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9c3e1f076'
+down_revision = 'b4e8a2d6f913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables may have been created with the columns by 'create_all' already.
+    # Nullable columns without a default don't rewrite the tables, existing pictures have no variants.
+    op.execute('ALTER TABLE picture ADD COLUMN IF NOT EXISTS variants JSON')
+    op.execute('ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_picture_variants JSON')
+
+
+def downgrade():
+    op.drop_column('users', 'profile_picture_variants')
+    op.drop_column('picture', 'variants')
@@ -0,0 +1,149 @@
+"""Add normalized copies of product search text
+
+Revision ID: e2f47a9c0b68
+Revises: c71e0b93d4a8
+Create Date: 2026-10-18 12:31:56.104287
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import backend.managers.normalization
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f47a9c0b68'
+down_revision = 'c71e0b93d4a8'
+branch_labels = None
+depends_on = None
+
+# Number of products normalized per round-trip while filling existing rows.
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _create_search_vector_trigger(name_column: str, description_column: str, columns: str) -> None:
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce({name_column}, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce({description_column}, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute('DROP TRIGGER IF EXISTS products_search_vector_trigger ON products')
+    op.execute(f"""
+        CREATE TRIGGER products_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF {columns} ON products
+        FOR EACH ROW EXECUTE PROCEDURE products_search_vector_update()
+    """)
+
+
+def _backfill_normalized_text() -> None:
+    connection = op.get_bind()
+    products = sa.table(
+        'products',
+        sa.column('id', sa.Integer),
+        sa.column('name', sa.String),
+        sa.column('description', sa.String),
+        sa.column('city_name', sa.String),
+        sa.column('name_normalized', sa.String),
+        sa.column('description_normalized', sa.String),
+        sa.column('city_name_normalized', sa.String),
+    )
+    update = products.update().where(products.c.id == sa.bindparam('product_id')).values(
+        name_normalized=sa.bindparam('name_value'),
+        description_normalized=sa.bindparam('description_value'),
+        city_name_normalized=sa.bindparam('city_name_value'),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(products.c.id, products.c.name, products.c.description, products.c.city_name)
+            .where(products.c.id > last_id)
+            .order_by(products.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        connection.execute(update, [
+            {
+                'product_id': row.id,
+                'name_value': backend.managers.normalization.normalize_text(row.name),
+                'description_value': backend.managers.normalization.normalize_text(row.description),
+                'city_name_value': backend.managers.normalization.normalize_text(row.city_name),
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade():
+    # Tables may have been created with the columns, trigger and indexes by 'create_all' already.
+    op.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS name_normalized VARCHAR')
+    op.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS description_normalized VARCHAR')
+    op.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS city_name_normalized VARCHAR')
+    # Build the full-text search document from normalized text, which is recomputed while filling the columns.
+    _create_search_vector_trigger(
+        name_column='NEW.name_normalized, NEW.name',
+        description_column='NEW.description_normalized, NEW.description',
+        columns='name, description, name_normalized, description_normalized',
+    )
+    _backfill_normalized_text()
+
+    # Searches match normalized text, so trigram indexes move to the normalized columns.
+    op.drop_index('ix_products_name_trgm', table_name='products', if_exists=True)
+    op.drop_index('ix_products_city_name_trgm', table_name='products', if_exists=True)
+    op.create_index(
+        'ix_products_name_normalized_trgm',
+        'products',
+        ['name_normalized'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name_normalized': 'gin_trgm_ops'},
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_products_city_name_normalized_trgm',
+        'products',
+        ['city_name_normalized'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'city_name_normalized': 'gin_trgm_ops'},
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_products_city_name_normalized_trgm', table_name='products', if_exists=True)
+    op.drop_index('ix_products_name_normalized_trgm', table_name='products', if_exists=True)
+    op.create_index(
+        'ix_products_name_trgm',
+        'products',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_products_city_name_trgm',
+        'products',
+        ['city_name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'city_name': 'gin_trgm_ops'},
+        if_not_exists=True,
+    )
+    _create_search_vector_trigger(
+        name_column='NEW.name', description_column='NEW.description', columns='name, description'
+    )
+    op.execute("""
+        UPDATE products SET search_vector =
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    """)
+    op.drop_column('products', 'city_name_normalized')
+    op.drop_column('products', 'description_normalized')
+    op.drop_column('products', 'name_normalized')
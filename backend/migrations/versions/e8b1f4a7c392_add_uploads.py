@@ -0,0 +1,40 @@
+"""Store uploads by their contents with reference counts
+
+Revision ID: e8b1f4a7c392
+Revises: d5a9c3e1f076
+Create Date: 2026-10-18 19:37:51.204618
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b1f4a7c392'
+down_revision = 'd5a9c3e1f076'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The table may have been created empty by 'create_all' already.
+    op.create_table(
+        'uploads',
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('reference_count', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+        if_not_exists=True,
+    )
+    # Files uploaded before keep their names, and are counted as many times as pictures refer to them. Counts of
+    # rows which already exist are replaced too, since pictures are what refer to the files.
+    op.execute("""
+        INSERT INTO uploads (name, reference_count)
+        SELECT filename, count(*)
+        FROM (SELECT filename FROM picture UNION ALL SELECT filename FROM profile_picture) AS refs
+        GROUP BY filename
+        ON CONFLICT (name) DO UPDATE SET reference_count = EXCLUDED.reference_count
+    """)
+
+
+def downgrade():
+    op.drop_table('uploads')
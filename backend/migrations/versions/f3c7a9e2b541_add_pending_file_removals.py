@@ -0,0 +1,32 @@
+"""Queue removals of unreferenced uploads
+
+Revision ID: f3c7a9e2b541
+Revises: e8b1f4a7c392
+Create Date: 2026-10-18 21:12:40.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c7a9e2b541'
+down_revision = 'e8b1f4a7c392'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The table may have been created by 'create_all' already.
+    op.create_table(
+        'pending_file_removals',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('queued_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table('pending_file_removals')
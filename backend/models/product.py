@@ -1,6 +1,29 @@
+from typing import Collection, Optional
+
 import sqlalchemy
+import sqlalchemy.dialects.postgresql
+import sqlalchemy.orm
 
 import backend.initializers.database
+import backend.initializers.settings
+
+# Keeps the full-text search document of a product up to date on every write. Product name is weighted above its
+# description, both taken from their normalized copies. The 'simple' configuration is used since listings are written in both Persian and English.
+SEARCH_VECTOR_FUNCTION = """
+CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name_normalized, NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description_normalized, NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+SEARCH_VECTOR_TRIGGER = """
+CREATE TRIGGER products_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, description, name_normalized, description_normalized ON products
+FOR EACH ROW EXECUTE PROCEDURE products_search_vector_update()
+"""
 
 
 class Product(backend.initializers.database.DB.Model):
@@ -9,11 +32,46 @@ class Product(backend.initializers.database.DB.Model):
     """
 
     __tablename__ = 'products'
+    __table_args__ = (
+        # Partial index over the products which are visible in search, newest first.
+        backend.initializers.database.DB.Index(
+            'ix_products_visible_created_at', 'created_at', 'id',
+            postgresql_where=sqlalchemy.text('is_banned IS NOT TRUE'),
+        ),
+        # Filters and sort keys of search, equality filters first.
+        backend.initializers.database.DB.Index(
+            'ix_products_status_category_price_created_at', 'status', 'category', 'price', 'created_at'
+        ),
+        # Products of a seller, newest first, answering pages of a seller's list straight from the index.
+        backend.initializers.database.DB.Index(
+            'ix_products_user_username_created_at', 'user_username', 'created_at', 'id'
+        ),
+        # Partial index over banned products listed to admins.
+        backend.initializers.database.DB.Index(
+            'ix_products_banned', 'id', postgresql_where=sqlalchemy.text('is_banned')
+        ),
+        backend.initializers.database.DB.Index('ix_products_search_vector', 'search_vector', postgresql_using='gin'),
+        # Trigram indexes answering both substring (ILIKE) and similarity matching on normalized text.
+        backend.initializers.database.DB.Index(
+            'ix_products_name_normalized_trgm', 'name_normalized',
+            postgresql_using='gin', postgresql_ops={'name_normalized': 'gin_trgm_ops'}
+        ),
+        backend.initializers.database.DB.Index(
+            'ix_products_city_name_normalized_trgm', 'city_name_normalized',
+            postgresql_using='gin', postgresql_ops={'city_name_normalized': 'gin_trgm_ops'}
+        ),
+    )
 
     PRODUCT_NAME_MAX_LENGTH = 50
     CITY_NAME_MAX_LENGTH = 50
     DESCRIPTION_MAX_LENGTH = 500
     STATUS_OPTIONS = ['for sale', 'sold', 'reserved']
+    # Fields of the serialized product, the picture fields are read from a relationship and the others are columns.
+    FIELDS = (
+        'id', 'user_username', 'created_at', 'name', 'price', 'pictures', 'picture_variants', 'city_name',
+        'description', 'status', 'category', 'is_banned',
+    )
+    PICTURE_FIELDS = ('pictures', 'picture_variants')
     # Categories : real estate, automobile, digital & electronics , kitchenware, personal items, entertainment, others
     CATEGORY_OPTIONS = [
         'Others', 'Real-Estate', 'Automobile', 'Digital & Electronics', 'Kitchenware', 'Entertainment',
@@ -28,7 +86,7 @@ class Product(backend.initializers.database.DB.Model):
     user_username = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String,
         backend.initializers.database.DB.ForeignKey('users.username'),
-        nullable=False
+        nullable=False,
     )
     created_at = backend.initializers.database.DB.Column(
         sqlalchemy.DateTime,
@@ -47,6 +105,10 @@ class Product(backend.initializers.database.DB.Model):
         backref='product',
         lazy=True
     )
+    seller = backend.initializers.database.DB.relationship(
+        'User',
+        lazy=True
+    )
     city_name = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String(CITY_NAME_MAX_LENGTH),
         nullable=True
@@ -71,6 +133,35 @@ class Product(backend.initializers.database.DB.Model):
         default='Other',
         nullable=False
     )
+    # Incremented by every write of the product, so ETags of its representations change along with it.
+    version = backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.Integer,
+        default=1,
+        server_default='1',
+        nullable=False
+    )
+    # Normalized copies of searchable text (see 'backend.managers.normalization'), filled on every write.
+    name_normalized = sqlalchemy.orm.deferred(backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.String,
+        nullable=True
+    ))
+    description_normalized = sqlalchemy.orm.deferred(backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.String,
+        nullable=True
+    ))
+    city_name_normalized = sqlalchemy.orm.deferred(backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.String,
+        nullable=True
+    ))
+    # Full-text search document, maintained by a database trigger. It is never loaded unless asked.
+    search_vector = sqlalchemy.orm.deferred(backend.initializers.database.DB.Column(
+        sqlalchemy.dialects.postgresql.TSVECTOR().with_variant(sqlalchemy.Text(), 'sqlite'),
+        nullable=True
+    ))
+    # Relevance of the product to the full-text query of a search, only loaded when sorting by relevance.
+    search_rank = sqlalchemy.orm.query_expression()
+    # Similarity of the product name to the name of a fuzzy search, only loaded when paginating fuzzy results.
+    search_similarity = sqlalchemy.orm.query_expression()
 
     def __repr__(self) -> str:
         """
@@ -78,21 +169,47 @@ class Product(backend.initializers.database.DB.Model):
         """
         return f"<Product(id={self.id}, name={self.name}, user_username={self.user_username}, price={self.price}, status={self.status})>"
 
-    def to_dict(self) -> dict:
-        """Convert the Product instance to a dictionary for JSON serialization."""
-        return {
-            'id': self.id,
-            'user_username': self.user_username,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'name': self.name,
-            'price': self.price,
-            'pictures': [picture.filename for picture in self.pictures],  # Assuming Picture has a filename attribute
-            'city_name': self.city_name,
-            'description': self.description,
-            'status': self.status,
-            'category': self.category,
-            'is_banned': self.is_banned,
+    def bump_version(self) -> None:
+        """Increment the version of the product in its next UPDATE, atomically with concurrent writes."""
+        self.version = Product.version + 1
+
+    def to_dict(self, fields: Optional[Collection[str]] = None) -> dict:
+        """
+        Convert the Product instance to a dictionary for JSON serialization.
+
+        'created_at' is left a datetime, which the app's JSON provider writes in ISO 8601 format.
+
+        Args:
+            fields (Collection): Names of 'FIELDS' to include, all of them by default. Attributes of other fields
+                                 aren't accessed, so they don't need to be loaded.
+        """
+        product_dict = {
+            field: getattr(self, field)
+            for field in self.FIELDS if field not in self.PICTURE_FIELDS and (fields is None or field in fields)
         }
+        if fields is None or 'pictures' in fields:
+            product_dict['pictures'] = [picture.filename for picture in self.pictures]
+        if fields is None or 'picture_variants' in fields:
+            # URLs of resized copies of each picture, in the order of 'pictures'. They're empty until generated.
+            product_dict['picture_variants'] = [variant_urls(picture.variants) for picture in self.pictures]
+        return product_dict
+
+
+sqlalchemy.event.listen(
+    Product.__table__,
+    'before_create',
+    sqlalchemy.DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+sqlalchemy.event.listen(
+    Product.__table__,
+    'after_create',
+    sqlalchemy.DDL(SEARCH_VECTOR_FUNCTION).execute_if(dialect='postgresql')
+)
+sqlalchemy.event.listen(
+    Product.__table__,
+    'after_create',
+    sqlalchemy.DDL(SEARCH_VECTOR_TRIGGER).execute_if(dialect='postgresql')
+)
 
 
 class Picture(backend.initializers.database.DB.Model):
@@ -111,11 +228,26 @@ class Picture(backend.initializers.database.DB.Model):
     product_id = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.Integer,
         backend.initializers.database.DB.ForeignKey('products.id'),
-        nullable=False
+        nullable=False,
+        index=True
+    )
+    # Names of the files of resized copies of the picture by their variant, e.g., 'thumbnail', once generated.
+    variants = backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.JSON,
+        nullable=True
     )
 
     def to_dict(self) -> dict:
         return {
             'id': self.id,
-            'filename': self.filename
+            'filename': self.filename,
+            'variants': variant_urls(self.variants),
         }
+
+
+def variant_urls(variants: Optional[dict]) -> dict:
+    """Returns URLs of resized copies of a picture by their variant, given names of their files."""
+    return {
+        variant: f'{backend.initializers.settings.UPLOADS_URL_PATH}/{filename}'
+        for variant, filename in (variants or {}).items()
+    }
@@ -1,3 +1,5 @@
+import sqlalchemy
+
 import backend.initializers.database
 
 
@@ -6,6 +8,12 @@ class UserReport(backend.initializers.database.DB.Model):
         UserReport model representing a report of a user.
     """
     __tablename__ = 'user_reports'
+    __table_args__ = (
+        # Partial index over unresolved reports listed to admins.
+        backend.initializers.database.DB.Index(
+            'ix_user_reports_unresolved', 'id', postgresql_where=sqlalchemy.text('NOT is_resolved')
+        ),
+    )
 
     id = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.Integer,
@@ -15,12 +23,14 @@ class UserReport(backend.initializers.database.DB.Model):
     reported_user = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String,
         backend.initializers.database.DB.ForeignKey('users.username'),
-        nullable=False
+        nullable=False,
+        index=True
     )
     reporter_username = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String,
         backend.initializers.database.DB.ForeignKey('users.username'),
-        nullable=False
+        nullable=False,
+        index=True
     )
     description = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String,
@@ -47,6 +57,12 @@ class ProductReport(backend.initializers.database.DB.Model):
         ProductReport model representing a report of a product.
     """
     __tablename__ = 'product_reports'
+    __table_args__ = (
+        # Partial index over unresolved reports listed to admins.
+        backend.initializers.database.DB.Index(
+            'ix_product_reports_unresolved', 'id', postgresql_where=sqlalchemy.text('NOT is_resolved')
+        ),
+    )
 
     id = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.Integer,
@@ -56,12 +72,14 @@ class ProductReport(backend.initializers.database.DB.Model):
     reported_product = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.Integer,
         backend.initializers.database.DB.ForeignKey('products.id'),
-        nullable=False
+        nullable=False,
+        index=True
     )
     reporter_username = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String,
         backend.initializers.database.DB.ForeignKey('users.username'),
-        nullable=False
+        nullable=False,
+        index=True
     )
     description = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String,
@@ -0,0 +1,46 @@
+import backend.initializers.database
+
+
+class Upload(backend.initializers.database.DB.Model):
+    """
+    An uploaded file, stored once under the digest of its contents and shared by every picture with the same contents.
+
+    The file is removed once no Picture or ProfilePicture refers to it anymore, see 'backend.managers.storage'.
+    """
+    __tablename__ = 'uploads'
+
+    name = backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.String(255),
+        primary_key=True
+    )
+    # Number of Picture and ProfilePicture rows whose filename is the name of the upload.
+    reference_count = backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.Integer,
+        default=0,
+        server_default='0',
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<Upload(name={self.name}, reference_count={self.reference_count})>"
+
+
+class PendingFileRemoval(backend.initializers.database.DB.Model):
+    """
+    A stored file to remove once it's checked to be unreferenced, queued by the transaction which released it.
+
+    Files aren't removed within requests, see 'backend.managers.storage.process_pending_removals'.
+    """
+    __tablename__ = 'pending_file_removals'
+
+    id = backend.initializers.database.DB.Column(backend.initializers.database.DB.Integer, primary_key=True)
+    # Name of the stored file, a name may be queued more than once.
+    name = backend.initializers.database.DB.Column(backend.initializers.database.DB.String(255), nullable=False)
+    queued_at = backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.DateTime,
+        server_default=backend.initializers.database.DB.func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<PendingFileRemoval(id={self.id}, name={self.name})>"
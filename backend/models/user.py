@@ -1,6 +1,9 @@
+from typing import Collection, Optional
+
 import sqlalchemy
 
 import backend.initializers.database
+import backend.models.product
 
 
 class User(backend.initializers.database.DB.Model):
@@ -9,6 +12,17 @@ class User(backend.initializers.database.DB.Model):
     """
 
     __tablename__ = 'users'
+    __table_args__ = (
+        # Partial index over banned users listed to admins.
+        backend.initializers.database.DB.Index(
+            'ix_users_banned', 'username', postgresql_where=sqlalchemy.text('is_banned')
+        ),
+    )
+    # Columns of the serialized user.
+    FIELDS = (
+        'username', 'first_name', 'last_name', 'address', 'phone_number', 'profile_picture', 'profile_picture_variants',
+        'is_banned', 'email', 'is_admin', 'is_verified',
+    )
     USERNAME_MAX_LENGTH = 50
     PASSWORD_MAX_LENGTH = 128
     EMAIL_MAX_LENGTH = 128
@@ -53,6 +67,11 @@ class User(backend.initializers.database.DB.Model):
         backend.initializers.database.DB.String,
         nullable=True
     )
+    # Names of the files of resized copies of the profile picture by their variant, once generated.
+    profile_picture_variants = backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.JSON,
+        nullable=True
+    )
     is_admin = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.Boolean,
         default=False
@@ -61,6 +80,13 @@ class User(backend.initializers.database.DB.Model):
         backend.initializers.database.DB.Boolean,
         default=False
     )
+    # Incremented by every write of the user, so ETags of its profile change along with it.
+    version = backend.initializers.database.DB.Column(
+        backend.initializers.database.DB.Integer,
+        default=1,
+        server_default='1',
+        nullable=False
+    )
 
     def __repr__(self) -> str:
         """
@@ -68,20 +94,22 @@ class User(backend.initializers.database.DB.Model):
         """
         return self.username
 
-    def to_dict(self) -> dict:
-        """Convert the User instance to a dictionary for JSON serialization."""
-        return {
-            'username': self.username,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'address': self.address,
-            'phone_number': self.phone_number,
-            'profile_picture': self.profile_picture,
-            'is_banned': self.is_banned,
-            'email': self.email,
-            'is_admin': self.is_admin,
-            'is_verified': self.is_verified
-        }
+    def bump_version(self) -> None:
+        """Increment the version of the user in its next UPDATE, atomically with concurrent writes."""
+        self.version = User.version + 1
+
+    def to_dict(self, fields: Optional[Collection[str]] = None) -> dict:
+        """
+        Convert the User instance to a dictionary for JSON serialization.
+
+        Args:
+            fields (Collection): Names of 'FIELDS' to include, all of them by default. Attributes of other fields
+                                 aren't accessed, so they don't need to be loaded.
+        """
+        user_dict = {field: getattr(self, field) for field in self.FIELDS if fields is None or field in fields}
+        if 'profile_picture_variants' in user_dict:
+            user_dict['profile_picture_variants'] = backend.models.product.variant_urls(self.profile_picture_variants)
+        return user_dict
 
 
 class ProfilePicture(backend.initializers.database.DB.Model):
@@ -100,7 +128,8 @@ class ProfilePicture(backend.initializers.database.DB.Model):
     user_username = backend.initializers.database.DB.Column(
         backend.initializers.database.DB.String,
         backend.initializers.database.DB.ForeignKey('users.username'),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     def to_dict(self) -> dict:
@@ -5,6 +5,7 @@ import backend.models.user
 import backend.initializers.settings
 import backend.managers.admin
 import backend.routes.authorization_utils
+import backend.routes.request_utils
 
 admin_bp = flask.Blueprint('admin', __name__)
 
@@ -20,13 +21,22 @@ def get_user_reports_list():
       - Admin
     security:
       - BearerAuth: []
+    parameters:
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream the list while it is read from the database, for very large lists.
     responses:
       200:
         description: Successfully returned user reports list.
       403:
         description: Only admins have access to this API.
     """
-    return backend.managers.admin.AdminManager.instance.get_list_of_reported_users()
+    stream, error = backend.routes.request_utils.stream_from_request()
+    if error:
+        return error
+    return backend.managers.admin.AdminManager.instance.get_list_of_reported_users(stream=stream)
 
 
 @admin_bp.route('/product-reports-list', methods=['GET'])
@@ -40,13 +50,22 @@ def get_product_reports_list():
       - Admin
     security:
       - BearerAuth: []
+    parameters:
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream the list while it is read from the database, for very large lists.
     responses:
       200:
         description: Successfully returned product reports list.
       403:
         description: Only admins have access to this API.
     """
-    return backend.managers.admin.AdminManager.instance.get_list_of_reported_products()
+    stream, error = backend.routes.request_utils.stream_from_request()
+    if error:
+        return error
+    return backend.managers.admin.AdminManager.instance.get_list_of_reported_products(stream=stream)
 
 
 @admin_bp.route('/banned-product-list', methods=['GET'])
@@ -60,13 +79,22 @@ def get_banned_product_list():
       - Admin
     security:
       - BearerAuth: []
+    parameters:
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream the list while it is read from the database, for very large lists.
     responses:
       200:
         description: Successfully returned product banned list.
       403:
         description: Only admins have access to this API.
     """
-    return backend.managers.admin.AdminManager.instance.get_banned_product_list()
+    stream, error = backend.routes.request_utils.stream_from_request()
+    if error:
+        return error
+    return backend.managers.admin.AdminManager.instance.get_banned_product_list(stream=stream)
 
 
 @admin_bp.route('/banned-user-list', methods=['GET'])
@@ -80,13 +108,22 @@ def get_banned_user_list():
       - Admin
     security:
       - BearerAuth: []
+    parameters:
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream the list while it is read from the database, for very large lists.
     responses:
       200:
         description: Successfully returned product banned list.
       403:
         description: Only admins have access to this API.
     """
-    return backend.managers.admin.AdminManager.instance.get_banned_user_list()
+    stream, error = backend.routes.request_utils.stream_from_request()
+    if error:
+        return error
+    return backend.managers.admin.AdminManager.instance.get_banned_user_list(stream=stream)
 
 
 @admin_bp.route('/ban_user', methods=['POST'])
@@ -101,6 +101,24 @@ class AdminRouteTest(absltest.TestCase):
         self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
 
 
+    def test_banned_product_list_stream(self):
+        self.mock_user_query.filter_by.return_value.first.return_value = self.admin
+        response = self.client.get(
+            "/api/admin/banned-product-list?stream=yes",
+            headers={"Authorization": f"Bearer {self.admin_token}"},
+        )  # Bad stream
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        self.mock_manager.instance.get_banned_product_list.return_value = (
+            flask.jsonify({"banned_products": []}), backend.initializers.settings.HTTPStatus.OK.value
+        )
+        response = self.client.get(
+            "/api/admin/banned-product-list?stream=true",
+            headers={"Authorization": f"Bearer {self.admin_token}"},
+        )
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.mock_manager.instance.get_banned_product_list.assert_called_with(stream=True)
+
 if __name__ == "__main__":
     backend.initializers.test_util.pass_flags_as_parsed()
     absltest.main()
@@ -1,11 +1,17 @@
+from typing import Optional
+
 import flask
 import flask_jwt_extended
 import werkzeug.utils
 
+import backend.managers.normalization
 import backend.managers.product
+import backend.managers.product_import
 import backend.models.product
+import backend.models.user
 import backend.initializers.settings
 import backend.routes.authorization_utils
+import backend.routes.request_utils
 
 product_bp = flask.Blueprint('product', __name__)
 
@@ -86,58 +92,9 @@ def create() -> (flask.Flask, int):
     """
 
     user_username = flask_jwt_extended.get_jwt_identity()
-    # Validate product name exists.
-    name = flask.request.form.get('name')
-    if not name:
-        return (
-            flask.jsonify({'message': 'Missing product name.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-    # Validate price exists and it is a valid float number.
-    price = flask.request.form.get('price')
-    if not price:
-        return (
-            flask.jsonify({'message': 'Missing price.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-    try:
-        price = float(price)
-    except ValueError:
-        return (
-            flask.jsonify({'message': 'Price must be a valid float number.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-    city_name = flask.request.form.get('city_name')
-    description = flask.request.form.get('description')
-    if not description:
-        return (
-            flask.jsonify({'message': 'Missing description.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-    # Validate status exists and has a value in defined status enum.
-    status = flask.request.form.get('status')
-    if not status:
-        return (
-            flask.jsonify({'message': 'Missing status.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-    if status not in backend.models.product.Product.STATUS_OPTIONS:
-        return (
-            flask.jsonify({'message': 'Invalid value for status.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-    # Validate category exists and has a value in defined category enum.
-    category = flask.request.form.get('category')
-    if not category:
-        return (
-            flask.jsonify({'message': 'Missing status.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-    if category not in backend.models.product.Product.CATEGORY_OPTIONS:
-        return (
-            flask.jsonify({'message': 'Invalid value for category.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
+    product_data, error = backend.managers.product_import.validate_product(flask.request.form)
+    if error:
+        return flask.jsonify({'message': error}), backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
 
     # Get list of files from the 'pictures' field
     image_files = flask.request.files.getlist('pictures')
@@ -156,20 +113,159 @@ def create() -> (flask.Flask, int):
                 backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
             )
 
-    product_data = {
-        'name': name,
-        'price': price,
-        'city_name': city_name,
-        'status': status,
-        'category': category,
+    product_data.update({
         'user_username': user_username,
         'images': images,
         'images_path': images_path,
-        'description': description
-    }
+    })
     return backend.managers.product.ProductManager.instance.create_product(product_data)
 
 
+@product_bp.route('/import', methods=['POST'])
+@flask_jwt_extended.jwt_required()
+@backend.routes.authorization_utils.valid_user
+def import_products() -> (flask.Flask, int):
+    """
+    Create many products at once from a CSV or NDJSON file, without pictures.
+    ---
+    tags:
+      - Product
+    security:
+      - BearerAuth: []
+    consumes:
+      - text/csv
+      - application/x-ndjson
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum:
+          - csv
+          - ndjson
+        required: false
+        description: Format of the file, given by the Content-Type header by default.
+      - name: body
+        in: body
+        required: true
+        description: >
+          The file as the request body. CSV files start with a header row naming the columns, NDJSON files have
+          a JSON object per line. Columns (or keys) are 'name', 'price', 'city_name', 'description', 'status'
+          and 'category', validated as in product creation.
+        schema:
+          type: string
+    responses:
+      200:
+        description: >
+          Valid rows are created. The report has the number of 'created' products, the number of 'failed' rows,
+          and 'errors' of failed rows with their line number and message.
+      400:
+        description: Bad Request if the format is missing or unknown.
+    """
+    import_format = flask.request.args.get(
+        'format', backend.managers.product_import.MEDIA_TYPE_FORMATS.get(flask.request.mimetype)
+    )
+    if import_format not in backend.managers.product_import.MEDIA_TYPE_FORMATS.values():
+        return (
+            flask.jsonify({'message': 'Format must be either csv or ndjson.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    rows = backend.managers.product_import.read_rows(import_format, flask.request.stream)
+    return backend.managers.product.ProductManager.instance.import_products(flask_jwt_extended.get_jwt_identity(), rows)
+
+
+def _search_filters_from_request() -> (Optional[dict], Optional[tuple]):
+    """
+    Parse and validate filters of product search from query parameters of the current request.
+
+    Returns:
+        tuple: A tuple containing:
+            - The filters of 'ProductManager.search_product', or None if they are invalid.
+            - A response tuple explaining why the filters are invalid, or None if they are valid.
+    """
+    filters = {}
+
+    # Retrieve the full-text query from query parameters.
+    # Text filters are normalized the same way as the stored product text, so spelling variants match.
+    filter_q = backend.managers.normalization.normalize_text(flask.request.args.get('q', ''))
+    if filter_q:
+        filters['q'] = filter_q
+
+    # Retrieve the 'name' filter from query parameters.
+    filter_name = backend.managers.normalization.normalize_text(flask.request.args.get('name', ''))
+    if filter_name:
+        filters['name'] = filter_name
+
+    # Check for fuzzy matching of the 'name' filter.
+    filter_fuzzy = flask.request.args.get('fuzzy')
+    if filter_fuzzy:
+        if filter_fuzzy not in ('true', 'false'):
+            return None, (
+                flask.jsonify({'message': 'Fuzzy must be either true or false.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        if filter_fuzzy == 'true':
+            if 'name' not in filters:
+                return None, (
+                    flask.jsonify({'message': 'Fuzzy search requires a name.'}),
+                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+                )
+            filters['fuzzy'] = True
+
+    # Retrieve the 'city_name' filter from query parameters.
+    filter_city_name = backend.managers.normalization.normalize_text(flask.request.args.get('city_name', ''))
+    if filter_city_name:
+        filters['city_name'] = filter_city_name
+
+    # Retrieve and validate the 'status' filter from query parameters.
+    filter_status = flask.request.args.getlist('status')
+    if filter_status:
+        for status in filter_status:
+            if status not in backend.models.product.Product.STATUS_OPTIONS:
+                return None, (
+                    flask.jsonify({'message': 'Invalid value for filter status.'}),
+                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+                )
+        filters['status'] = filter_status
+
+    # Retrieve and validate the 'category' filter from query parameters.
+    filter_category = flask.request.args.getlist('category')
+    if filter_category:
+        for category in filter_category:
+            if category not in backend.models.product.Product.CATEGORY_OPTIONS:
+                return None, (
+                    flask.jsonify({'message': 'Invalid value for filter category.'}),
+                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+                )
+        filters['category'] = filter_category
+
+    # Retrieve price range filters from query parameters.
+    filter_min_price = flask.request.args.get('min_price')
+    filter_max_price = flask.request.args.get('max_price')
+    # Validate that both min_price and max_price are provided together.
+    if (not filter_min_price and filter_max_price) or (not filter_max_price and filter_min_price):
+        return None, (
+            flask.jsonify({'message': 'Min price and max price must both be provided.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+
+    # Validate and convert price filters to integers if both are provided.
+    if filter_min_price and filter_max_price:
+        if not filter_min_price.isdigit():
+            return None, (
+                flask.jsonify({'message': 'Min price must be an integer.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        if not filter_max_price.isdigit():
+            return None, (
+                flask.jsonify({'message': 'Max price must be an integer.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        filters['min_price'] = int(filter_min_price)
+        filters['max_price'] = int(filter_max_price)
+
+    return filters, None
+
+
 @product_bp.route('/search', methods=['GET'])
 def search() -> (flask.Flask, int):
     """
@@ -178,11 +274,26 @@ def search() -> (flask.Flask, int):
     tags:
       - Product
     parameters:
+      - name: q
+        in: query
+        type: string
+        required: false
+        description: Full-text query over product name and description. Supports quoted phrases, 'or' and '-'.
       - name: name
         in: query
         type: string
         required: false
         description: Name of the product to filter by (case-insensitive).
+      - name: fuzzy
+        in: query
+        type: boolean
+        required: false
+        description: Match 'name' by similarity, tolerating typos, and rank the most similar products first.
+      - name: city_name
+        in: query
+        type: string
+        required: false
+        description: City name of the product to filter by (case-insensitive).
       - name: min_price
         in: query
         type: number
@@ -237,6 +348,34 @@ def search() -> (flask.Flask, int):
           - asc
           - dsc
         description: Sort order for price. Use 'asc' for ascending and 'dsc' for descending.
+      - name: sort_relevance
+        in: query
+        type: string
+        required: false
+        enum:
+          - asc
+          - dsc
+        description: Sort order for relevance to the full-text query 'q'. Use 'dsc' for the best matches first.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size. If provided (or a cursor is provided), results are paginated with a 'next_cursor'.
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: The 'next_cursor' value of the previous page, with the same filters and sorting.
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream unpaginated results while they are read from the database, for very large results.
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields of products to return, e.g., 'id,name,seller.username'. All by default.
     responses:
       200:
         description: A list of products matching the filters.
@@ -250,59 +389,9 @@ def search() -> (flask.Flask, int):
       200:
         description: Products filtered successfully.
     """
-    filters = {}
-
-    # Retrieve the 'name' filter from query parameters.
-    filter_name = flask.request.args.get('name')
-    if filter_name:
-        filters['name'] = filter_name
-
-    # Retrieve and validate the 'status' filter from query parameters.
-    filter_status = flask.request.args.getlist('status')
-    if filter_status:
-        for status in filter_status:
-            if status not in backend.models.product.Product.STATUS_OPTIONS:
-                return (
-                    flask.jsonify({'message': 'Invalid value for filter status.'}),
-                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-                )
-        filters['status'] = filter_status
-
-    # Retrieve and validate the 'category' filter from query parameters.
-    filter_category = flask.request.args.getlist('category')
-    if filter_category:
-        for category in filter_category:
-            if category not in backend.models.product.Product.CATEGORY_OPTIONS:
-                return (
-                    flask.jsonify({'message': 'Invalid value for filter category.'}),
-                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-                )
-        filters['category'] = filter_category
-
-    # Retrieve price range filters from query parameters.
-    filter_min_price = flask.request.args.get('min_price')
-    filter_max_price = flask.request.args.get('max_price')
-    # Validate that both min_price and max_price are provided together.
-    if (not filter_min_price and filter_max_price) or (not filter_max_price and filter_min_price):
-        return (
-            flask.jsonify({'message': 'Min price and max price must both be provided.'}),
-            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-        )
-
-    # Validate and convert price filters to integers if both are provided.
-    if filter_min_price and filter_max_price:
-        if not filter_min_price.isdigit():
-            return (
-                flask.jsonify({'message': 'Min price must be an integer.'}),
-                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-            )
-        if not filter_max_price.isdigit():
-            return (
-                flask.jsonify({'message': 'Max price must be an integer.'}),
-                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
-            )
-        filters['min_price'] = int(filter_min_price)
-        filters['max_price'] = int(filter_max_price)
+    filters, error = _search_filters_from_request()
+    if error:
+        return error
 
     # Check for sorting options for 'created_at'.
     filter_sort_created_at = flask.request.args.get('sort_created_at')
@@ -324,7 +413,167 @@ def search() -> (flask.Flask, int):
             )
         filters['sort_price'] = filter_sort_price
 
-    return backend.managers.product.ProductManager.instance.search_product(filters)
+    # Check for sorting options for relevance to the full-text query.
+    filter_sort_relevance = flask.request.args.get('sort_relevance')
+    if filter_sort_relevance:
+        if filter_sort_relevance != 'dsc' and filter_sort_relevance != 'asc':
+            return (
+                flask.jsonify({'message': 'Sort type of relevance must be either asc or dsc.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        if 'q' not in filters:
+            return (
+                flask.jsonify({'message': 'Sorting by relevance requires a full-text query.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        filters['sort_relevance'] = filter_sort_relevance
+
+    # Check for pagination options.
+    filter_limit = flask.request.args.get('limit')
+    filter_cursor = flask.request.args.get('cursor')
+    if filter_limit or filter_cursor:
+        if filter_limit:
+            if not filter_limit.isdigit() or not (
+                    1 <= int(filter_limit) <= backend.initializers.settings.SEARCH_PAGE_MAX_LIMIT):
+                return (
+                    flask.jsonify({
+                        'message': f'Limit must be an integer between 1 and '
+                                   f'{backend.initializers.settings.SEARCH_PAGE_MAX_LIMIT}.'
+                    }),
+                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+                )
+            filters['limit'] = int(filter_limit)
+        else:
+            filters['limit'] = backend.initializers.settings.SEARCH_PAGE_DEFAULT_LIMIT
+        if filter_cursor:
+            filters['cursor'] = filter_cursor
+
+    stream, error = backend.routes.request_utils.stream_from_request()
+    if error:
+        return error
+    fields, error = backend.routes.request_utils.fields_from_request(
+        backend.models.product.Product.FIELDS, {'seller': backend.models.user.User.FIELDS}
+    )
+    if error:
+        return error
+
+    return backend.managers.product.ProductManager.instance.search_product(filters, stream=stream, fields=fields)
+
+
+@product_bp.route('/facets', methods=['GET'])
+def facets() -> (flask.Flask, int):
+    """
+    Count products matching search filters per category, status and price range.
+    ---
+    tags:
+      - Product
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: false
+        description: Full-text query over product name and description. Supports quoted phrases, 'or' and '-'.
+      - name: name
+        in: query
+        type: string
+        required: false
+        description: Name of the product to filter by (case-insensitive).
+      - name: fuzzy
+        in: query
+        type: boolean
+        required: false
+        description: Match 'name' by similarity, tolerating typos.
+      - name: city_name
+        in: query
+        type: string
+        required: false
+        description: City name of the product to filter by (case-insensitive).
+      - name: min_price
+        in: query
+        type: number
+        required: false
+        description: Minimum price of the product.
+      - name: max_price
+        in: query
+        type: number
+        required: false
+        description: Maximum price of the product.
+      - name: status
+        in: query
+        type: array
+        collectionFormat: multi
+        required: false
+        items:
+          type: string
+          enum:
+            - for sale
+            - reserved
+            - sold
+        description: Status of the product.
+      - name: category
+        in: query
+        type: array
+        items:
+          type: string
+          enum:
+            - Others
+            - Real-Estate
+            - Automobile
+            - Digital & Electronics
+            - Kitchenware
+            - Entertainment
+            - Personal Items
+        collectionFormat: multi
+        required: false
+        description: Category of the product.
+      - name: price_bucket_size
+        in: query
+        type: integer
+        required: false
+        description: Width of price ranges of the price histogram.
+    responses:
+      200:
+        description: Number of matching products, in total and per category, status and price range.
+        schema:
+          type: object
+          properties:
+            total:
+              type: integer
+            category:
+              type: object
+            status:
+              type: object
+            price:
+              type: array
+              items:
+                type: object
+                properties:
+                  min:
+                    type: integer
+                  max:
+                    type: integer
+                  count:
+                    type: integer
+      400:
+        description: Bad request if filters are invalid.
+    """
+    filters, error = _search_filters_from_request()
+    if error:
+        return error
+
+    # Retrieve and validate the width of price ranges.
+    price_bucket_size = flask.request.args.get('price_bucket_size')
+    if price_bucket_size:
+        if not price_bucket_size.isdigit() or int(price_bucket_size) < 1:
+            return (
+                flask.jsonify({'message': 'Price bucket size must be a positive integer.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        price_bucket_size = int(price_bucket_size)
+    else:
+        price_bucket_size = backend.initializers.settings.FACETS_DEFAULT_PRICE_BUCKET_SIZE
+
+    return backend.managers.product.ProductManager.instance.search_facets(filters, price_bucket_size)
 
 
 @product_bp.route('/get_product_by_id', methods=['GET'])
@@ -340,9 +589,16 @@ def get_product_by_id():
         type: integer
         required: true
         description: The ID of the product to retrieve.
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields of the product to return, e.g., 'id,name,seller.username'. All by default.
     responses:
       200:
-        description: Product details retrieved successfully.
+        description: Product details retrieved successfully, with an ETag of them.
+      304:
+        description: The product is unchanged since the ETag sent in If-None-Match.
       404:
         description: No product found with the provided ID.
       400:
@@ -361,8 +617,169 @@ def get_product_by_id():
             flask.jsonify({'message': 'Product ID must be an integer.'}),
             backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
         )
+    fields, error = backend.routes.request_utils.fields_from_request(
+        backend.models.product.Product.FIELDS, {'seller': backend.models.user.User.FIELDS}
+    )
+    if error:
+        return error
 
-    return backend.managers.product.ProductManager.instance.get_product(product_id)
+    return backend.managers.product.ProductManager.instance.get_product(product_id, fields=fields)
+
+
+@product_bp.route('/similar', methods=['GET'])
+def get_similar_products() -> (flask.Flask, int):
+    """
+    Recommend products similar to a product, by name, description, category and city.
+    ---
+    tags:
+      - Product
+    parameters:
+      - name: product_id
+        in: query
+        type: integer
+        required: true
+        description: The ID of the product to recommend similar products for.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of recommended products. 10 by default, at most 50.
+    responses:
+      200:
+        description: Similar products which aren't banned or sold, the most similar first.
+      404:
+        description: No product found with the provided ID.
+      400:
+        description: Invalid input, product ID must be an integer and the limit must be in range.
+    """
+    product_id = flask.request.args.get('product_id')
+    if not product_id:
+        return (
+            flask.jsonify({'message': 'Missing product ID.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    if not product_id.isdigit():
+        return (
+            flask.jsonify({'message': 'Product ID must be an integer.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    limit = flask.request.args.get('limit')
+    if limit:
+        if not limit.isdigit() or not 1 <= int(limit) <= backend.initializers.settings.SIMILAR_MAX_LIMIT:
+            return (
+                flask.jsonify({
+                    'message': f'Limit must be an integer between 1 and '
+                               f'{backend.initializers.settings.SIMILAR_MAX_LIMIT}.'
+                }),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        limit = int(limit)
+    else:
+        limit = backend.initializers.settings.SIMILAR_DEFAULT_LIMIT
+
+    return backend.managers.product.ProductManager.instance.get_similar_products(int(product_id), limit)
+
+
+@product_bp.route('/batch', methods=['GET'])
+def get_product_batch() -> (flask.Flask, int):
+    """
+    Retrieve several products by their IDs in a single request.
+    ---
+    tags:
+      - Product
+    parameters:
+      - name: ids
+        in: query
+        type: string
+        required: true
+        description: Comma-separated IDs of the products to retrieve, e.g., '3,1,2'. At most 200 IDs.
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields of products to return, e.g., 'id,name,seller.username'. All by default.
+    responses:
+      200:
+        description: Found products in the order of the requested IDs, and the list of IDs which weren't found.
+      400:
+        description: Invalid input, IDs must be a non-empty list of integers.
+    """
+    ids = flask.request.args.get('ids')
+    if not ids:
+        return (
+            flask.jsonify({'message': 'Missing product IDs.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    ids = ids.split(',')
+    if not all(product_id.strip().isdigit() for product_id in ids):
+        return (
+            flask.jsonify({'message': 'Product IDs must be integers.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    if len(ids) > backend.initializers.settings.PRODUCT_BATCH_MAX_IDS:
+        return (
+            flask.jsonify({
+                'message': f'At most {backend.initializers.settings.PRODUCT_BATCH_MAX_IDS} products can be retrieved '
+                           f'at once.'
+            }),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    fields, error = backend.routes.request_utils.fields_from_request(
+        backend.models.product.Product.FIELDS, {'seller': backend.models.user.User.FIELDS}
+    )
+    if error:
+        return error
+
+    return backend.managers.product.ProductManager.instance.get_product_batch(
+        [int(product_id) for product_id in ids], fields=fields
+    )
+
+
+@product_bp.route('/suggest', methods=['GET'])
+def suggest() -> (flask.Flask, int):
+    """
+    Suggest product names and cities starting with the text typed in the search box.
+    ---
+    tags:
+      - Product
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: The typed text, matched case-insensitively as a prefix of names and cities.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of suggested names, and of suggested cities. 10 by default, at most 20.
+    responses:
+      200:
+        description: Suggested 'names' and 'cities' of visible products of any status, each with its product 'count'.
+      400:
+        description: Invalid input, the typed text is empty or the limit is out of range.
+    """
+    prefix = flask.request.args.get('q', '')
+    if not backend.managers.normalization.normalize_text(prefix):
+        return (
+            flask.jsonify({'message': 'Missing text to suggest for.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    limit = flask.request.args.get('limit')
+    if limit:
+        if not limit.isdigit() or not 1 <= int(limit) <= backend.initializers.settings.SUGGEST_MAX_LIMIT:
+            return (
+                flask.jsonify({
+                    'message': f'Limit must be an integer between 1 and '
+                               f'{backend.initializers.settings.SUGGEST_MAX_LIMIT}.'
+                }),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        limit = int(limit)
+    else:
+        limit = backend.initializers.settings.SUGGEST_DEFAULT_LIMIT
+
+    return backend.managers.product.ProductManager.instance.suggest(prefix, limit)
 
 
 @product_bp.route('/delete', methods=['DELETE'])
@@ -596,15 +1013,95 @@ def report_product() -> (flask.Flask, int):
 @flask_jwt_extended.jwt_required()
 def get_products() -> (flask.Flask, int):
     """
-    API for returning a list of products that are on sale for a user.
+    API for returning a list of products that are on sale for a user, the newest first.
     ---
     tags:
       - Product
     security:
       - BearerAuth: []
+    parameters:
+      - name: status
+        in: query
+        type: array
+        collectionFormat: multi
+        required: false
+        items:
+          type: string
+          enum:
+            - for sale
+            - reserved
+            - sold
+        description: Statuses of products to return. All by default.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size. If provided (or a cursor is provided), the list is paginated with a 'next_cursor'.
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: The 'next_cursor' returned with the previous page.
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream the list while it is read from the database, for very large lists. Can't be paginated.
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields of products to return, e.g., 'id,name,price'. All by default.
     responses:
       200:
-        description: Products are returned successfully.
+        description: Products are returned successfully, with an ETag of the list.
+      304:
+        description: The list is unchanged since the ETag sent in If-None-Match.
+      400:
+        description: Invalid input, e.g., an unknown status, an out of range limit or an invalid cursor.
     """
+    filters = {}
+    filter_status = flask.request.args.getlist('status')
+    if filter_status:
+        for status in filter_status:
+            if status not in backend.models.product.Product.STATUS_OPTIONS:
+                return (
+                    flask.jsonify({'message': 'Invalid value for filter status.'}),
+                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+                )
+        filters['status'] = filter_status
+
+    filter_limit = flask.request.args.get('limit')
+    filter_cursor = flask.request.args.get('cursor')
+    if filter_limit or filter_cursor:
+        if filter_limit:
+            if not filter_limit.isdigit() or not (
+                    1 <= int(filter_limit) <= backend.initializers.settings.PRODUCT_LIST_PAGE_MAX_LIMIT):
+                return (
+                    flask.jsonify({
+                        'message': f'Limit must be an integer between 1 and '
+                                   f'{backend.initializers.settings.PRODUCT_LIST_PAGE_MAX_LIMIT}.'
+                    }),
+                    backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+                )
+            filters['limit'] = int(filter_limit)
+        else:
+            filters['limit'] = backend.initializers.settings.PRODUCT_LIST_PAGE_DEFAULT_LIMIT
+        if filter_cursor:
+            filters['cursor'] = filter_cursor
+
+    stream, error = backend.routes.request_utils.stream_from_request()
+    if error:
+        return error
+    if stream and 'limit' in filters:
+        return (
+            flask.jsonify({'message': 'A streamed list can not be paginated.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    fields, error = backend.routes.request_utils.fields_from_request(backend.models.product.Product.FIELDS)
+    if error:
+        return error
     username = flask_jwt_extended.get_jwt_identity()
-    return backend.managers.product.ProductManager.instance.get_products(username)
+    return backend.managers.product.ProductManager.instance.get_products(
+        username, stream=stream, fields=fields, filters=filters
+    )
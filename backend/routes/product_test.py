@@ -155,6 +155,181 @@ class ProductRouteTest(absltest.TestCase):
         )  # Success
         self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
 
+    def test_search_fuzzy(self):
+        response = self.client.get("/api/product/search?name=phone&fuzzy=a")  # Bad fuzzy
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?fuzzy=true")  # Fuzzy without name
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?name=phon&fuzzy=true&city_name=Kazan")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        filters = self.mock_manager.instance.search_product.call_args.args[0]
+        self.assertTrue(filters['fuzzy'])
+        self.assertEqual(filters['city_name'], 'kazan')
+
+    def test_search_full_text(self):
+        response = self.client.get("/api/product/search?sort_relevance=a&q=phone")  # Bad sort relevance
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?sort_relevance=dsc")  # Sort relevance without query
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?q=%20red%20phone%20&sort_relevance=dsc")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        filters = self.mock_manager.instance.search_product.call_args.args[0]
+        self.assertEqual(filters['q'], 'red phone')
+        self.assertEqual(filters['sort_relevance'], 'dsc')
+
+    def test_search_normalizes_text_filters(self):
+        response = self.client.get("/api/product/search", query_string={
+            'name': ' كتاب\u200cهاي ۱۲ ', 'city_name': 'Tehran', 'q': 'يخچال'
+        })
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        filters = self.mock_manager.instance.search_product.call_args.args[0]
+        self.assertEqual(filters['name'], 'کتابهای 12')
+        self.assertEqual(filters['city_name'], 'tehran')
+        self.assertEqual(filters['q'], 'یخچال')
+
+    def test_search_pagination(self):
+        response = self.client.get("/api/product/search?limit=a")  # Bad limit
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?limit=0")  # Limit out of range
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get(
+            f"/api/product/search?limit={backend.initializers.settings.SEARCH_PAGE_MAX_LIMIT + 1}"
+        )  # Limit out of range
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?limit=10&cursor=abc")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        filters = self.mock_manager.instance.search_product.call_args.args[0]
+        self.assertEqual(filters['limit'], 10)
+        self.assertEqual(filters['cursor'], 'abc')
+
+        response = self.client.get("/api/product/search?cursor=abc")  # Default page size
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        filters = self.mock_manager.instance.search_product.call_args.args[0]
+        self.assertEqual(filters['limit'], backend.initializers.settings.SEARCH_PAGE_DEFAULT_LIMIT)
+
+    def test_search_stream(self):
+        response = self.client.get("/api/product/search?stream=1")  # Bad stream
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?name=phone&stream=true")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertTrue(self.mock_manager.instance.search_product.call_args.kwargs['stream'])
+
+        response = self.client.get("/api/product/search?name=phone")  # Not streamed by default
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertFalse(self.mock_manager.instance.search_product.call_args.kwargs['stream'])
+
+    def test_search_fields(self):
+        response = self.client.get("/api/product/search?fields=id,password")  # Unknown field
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?fields=id,seller.password")  # Unknown seller field
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/search?fields=id,name,seller.username,seller.email")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(
+            self.mock_manager.instance.search_product.call_args.kwargs['fields'],
+            {'id': None, 'name': None, 'seller': {'username', 'email'}}
+        )
+
+        response = self.client.get("/api/product/search?fields=seller.username,seller")  # Whole seller
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(self.mock_manager.instance.search_product.call_args.kwargs['fields'], {'seller': None})
+
+        response = self.client.get("/api/product/search")  # All fields by default
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertIsNone(self.mock_manager.instance.search_product.call_args.kwargs['fields'])
+
+    def test_get_product_batch(self):
+        response = self.client.get("/api/product/batch")  # Missing IDs
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/batch?ids=1,a")  # Not integers
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        ids = ','.join(str(i) for i in range(backend.initializers.settings.PRODUCT_BATCH_MAX_IDS + 1))
+        response = self.client.get(f"/api/product/batch?ids={ids}")  # Too many IDs
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/batch?ids=3,1,2&fields=name")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.mock_manager.instance.get_product_batch.assert_called_once_with([3, 1, 2], fields={'name': None})
+
+    def test_import_products(self):
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        response = self.client.post("/api/product/import", headers=headers, data='a,b')  # Unknown format
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        self.mock_manager.instance.import_products.return_value = ({'created': 1}, 200)
+        response = self.client.post(
+            "/api/product/import", headers=headers, data='name\nPhone\n', content_type='text/csv'
+        )  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        username, rows = self.mock_manager.instance.import_products.call_args.args
+        self.assertEqual(list(rows), [(2, {'name': 'Phone'}, None)])
+
+        response = self.client.post(
+            "/api/product/import?format=ndjson", headers=headers, data='{"name": "Phone"}', content_type='text/plain'
+        )  # Format given by the query
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+
+    def test_suggest(self):
+        response = self.client.get("/api/product/suggest?q=%20")  # Missing text
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/suggest?q=ph&limit=0")  # Bad limit
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/suggest?q=ph&limit=5")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.mock_manager.instance.suggest.assert_called_once_with('ph', 5)
+
+        response = self.client.get("/api/product/suggest?q=ph")  # Default limit
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.mock_manager.instance.suggest.assert_called_with('ph', backend.initializers.settings.SUGGEST_DEFAULT_LIMIT)
+
+    def test_get_similar_products(self):
+        response = self.client.get("/api/product/similar")  # Missing product ID
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/similar?product_id=a")  # Bad product ID
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/similar?product_id=1&limit=51")  # Bad limit
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/similar?product_id=1")  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.mock_manager.instance.get_similar_products.assert_called_once_with(
+            1, backend.initializers.settings.SIMILAR_DEFAULT_LIMIT
+        )
+
+    def test_facets(self):
+        response = self.client.get("/api/product/facets?status=asdsa")  # Bad filter
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/facets?price_bucket_size=0")  # Bad price bucket size
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/facets?name=Phone&category=Kitchenware&price_bucket_size=50")
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        filters, price_bucket_size = self.mock_manager.instance.search_facets.call_args.args
+        self.assertEqual(filters, {'name': 'phone', 'category': ['Kitchenware']})
+        self.assertEqual(price_bucket_size, 50)
+
+        response = self.client.get("/api/product/facets")  # Default price bucket size
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        _, price_bucket_size = self.mock_manager.instance.search_facets.call_args.args
+        self.assertEqual(price_bucket_size, backend.initializers.settings.FACETS_DEFAULT_PRICE_BUCKET_SIZE)
+
     def test_get_product_by_id(self):
         response = self.client.get(
             "/api/product/get_product_by_id",
@@ -252,6 +427,26 @@ class ProductRouteTest(absltest.TestCase):
         )  # Success
         self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
 
+    def test_get_products_filters(self):
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        response = self.client.get("/api/product/product_list?status=new", headers=headers)  # Bad status
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/product_list?limit=0", headers=headers)  # Bad limit
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/product_list?cursor=abc&stream=true", headers=headers)  # Streamed page
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get("/api/product/product_list?status=sold&cursor=abc", headers=headers)  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        _, kwargs = self.mock_manager.instance.get_products.call_args
+        self.assertEqual(kwargs['filters'], {
+            'status': ['sold'],
+            'limit': backend.initializers.settings.PRODUCT_LIST_PAGE_DEFAULT_LIMIT,
+            'cursor': 'abc',
+        })
+
 
 if __name__ == "__main__":
     backend.initializers.test_util.pass_flags_as_parsed()
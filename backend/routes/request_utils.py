@@ -0,0 +1,59 @@
+from typing import Collection, Optional
+
+import flask
+
+import backend.initializers.settings
+
+
+def stream_from_request() -> (bool, Optional[tuple]):
+    """
+    Parse the 'stream' query parameter of the current request, which asks for a streamed list response.
+
+    Returns:
+        tuple: A tuple containing:
+            - Whether the response should be streamed.
+            - A response tuple explaining why the parameter is invalid, or None if it is valid.
+    """
+    stream = flask.request.args.get('stream', 'false')
+    if stream not in ('true', 'false'):
+        return False, (
+            flask.jsonify({'message': 'Stream must be either true or false.'}),
+            backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+        )
+    return stream == 'true', None
+
+
+def fields_from_request(
+        allowed: Collection[str], nested: Optional[dict] = None
+) -> (Optional[dict], Optional[tuple]):
+    """
+    Parse the 'fields' query parameter of the current request, which lists the fields to return, e.g., 'id,name'.
+
+    Fields of a nested object are dotted, e.g., 'seller.username', and naming the object alone returns all its fields.
+
+    Args:
+        allowed (Collection): Names of fields which may be requested.
+        nested (dict): Names of allowed fields of each nested object, by the name of the object.
+
+    Returns:
+        tuple: A tuple containing:
+            - The requested fields mapped to the set of their requested nested fields (None for all of them),
+              or None if the parameter is missing.
+            - A response tuple explaining why the parameter is invalid, or None if it is valid.
+    """
+    if 'fields' not in flask.request.args:
+        return None, None
+    nested = nested or {}
+    fields = {}
+    for name in flask.request.args['fields'].split(','):
+        field, _, nested_field = name.strip().partition('.')
+        if field not in allowed and field not in nested or nested_field and nested_field not in nested.get(field, ()):
+            return None, (
+                flask.jsonify({'message': f'Invalid field: {name.strip()}.'}),
+                backend.initializers.settings.HTTPStatus.BAD_REQUEST.value
+            )
+        if not nested_field:
+            fields[field] = None
+        elif field not in fields or fields[field] is not None:
+            fields.setdefault(field, set()).add(nested_field)
+    return fields, None
@@ -0,0 +1,93 @@
+import mimetypes
+import os
+from typing import Callable
+
+import flask
+import werkzeug.exceptions
+import werkzeug.security
+
+import backend.initializers.settings
+import backend.managers.images
+import backend.managers.storage
+
+uploads_bp = flask.Blueprint('uploads', __name__)
+# Key of the access checks of uploaded files in 'flask_app.extensions'.
+ACCESS_CHECKS_EXTENSION = 'upload_access_checks'
+
+
+def register_access_check(flask_app: flask.Flask, check: Callable[[str], bool]) -> None:
+    """
+    Register a check of whether the current request may get an uploaded file.
+
+    Uploaded files are pictures shown to everyone, so no check is registered by default. Once one is, files are
+    cached by browsers only, not by shared caches.
+
+    Args:
+        flask_app (flask.Flask): The Flask application instance serving the files.
+        check (Callable): Called with the resolved name of the requested file, within the request, and returns
+                          whether the file may be returned. Every registered check must allow it.
+    """
+    flask_app.extensions.setdefault(ACCESS_CHECKS_EXTENSION, []).append(check)
+
+
+@uploads_bp.route('/<path:filename>', methods=['GET'])
+def get_upload(filename: str) -> flask.Response:
+    """
+    Get an uploaded file, e.g., a picture of a product.
+
+    Files are found in either layout of the upload folder (see 'backend.managers.storage.resolve'), so names
+    returned before the files were moved to the sharded layout keep working. Behind nginx, the file is sent by
+    nginx through an internal redirect (see 'UPLOADS_ACCEL_REDIRECT_LOCATION'), so app workers aren't held by
+    the transfer. Names of uploaded files are never reused, so they're cached as immutable.
+    ---
+    tags:
+      - Upload
+    parameters:
+      - name: filename
+        in: path
+        type: string
+        required: true
+        description: Name of the file, as returned in pictures of products and profiles.
+    responses:
+      200:
+        description: The file.
+      403:
+        description: The file may not be accessed by the request.
+      404:
+        description: File does not exist.
+    """
+    folder = os.path.abspath(backend.managers.images.upload_folder())
+    name = backend.managers.storage.resolve(filename)
+    if werkzeug.security.safe_join(folder, name) is None:
+        return (
+            flask.jsonify({'message': 'File does not exist.'}),
+            backend.initializers.settings.HTTPStatus.NOT_FOUND.value
+        )
+    access_checks = flask.current_app.extensions.get(ACCESS_CHECKS_EXTENSION, [])
+    if not all(check(name) for check in access_checks):
+        return (
+            flask.jsonify({'message': 'You do not have access to this file.'}),
+            backend.initializers.settings.HTTPStatus.FORBIDDEN.value
+        )
+
+    location = flask.current_app.config.get('UPLOADS_ACCEL_REDIRECT_LOCATION')
+    if location:
+        # nginx finds missing files itself, which saves a lookup of the file here.
+        response = flask.Response(mimetype=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{location.rstrip('/')}/{name}"
+    else:
+        try:
+            response = flask.send_from_directory(
+                folder, name, max_age=backend.initializers.settings.UPLOADS_CACHE_MAX_AGE_SECONDS
+            )
+        except werkzeug.exceptions.NotFound:
+            return (
+                flask.jsonify({'message': 'File does not exist.'}),
+                backend.initializers.settings.HTTPStatus.NOT_FOUND.value
+            )
+    response.cache_control.max_age = backend.initializers.settings.UPLOADS_CACHE_MAX_AGE_SECONDS
+    response.cache_control.immutable = True
+    response.cache_control.public = not access_checks
+    response.cache_control.private = bool(access_checks)
+    # The status is left to the response, which may answer a conditional or range request.
+    return response
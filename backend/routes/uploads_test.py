@@ -0,0 +1,104 @@
+import os
+import tempfile
+from unittest import mock
+
+import flask
+from absl.testing import absltest
+
+import backend.initializers.settings
+import backend.managers.images
+import backend.managers.storage
+import backend.routes.uploads
+
+
+class UploadsRouteTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.folder = temporary_directory.name
+        self.mock_upload_folder = mock.patch.object(
+            backend.managers.images, 'upload_folder', return_value=self.folder
+        ).start()
+        self.flask_app = flask.Flask(__name__, static_folder=None)
+        self.flask_app.register_blueprint(backend.routes.uploads.uploads_bp, url_prefix='/backend/uploads')
+        self.client = self.flask_app.test_client()
+
+    def tearDown(self) -> None:
+        self.mock_upload_folder.stop()
+        super().tearDown()
+
+    def write(self, name: str) -> None:
+        os.makedirs(os.path.dirname(os.path.join(self.folder, name)), exist_ok=True)
+        with open(os.path.join(self.folder, name), 'wb') as file:
+            file.write(name.encode())
+
+    def test_get_upload_in_either_layout(self):
+        self.write('flat.jpg')
+        self.write(backend.managers.storage.shard('moved.jpg'))
+
+        response = self.client.get('/backend/uploads/flat.jpg')  # Flat layout
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(response.data, b'flat.jpg')
+        response.close()
+
+        response = self.client.get('/backend/uploads/moved.jpg')  # Moved to the sharded layout
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        response.close()
+
+        response = self.client.get(f"/backend/uploads/{backend.managers.storage.shard('moved.jpg')}")  # Sharded name
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        response.close()
+
+        response = self.client.get('/backend/uploads/missing.jpg')  # Missing
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.NOT_FOUND.value)
+
+        response = self.client.get('/backend/uploads/../uploads_test.py')  # Outside of the upload folder
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.NOT_FOUND.value)
+
+    def test_get_upload_is_cached_as_immutable(self):
+        self.write('flat.jpg')
+
+        response = self.client.get('/backend/uploads/flat.jpg')
+        self.assertCountEqual(
+            response.headers['Cache-Control'].split(', '), ['max-age=31536000', 'immutable', 'public']
+        )
+        response.close()
+
+        response = self.client.get(
+            '/backend/uploads/flat.jpg', headers={'If-Modified-Since': response.headers['Last-Modified']}
+        )  # Conditional request
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.NOT_MODIFIED.value)
+
+    def test_get_upload_with_accel_redirect(self):
+        self.flask_app.config['UPLOADS_ACCEL_REDIRECT_LOCATION'] = '/internal/uploads/'
+        name = backend.managers.storage.shard('moved.jpg')
+
+        response = self.client.get('/backend/uploads/moved.jpg')  # The file isn't read by the app.
+
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(response.headers['X-Accel-Redirect'], f'/internal/uploads/{name}')
+        self.assertEqual(response.headers['Content-Type'], 'image/jpeg')
+        self.assertCountEqual(
+            response.headers['Cache-Control'].split(', '), ['max-age=31536000', 'immutable', 'public']
+        )
+        self.assertEqual(response.data, b'')
+
+    def test_get_upload_access_check(self):
+        self.write('flat.jpg')
+        self.write('secret.jpg')
+        backend.routes.uploads.register_access_check(self.flask_app, lambda name: name != 'secret.jpg')
+
+        response = self.client.get('/backend/uploads/secret.jpg')  # Denied
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.FORBIDDEN.value)
+
+        response = self.client.get('/backend/uploads/flat.jpg')  # Allowed, but not cached by shared caches
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertCountEqual(
+            response.headers['Cache-Control'].split(', '), ['max-age=31536000', 'immutable', 'private']
+        )
+        response.close()
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -7,6 +7,7 @@ import backend.managers.user
 import backend.models.user
 import backend.initializers.settings
 import backend.routes.authorization_utils
+import backend.routes.request_utils
 
 user_bp = flask.Blueprint('user', __name__)
 
@@ -252,11 +253,22 @@ def get_profile() -> (flask.Flask, int):
       - User
     security:
       - BearerAuth: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields of the profile to return, e.g., 'username,first_name'. All by default.
     responses:
       200:
-        description: Successfully get own profile.
+        description: Successfully get own profile, with an ETag of it.
+      304:
+        description: The profile is unchanged since the ETag sent in If-None-Match.
     """
-    return backend.managers.user.UserManager.instance.get_profile(flask_jwt_extended.get_jwt_identity())
+    fields, error = backend.routes.request_utils.fields_from_request(backend.models.user.User.FIELDS)
+    if error:
+        return error
+    return backend.managers.user.UserManager.instance.get_profile(flask_jwt_extended.get_jwt_identity(), fields)
 
 
 @user_bp.route('/get_profile_by_username/<username>', methods=['GET'])
@@ -272,11 +284,21 @@ def get_profile_by_username(username) -> (flask.Flask, int):
         type: string
         required: true
         description: Username of user to get profile for.
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields of the profile to return, e.g., 'username,first_name'. All by default.
     responses:
       200:
-        description: Successfully get profile by username.
+        description: Successfully get profile by username, with an ETag of it.
+      304:
+        description: The profile is unchanged since the ETag sent in If-None-Match.
     """
-    return backend.managers.user.UserManager.instance.get_profile(username)
+    fields, error = backend.routes.request_utils.fields_from_request(backend.models.user.User.FIELDS)
+    if error:
+        return error
+    return backend.managers.user.UserManager.instance.get_profile(username, fields)
 
 
 @user_bp.route('/edit_profile', methods=['PUT'])
@@ -151,6 +151,21 @@ class UserRouteTest(absltest.TestCase):
         )  # Success
         self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
 
+    def test_get_profile_fields(self):
+        response = self.client.get(
+            "/api/user/get_profile?fields=username,password",
+            headers={"Authorization": f"Bearer {self.admin_token}"},
+        )  # Unknown field
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.BAD_REQUEST.value)
+
+        response = self.client.get(
+            "/api/user/get_profile_by_username/username?fields=username,first_name",
+        )  # Success
+        self.assertEqual(response.status_code, backend.initializers.settings.HTTPStatus.OK.value)
+        self.assertEqual(
+            self.mock_manager.instance.get_profile.call_args.args, ('username', {'username': None, 'first_name': None})
+        )
+
     def test_get_profile_by_username(self):
         response = self.client.get(
             "/api/user/get_profile_by_username/username",
@@ -0,0 +1,155 @@
+r"""
+Find uploaded files which nothing refers to anymore, and queue them for removal.
+
+Files are orphaned when they're left by failed requests, e.g., stored before their transaction is rolled back, or by
+releases racing 'backend.migrate_uploads'. Shards of the upload folder are scanned in parallel, and the files are
+compared against the names stored in the database, along with their picture variants. Only files named the way
+'backend.managers.storage' names them are considered, others, e.g., put in the folder by operators, are kept. Files
+modified within the grace period are kept too, since they may be stored by requests which aren't committed yet.
+Stored files which are referred to but missing are reported.
+
+Usage:
+    python -m backend.sweep_uploads --db_host=localhost --db_port=5432 --db_name=app \
+        --db_username=postgres --db_password=postgres
+"""
+import concurrent.futures
+import os
+import time
+
+import flask
+import sqlalchemy
+from absl import app as absl_app
+from absl import flags
+from absl import logging
+
+# Load settings for the defined flags to be parsed before running the sweep.
+import backend.initializers.settings
+import backend.initializers.database
+import backend.initializers.json_provider
+import backend.managers.images
+import backend.managers.storage
+import backend.models.product
+import backend.models.upload
+import backend.models.user
+
+sweep_uploads_grace_seconds = flags.DEFINE_integer(
+    name='sweep_uploads_grace_seconds', default=3600,
+    help='Minimum number of seconds since an unreferenced file is modified, for it to be removed.'
+)
+sweep_uploads_workers = flags.DEFINE_integer(
+    name='sweep_uploads_workers', default=8, help='Number of threads scanning shards of the upload folder.'
+)
+sweep_uploads_dry_run = flags.DEFINE_boolean(
+    name='sweep_uploads_dry_run', default=False, help='Only report orphaned files, without removing them.'
+)
+
+
+def sweep_uploads(grace_seconds: int, workers: int, dry_run: bool = False) -> dict:
+    """
+    Queues orphaned files for removal, and removes them along with the rest of the queue.
+
+    Orphans are removed through the queue of 'backend.managers.storage.process_pending_removals', which checks
+    them again while they're locked, so a file referred to again meanwhile is kept.
+
+    Args:
+        grace_seconds (int): Minimum number of seconds since an orphaned file is modified, for it to be removed.
+        workers (int): Number of threads scanning shards of the upload folder.
+        dry_run (bool): Whether to only report orphaned files.
+
+    Returns:
+        dict: Lists of the 'orphans' found, and of the 'missing' files which are referred to.
+    """
+    files = scan(backend.managers.images.upload_folder(), workers)
+    referenced = _referenced_names()
+    live = set()
+    for name in referenced:
+        for filename in (name, *backend.managers.images.variant_filenames(name)):
+            live.update((filename, backend.managers.storage.shard(filename)))
+
+    modified_before = time.time() - grace_seconds
+    orphans = sorted(
+        name for name, modified in files.items()
+        if name not in live and modified < modified_before and backend.managers.storage.is_stored(name)
+    )
+    missing = sorted(
+        name for name in referenced if name not in files and backend.managers.storage.shard(name) not in files
+    )
+    for name in missing:
+        logging.warning('File %s is referred to, but missing.', name)
+    logging.info('Scanned %d files, %d are orphaned.', len(files), len(orphans))
+    if not dry_run:
+        batch_size = backend.initializers.settings.FILE_REMOVAL_BATCH_SIZE
+        for start in range(0, len(orphans), batch_size):
+            backend.managers.storage.schedule_removal(orphans[start:start + batch_size])
+            backend.initializers.database.DB.session.commit()
+        while backend.managers.storage.process_pending_removals(batch_size) == batch_size:
+            pass
+    return {'orphans': orphans, 'missing': missing}
+
+
+def scan(folder: str, workers: int) -> dict:
+    """
+    Lists the files of the upload folder, each top level directory in a thread of its own.
+
+    Returns:
+        dict: Modification times of the files, by their paths relative to the folder, e.g., 'ab/cd/<name>'.
+    """
+    files = {}
+    directories = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                directories.append(entry.name)
+            elif entry.is_file(follow_symlinks=False):
+                files[entry.name] = entry.stat().st_mtime
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for directory_files in executor.map(lambda directory: _scan_directory(folder, directory), directories):
+            files.update(directory_files)
+    return files
+
+
+def _scan_directory(folder: str, directory: str) -> dict:
+    """Lists the files under a directory of the upload folder, with their paths relative to the folder."""
+    files = {}
+    directories = [directory]
+    while directories:
+        relative_directory = directories.pop()
+        with os.scandir(os.path.join(folder, relative_directory)) as entries:
+            for entry in entries:
+                relative_path = f'{relative_directory}/{entry.name}'
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(relative_path)
+                elif entry.is_file(follow_symlinks=False):
+                    files[relative_path] = entry.stat().st_mtime
+    return files
+
+
+def _referenced_names() -> set:
+    """Returns names of the stored files, and of the files pictures and profile pictures refer to."""
+    session = backend.initializers.database.DB.session
+    names = set()
+    for column in (
+            backend.models.upload.Upload.name,
+            backend.models.product.Picture.filename,
+            backend.models.user.ProfilePicture.filename,
+    ):
+        names.update(session.execute(sqlalchemy.select(column).distinct()).scalars())
+    return names
+
+
+def main(_: list[str]) -> None:
+    import backend.app
+
+    flask_app = flask.Flask(__name__)
+    backend.initializers.json_provider.init_app(flask_app)
+    backend.app.connect_to_db(flask_app)
+    with flask_app.app_context():
+        result = sweep_uploads(
+            sweep_uploads_grace_seconds.value, sweep_uploads_workers.value, sweep_uploads_dry_run.value
+        )
+    logging.info('Done, %d orphaned files and %d missing files found.', len(result['orphans']), len(result['missing']))
+
+
+if __name__ == '__main__':
+    backend.initializers.settings.set_unused_flag_defaults()
+    absl_app.run(main)
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import tempfile
+import time
+from unittest import mock
+
+from absl.testing import absltest
+
+import backend.initializers.database
+import backend.initializers.test_util
+import backend.managers.images
+import backend.managers.storage
+import backend.models.product
+import backend.models.upload
+import backend.models.user
+import backend.sweep_uploads
+
+
+class SweepUploadsTest(absltest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        mock.patch.stopall()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.folder = temporary_directory.name
+        mock.patch.object(backend.managers.images, 'upload_folder', return_value=self.folder).start()
+        self.flask_app = backend.initializers.test_util.create_database_app()
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+
+        shard = backend.managers.storage.shard
+        variant_filename = backend.managers.images.variant_filename
+        self.phone = shard(f'{hashlib.sha256(b"phone").hexdigest()}.jpg')
+        self.missing = shard(f'{hashlib.sha256(b"missing").hexdigest()}.jpg')
+        orphan = shard(f'{hashlib.sha256(b"orphan").hexdigest()}.png')
+        session = backend.initializers.database.DB.session
+        session.add(backend.models.user.User(username='seller', password='password', email='seller@email.com'))
+        session.add(backend.models.user.ProfilePicture(filename='face_20240101120000.jpg', user_username='seller'))
+        session.add(backend.models.product.Product(
+            id=1, name='phone', price=1, user_username='seller', status='for sale', category='Others'
+        ))
+        session.add(backend.models.product.Picture(filename=self.phone, product_id=1))
+        session.add(backend.models.product.Picture(filename=self.missing, product_id=1))
+        session.add(backend.models.upload.Upload(name=self.phone, reference_count=1))
+        session.commit()
+        # A picture with its variant and a flat profile picture uploaded before, which are referred to.
+        self.referenced_files = [self.phone, variant_filename(self.phone, 'thumbnail'), 'face_20240101120000.jpg']
+        # Files left by failed requests: a picture and its variants, one uploaded before, and temporary files.
+        orphan_variant = variant_filename(orphan, 'card')
+        directory, _, filename = orphan_variant.rpartition('/')
+        self.orphans = sorted([
+            orphan, variant_filename(orphan, 'thumbnail'), orphan_variant, 'case_20230101000000.PNG',
+            '.upload-k2j4h5g6', f'{directory}/.{filename}.1234',
+        ])
+        # Files which aren't stored uploads, whatever their age.
+        self.other_files = ['readme.md', 'notes/picture.jpg', f'{directory}/backup.jpg', '.upload-keep/file']
+        for name in (*self.referenced_files, *self.orphans, *self.other_files):
+            self.write(name, modified=time.time() - 7200)
+        self.recent = shard(f'{hashlib.sha256(b"recent").hexdigest()}.jpg')
+        self.write(self.recent, modified=time.time())
+
+    def tearDown(self) -> None:
+        backend.initializers.database.DB.session.remove()
+        self.app_context.pop()
+        mock.patch.stopall()
+        super().tearDown()
+
+    def write(self, name: str, modified: float) -> None:
+        path = os.path.join(self.folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(name)
+        os.utime(path, (modified, modified))
+
+    def stored_files(self) -> list:
+        return sorted(
+            os.path.relpath(os.path.join(directory, filename), self.folder)
+            for directory, _, filenames in os.walk(self.folder) for filename in filenames
+        )
+
+    def test_scan(self) -> None:
+        files = backend.sweep_uploads.scan(self.folder, workers=2)
+
+        self.assertCountEqual(files, [*self.referenced_files, *self.orphans, *self.other_files, self.recent])
+
+    def test_sweep_uploads_removes_orphans(self) -> None:
+        result = backend.sweep_uploads.sweep_uploads(grace_seconds=3600, workers=2)
+
+        self.assertEqual(result, {'orphans': self.orphans, 'missing': [self.missing]})
+        self.assertEqual(self.stored_files(), sorted([*self.referenced_files, *self.other_files, self.recent]))
+        self.assertEqual(backend.models.upload.PendingFileRemoval.query.count(), 0)
+        # Rows locking the orphans for their removal are removed along with them.
+        self.assertEqual([upload.name for upload in backend.models.upload.Upload.query.all()], [self.phone])
+
+    def test_sweep_uploads_keeps_files_which_are_not_uploads(self) -> None:
+        self.write('manual.webp', modified=time.time() - 7200)
+
+        result = backend.sweep_uploads.sweep_uploads(grace_seconds=0, workers=2)
+
+        self.assertNotIn('manual.webp', result['orphans'])
+        for name in ('readme.md', 'manual.webp', *self.other_files):
+            self.assertTrue(os.path.exists(os.path.join(self.folder, name)))
+
+    def test_sweep_uploads_dry_run(self) -> None:
+        result = backend.sweep_uploads.sweep_uploads(grace_seconds=3600, workers=2, dry_run=True)
+
+        self.assertEqual(result['orphans'], self.orphans)
+        self.assertLen(self.stored_files(), len(self.referenced_files) + len(self.orphans) + len(self.other_files) + 1)
+        self.assertEqual(backend.models.upload.PendingFileRemoval.query.count(), 0)
+
+
+if __name__ == "__main__":
+    absltest.main()